@@ -23,8 +23,8 @@ pub use core::{
         ResponseTokenUsage, ResponseToolCalls, ToolCall,
     },
     chunking::{
-        ChunkError, Chunker, ChunkerConfig, ChunkerResult, DEFAULT_CHUNK_SIZE, TextChunker,
-        chunk_text,
+        ChunkError, ChunkSpans, Chunker, ChunkerConfig, ChunkerResult, DEFAULT_CHUNK_SIZE,
+        TextChunker, chunk_spans, chunk_text, chunk_texts,
     },
     cleaner::{
         TextCleaner, normalize_whitespace, reduce_to_single_whitespace, strip_unwanted_chars,
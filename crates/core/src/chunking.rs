@@ -5,13 +5,14 @@ mod overlap;
 use crate::splitting::{Separator, SeparatorGroup, TextSplit, TextSplitter};
 
 use alith_models::tokenizer::Tokenizer;
-use anyhow::Result;
+use anyhow::{anyhow, Result};
 use dfs_chunker::DfsTextChunker;
 use linear_chunker::LinearChunker;
 use overlap::OverlapChunker;
 use rayon::iter::{IntoParallelRefIterator, ParallelIterator};
 use std::{
     collections::VecDeque,
+    ops::Range,
     sync::{
         Arc,
         atomic::{AtomicBool, Ordering},
@@ -20,6 +21,9 @@ use std::{
 
 pub const DEFAULT_CHUNK_SIZE: usize = 1024;
 
+/// The cleaned text of a document and the byte range of each of its chunks in it.
+pub type ChunkSpans = (String, Vec<Range<usize>>);
+
 /// An easy alternative to the [`TextChunker`] struct.  
 ///
 /// * `text` - The natural language text to chunk.
@@ -37,6 +41,69 @@ pub fn chunk_text(
     Ok(splitter.run(text))
 }
 
+/// Chunks many texts in parallel and returns the chunks of each text, in order.
+///
+/// The tokenizer is loaded once and shared by all the texts, which are spread across the rayon thread pool.
+/// A blank text has no chunks; any other text the chunker cannot split is an error naming its index.
+///
+/// * `texts` - The natural language texts to chunk.
+/// * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+/// * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+pub fn chunk_texts<S: AsRef<str> + Sync>(
+    texts: &[S],
+    max_chunk_token_size: u32,
+    overlap_percent: Option<f32>,
+) -> Result<Vec<Vec<String>>> {
+    let mut splitter = TextChunker::new()?.max_chunk_token_size(max_chunk_token_size);
+    if let Some(overlap_percent) = overlap_percent {
+        splitter = splitter.overlap_percent(overlap_percent);
+    }
+    texts
+        .par_iter()
+        .enumerate()
+        .map(|(index, text)| {
+            let text = text.as_ref();
+            if text.trim().is_empty() {
+                return Ok(Vec::new());
+            }
+            splitter
+                .run(text)
+                .ok_or_else(|| anyhow!("failed to chunk text {index}"))
+        })
+        .collect()
+}
+
+/// Like [`chunk_texts`], but returns each chunk as a byte range into the cleaned text instead of a copied string.
+/// A blank text has no chunks; any other text the chunker cannot split is an error naming its index.
+///
+/// * `texts` - The natural language texts to chunk.
+/// * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+/// * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+pub fn chunk_spans<S: AsRef<str> + Sync>(
+    texts: &[S],
+    max_chunk_token_size: u32,
+    overlap_percent: Option<f32>,
+) -> Result<Vec<ChunkSpans>> {
+    let mut splitter = TextChunker::new()?.max_chunk_token_size(max_chunk_token_size);
+    if let Some(overlap_percent) = overlap_percent {
+        splitter = splitter.overlap_percent(overlap_percent);
+    }
+    texts
+        .par_iter()
+        .enumerate()
+        .map(|(index, text)| {
+            let text = text.as_ref();
+            if text.trim().is_empty() {
+                return Ok((String::new(), Vec::new()));
+            }
+            let result = splitter
+                .run_return_result(text)
+                .ok_or_else(|| anyhow!("failed to chunk text {index}"))?;
+            Ok((result.base_text().to_string(), result.chunk_spans()))
+        })
+        .collect()
+}
+
 const ABSOLUTE_LENGTH_MAX_DEFAULT: u32 = 1024;
 const ABSOLUTE_LENGTH_MIN_DEFAULT_RATIO: f32 = 0.75;
 const TOKENIZER_TIKTOKEN_DEFAULT: &str = "gpt-4";
@@ -442,6 +509,7 @@ impl Chunk {
 
 pub struct ChunkerResult {
     incoming_text: Arc<str>,
+    base_text: Arc<str>,
     initial_separator: Separator,
     chunks: Vec<Chunk>,
     tokenizer: Arc<Tokenizer>,
@@ -460,6 +528,7 @@ impl ChunkerResult {
         });
         ChunkerResult {
             incoming_text: Arc::from(incoming_text),
+            base_text: Arc::clone(&config.base_text),
             initial_separator: config.initial_separator.clone(),
             chunks,
             tokenizer: Arc::clone(&config.tokenizer),
@@ -471,6 +540,34 @@ impl ChunkerResult {
         self.chunks.iter_mut().map(|chunk| chunk.text()).collect()
     }
 
+    /// The cleaned text the chunks were cut from.
+    pub fn base_text(&self) -> &str {
+        &self.base_text
+    }
+
+    /// The byte range each chunk covers in [`ChunkerResult::base_text`], separators between its splits included.
+    pub fn chunk_spans(&self) -> Vec<Range<usize>> {
+        self.chunks
+            .iter()
+            .map(|chunk| {
+                let start = chunk
+                    .used_splits
+                    .iter()
+                    .map(|split| split.indices.start)
+                    .min();
+                let end = chunk
+                    .used_splits
+                    .iter()
+                    .map(|split| split.indices.end)
+                    .max();
+                match (start, end) {
+                    (Some(start), Some(end)) => start..end,
+                    _ => 0..self.base_text.len(),
+                }
+            })
+            .collect()
+    }
+
     pub fn token_counts(&mut self) -> Vec<u32> {
         let mut token_counts: Vec<u32> = Vec::with_capacity(self.chunks.len());
         for chunk in &self.chunks {
@@ -1,32 +1,134 @@
-from .agent import Agent, MultimodalAgent
-from .chunking import chunk_text
-from .embeddings import (
-    FASTEMBED_AVAILABLE,
-    ClipEmbeddings,
-    Embeddings,
-    FastEmbeddings,
-    MilvusEmbeddings,
-    RemoteModelEmbeddings,
-)
-from .extractor import Extractor
-from .memory import Memory, MessageBuilder, WindowBufferMemory
-from .store import (
-    CHROMADB_AVAILABLE,
-    MILVUS_AVAILABLE,
-    FAISS_AVAILABLE,
-    FAISSStore,
-    ImageFAISSStore,
-    ChromaDBStore,
-    MilvusStore,
-    Store,
-)
-from .tool import Tool
-from .types import Headers
-from .lazai import Client as LazAIClient, ChainManager, ChainConfig
-
-from .utilities import (
-    DuckDuckGoTool,
-)
+"""Alith agents, tools, stores and embeddings.
+
+Submodules are imported on first attribute access, so ``from alith import
+Agent`` does not load vector store backends, embedding models or the LazAI
+chain client. The ``*_AVAILABLE`` flags only check that the optional
+package is installed, without importing it.
+"""
+
+from importlib import import_module
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .agent import Agent, MultimodalAgent
+    from .chunking import (
+        ChunkView,
+        chunk_stream,
+        chunk_text,
+        chunk_text_spans,
+        chunk_texts,
+        chunk_texts_spans,
+    )
+    from .embeddings import (
+        FASTEMBED_AVAILABLE,
+        ClipEmbeddings,
+        Embeddings,
+        FastEmbeddings,
+        MilvusEmbeddings,
+        RemoteModelEmbeddings,
+    )
+    from .cached_store import CachedStore
+    from .concurrent_store import ConcurrentFAISSStore
+    from .extractor import Extractor
+    from .federated_store import FederatedStore
+    from .hybrid import BM25Index, HybridStore
+    from .memory import Memory, MessageBuilder, WindowBufferMemory
+    from .replication import ChangeLogServer, StoreReplica
+    from .rerank import ONNXRUNTIME_AVAILABLE, CrossEncoder, Reranker
+    from .sharded_store import ShardedFAISSStore
+    from .store import (
+        CHROMADB_AVAILABLE,
+        MILVUS_AVAILABLE,
+        FAISS_AVAILABLE,
+        FAISSStore,
+        ImageFAISSStore,
+        ChromaDBStore,
+        MilvusStore,
+        Store,
+    )
+    from .tool import Tool
+    from .types import Headers
+    from .lazai import Client as LazAIClient, ChainManager, ChainConfig
+
+    from .utilities import (
+        DuckDuckGoTool,
+    )
+
+# Public name -> (submodule, attribute in it).
+_EXPORTS = {
+    "Agent": (".agent", "Agent"),
+    "MultimodalAgent": (".agent", "MultimodalAgent"),
+    "ChunkView": (".chunking", "ChunkView"),
+    "chunk_stream": (".chunking", "chunk_stream"),
+    "chunk_text": (".chunking", "chunk_text"),
+    "chunk_text_spans": (".chunking", "chunk_text_spans"),
+    "chunk_texts": (".chunking", "chunk_texts"),
+    "chunk_texts_spans": (".chunking", "chunk_texts_spans"),
+    "ClipEmbeddings": (".embeddings", "ClipEmbeddings"),
+    "Embeddings": (".embeddings", "Embeddings"),
+    "FastEmbeddings": (".embeddings", "FastEmbeddings"),
+    "MilvusEmbeddings": (".embeddings", "MilvusEmbeddings"),
+    "RemoteModelEmbeddings": (".embeddings", "RemoteModelEmbeddings"),
+    "CachedStore": (".cached_store", "CachedStore"),
+    "ConcurrentFAISSStore": (".concurrent_store", "ConcurrentFAISSStore"),
+    "Extractor": (".extractor", "Extractor"),
+    "FederatedStore": (".federated_store", "FederatedStore"),
+    "BM25Index": (".hybrid", "BM25Index"),
+    "HybridStore": (".hybrid", "HybridStore"),
+    "Memory": (".memory", "Memory"),
+    "MessageBuilder": (".memory", "MessageBuilder"),
+    "WindowBufferMemory": (".memory", "WindowBufferMemory"),
+    "ChangeLogServer": (".replication", "ChangeLogServer"),
+    "StoreReplica": (".replication", "StoreReplica"),
+    "CrossEncoder": (".rerank", "CrossEncoder"),
+    "Reranker": (".rerank", "Reranker"),
+    "ShardedFAISSStore": (".sharded_store", "ShardedFAISSStore"),
+    "FAISSStore": (".store", "FAISSStore"),
+    "ImageFAISSStore": (".store", "ImageFAISSStore"),
+    "ChromaDBStore": (".store", "ChromaDBStore"),
+    "MilvusStore": (".store", "MilvusStore"),
+    "Store": (".store", "Store"),
+    "Tool": (".tool", "Tool"),
+    "Headers": (".types", "Headers"),
+    "LazAIClient": (".lazai", "Client"),
+    "ChainManager": (".lazai", "ChainManager"),
+    "ChainConfig": (".lazai", "ChainConfig"),
+    "DuckDuckGoTool": (".utilities", "DuckDuckGoTool"),
+}
+
+# Flag -> packages that must all be installed (any one of a tuple).
+_FLAGS = {
+    "FAISS_AVAILABLE": ("faiss", "numpy"),
+    "CHROMADB_AVAILABLE": ("chromadb",),
+    "MILVUS_AVAILABLE": ("pymilvus",),
+    "FASTEMBED_AVAILABLE": (("fastembed_gpu", "fastembed"),),
+    "ONNXRUNTIME_AVAILABLE": ("onnxruntime", "tokenizers"),
+}
+
+
+def _installed(name) -> bool:
+    if isinstance(name, tuple):
+        return any(_installed(n) for n in name)
+    return find_spec(name) is not None
+
+
+def __getattr__(name: str):
+    if name in _FLAGS:
+        value = all(_installed(package) for package in _FLAGS[name])
+    elif name in _EXPORTS:
+        module, attribute = _EXPORTS[name]
+        value = getattr(import_module(module, __name__), attribute)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache it so later lookups skip this hook.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 __all__ = [
     "Agent",
@@ -46,7 +148,23 @@ __all__ = [
     "FAISSStore",
     "ImageFAISSStore",
     "FAISS_AVAILABLE",
+    "HybridStore",
+    "ConcurrentFAISSStore",
+    "ShardedFAISSStore",
+    "FederatedStore",
+    "CachedStore",
+    "StoreReplica",
+    "ChangeLogServer",
+    "CrossEncoder",
+    "Reranker",
+    "ONNXRUNTIME_AVAILABLE",
+    "BM25Index",
     "chunk_text",
+    "chunk_texts",
+    "chunk_stream",
+    "chunk_text_spans",
+    "chunk_texts_spans",
+    "ChunkView",
     "Extractor",
     "Memory",
     "WindowBufferMemory",
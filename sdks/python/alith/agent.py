@@ -1,15 +1,18 @@
 import base64
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, List, Optional, Union
+from typing import TYPE_CHECKING, Callable, List, Optional, Union
 
 import requests
 
 from .memory import Memory
-from .store import Store
 from .tool import Tool, create_delegate_tool
 from .types import Headers
 
+if TYPE_CHECKING:
+    # The store module loads numpy and faiss; agents without a store skip it.
+    from .store import Store
+
 
 @dataclass
 class Agent:
@@ -20,9 +23,35 @@ class Agent:
     base_url: Optional[str] = field(default_factory=str)
     tools: List[Union[Tool, Callable]] = field(default_factory=list)
     mcp_config_path: Optional[str] = field(default_factory=str)
-    store: Optional[Store] = None
+    # A store, or a list of stores searched concurrently through a `FederatedStore`.
+    store: Optional[Union["Store", List["Store"]]] = None
     memory: Optional[Memory] = None
     extra_headers: Optional[Headers] = None
+    # How `store` is searched for the prompt: "similarity" for the top matches,
+    # or "mmr" for matches diversified by maximal marginal relevance, which
+    # needs a single store with `search_mmr` such as `FAISSStore`.
+    retrieval: str = "similarity"
+    # Seconds each of several stores may take before it is left out of a prompt
+    # (with a warning), or None to wait for all of them. A store's first search
+    # may include loading its embedding model, so keep the timeout generous.
+    store_timeout: Optional[float] = None
+
+    def __post_init__(self):
+        if self.retrieval not in ("similarity", "mmr"):
+            raise ValueError("retrieval must be either 'similarity' or 'mmr'")
+        if isinstance(self.store, (list, tuple)):
+            from .federated_store import FederatedStore
+
+            self.store = FederatedStore(self.store, timeout=self.store_timeout)
+        if self.retrieval == "mmr" and self.store is not None and not hasattr(self.store, "search_mmr"):
+            raise ValueError(
+                f"retrieval='mmr' needs a store with search_mmr, not {type(self.store).__name__}"
+            )
+
+    def _retrieve(self, prompt: str) -> List[str]:
+        if self.retrieval == "mmr":
+            return self.store.search_mmr(prompt)
+        return self.store.search(prompt)
 
     def prompt(self, prompt: str) -> str:
         from ._alith import DelegateAgent as _DelegateAgent
@@ -46,7 +75,7 @@ class Agent:
             self.mcp_config_path,
         )
         if self.store:
-            docs = self.store.search(prompt)
+            docs = self._retrieve(prompt)
             prompt = "{}\n\n<attachments>\n{}</attachments>\n".format(
                 prompt, "".join(docs)
             )
@@ -125,7 +154,7 @@ class MultimodalAgent(Agent):
             Agent response as string.
         """
         if self.store:
-            docs = self.store.search(prompt)
+            docs = self._retrieve(prompt)
             prompt = "{}\n\n<attachments>\n{}</attachments>\n".format(
                 prompt, "".join(docs)
             )
@@ -0,0 +1,255 @@
+import json
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import LRUCache
+from .store import Store
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so near-identical queries share cache entries."""
+    return " ".join(query.split()).casefold()
+
+
+class CachedStore(Store):
+    """Caches query embeddings and search results in front of another store.
+
+    Queries are keyed by `normalize` (whitespace and case folded by default)
+    together with the search parameters. Embeddings are cached for stores
+    that search by vector (`FAISSStore` and the stores wrapping it), so a
+    repeated query skips the embedding call even once the results are stale.
+    Results are dropped whenever the store changes: writes made through this
+    wrapper always invalidate them, and direct writes to the wrapped store are
+    picked up from its `generation` counter when it has one.
+
+    Other attributes are forwarded to the wrapped store.
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        max_queries: int = 4096,
+        max_results: int = 1024,
+        normalize: Callable[[str], str] = normalize_query,
+    ):
+        self.store = store
+        self.normalize = normalize
+        self._lock = threading.Lock()
+        self._embeddings = LRUCache(max_queries)
+        self._results = LRUCache(max_results)
+        self._writes = 0
+        self._results_generation = self._generation()
+
+    @property
+    def thread_safe(self) -> bool:
+        return self.store.thread_safe
+
+    def __getattr__(self, name: str):
+        if name == "store":
+            raise AttributeError(name)
+        return getattr(self.store, name)
+
+    def _generation(self) -> tuple:
+        return (self._writes, getattr(self.store, "generation", None))
+
+    def _invalidate(self) -> None:
+        with self._lock:
+            self._writes += 1
+            self._results.clear()
+
+    def invalidate(self) -> None:
+        """Drop the cached results, e.g. after changing the store behind its back."""
+        self._invalidate()
+
+    # ---------------------------------------------------------------------
+    # Cached reads
+    # ---------------------------------------------------------------------
+
+    def _result_key(self, kind: str, query: str, limit, score_threshold, filter, collection) -> tuple:
+        filter_key = None if filter is None else json.dumps(filter, sort_keys=True, default=str)
+        return (kind, self.normalize(query), limit, score_threshold, filter_key, collection)
+
+    def _cached_results(self, key: tuple) -> Tuple[tuple, Optional[list]]:
+        with self._lock:
+            generation = self._generation()
+            if generation != self._results_generation:
+                self._results.clear()
+                self._results_generation = generation
+            return generation, self._results.get(key)
+
+    def _store_results(self, key: tuple, generation: tuple, results: list) -> None:
+        with self._lock:
+            # Skip results computed against a store that changed meanwhile.
+            if generation == self._generation():
+                self._results.put(key, results)
+
+    def _query_vectors(self, queries: List[str]) -> "np.ndarray":
+        """Embed `queries`, reusing and filling the embedding cache."""
+        keys = [self.normalize(query) for query in queries]
+        with self._lock:
+            cached = [self._embeddings.get(key) for key in keys]
+        missing = {key: query for key, query, vector in zip(keys, queries, cached) if vector is None}
+        if missing:
+            vectors = self.store._embed_queries(list(missing.values()))
+            fresh = dict(zip(missing, vectors))
+            with self._lock:
+                for key, vector in fresh.items():
+                    self._embeddings.put(key, vector)
+            cached = [fresh[key] if vector is None else vector for key, vector in zip(keys, cached)]
+        return np.stack(cached)
+
+    def _by_vector(self) -> bool:
+        return hasattr(self.store, "search_vectors") and hasattr(self.store, "_embed_queries")
+
+    def _search_many(self, queries: List[str], limit, score_threshold, filter) -> List[List[tuple]]:
+        if not self._by_vector():
+            kwargs = {} if filter is None else {"filter": filter}
+            if hasattr(self.store, "search_with_scores"):
+                return [
+                    self.store.search_with_scores(query, limit, score_threshold, **kwargs)
+                    for query in queries
+                ]
+            return [
+                [(doc, None) for doc in self.store.search(query, limit, score_threshold, **kwargs)]
+                for query in queries
+            ]
+        ids, scores = self.store.search_vectors(
+            self._query_vectors(queries), limit, score_threshold, filter
+        )
+        results = []
+        for row_ids, row_scores in zip(ids.tolist(), scores.tolist()):
+            hits = [(i, score) for i, score in zip(row_ids, row_scores) if i >= 0]
+            texts = self.store.get_texts([i for i, _ in hits])
+            results.append([(text, score) for text, (_, score) in zip(texts, hits)])
+        return results
+
+    def search_with_scores(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[tuple]:
+        """Search and return ``(document, score)`` pairs; scores are None for stores without them."""
+        key = self._result_key("scores", query, limit, score_threshold, filter, None)
+        generation, results = self._cached_results(key)
+        if results is None:
+            results = self._search_many([query], limit, score_threshold, filter)[0]
+            self._store_results(key, generation, results)
+        return list(results)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[str]:
+        return [doc for doc, _ in self.search_with_scores(query, limit, score_threshold, filter)]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[List[str]]:
+        """Batch search; only the queries missing from the cache reach the store, in one batch."""
+        keys = [self._result_key("scores", q, limit, score_threshold, filter, None) for q in queries]
+        results: Dict[tuple, list] = {}
+        missing: Dict[tuple, str] = {}
+        generation = None
+        for key, query in zip(keys, queries):
+            if key in results or key in missing:
+                continue
+            generation, cached = self._cached_results(key)
+            if cached is None:
+                missing[key] = query
+            else:
+                results[key] = cached
+        if missing:
+            found = self._search_many(list(missing.values()), limit, score_threshold, filter)
+            for key, hits in zip(missing, found):
+                results[key] = hits
+                self._store_results(key, generation, hits)
+        return [[doc for doc, _ in results[key]] for key in keys]
+
+    def search_in(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        collection_name: Optional[str] = None,
+    ) -> List[str]:
+        key = self._result_key("docs", query, limit, score_threshold, None, collection_name)
+        generation, results = self._cached_results(key)
+        if results is None:
+            results = self.store.search_in(
+                query, limit=limit, score_threshold=score_threshold, collection_name=collection_name
+            )
+            self._store_results(key, generation, results)
+        return list(results)
+
+    def cache_stats(self) -> dict:
+        """Sizes, hit counts and hit rates of the embedding and result caches."""
+        with self._lock:
+            return {
+                "embeddings": self._embeddings.stats(),
+                "results": self._results.stats(),
+            }
+
+    # ---------------------------------------------------------------------
+    # Writes, which invalidate the cached results
+    # ---------------------------------------------------------------------
+
+    def save(self, value: str, *args, **kwargs) -> None:
+        try:
+            self.store.save(value, *args, **kwargs)
+        finally:
+            self._invalidate()
+
+    def save_docs(self, docs: List[str], *args, **kwargs) -> "CachedStore":
+        try:
+            self.store.save_docs(docs, *args, **kwargs)
+        finally:
+            self._invalidate()
+        return self
+
+    def upsert_docs(self, docs: List[str], *args, **kwargs) -> "CachedStore":
+        try:
+            self.store.upsert_docs(docs, *args, **kwargs)
+        finally:
+            self._invalidate()
+        return self
+
+    def delete(self, *args, **kwargs) -> int:
+        try:
+            return self.store.delete(*args, **kwargs)
+        finally:
+            self._invalidate()
+
+    def reset(self) -> None:
+        try:
+            self.store.reset()
+        finally:
+            self._invalidate()
+
+    def create_collection(self, *args, **kwargs):
+        try:
+            return self.store.create_collection(*args, **kwargs)
+        finally:
+            self._invalidate()
+
+    def drop_collection(self, *args, **kwargs) -> None:
+        try:
+            self.store.drop_collection(*args, **kwargs)
+        finally:
+            self._invalidate()
+
+    def load_from_disk(self, path: str) -> None:
+        try:
+            self.store.load_from_disk(path)
+        finally:
+            self._invalidate()
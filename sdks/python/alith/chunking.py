@@ -1,4 +1,14 @@
-from typing import List
+import codecs
+import os
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+TextSource = Union[str, "os.PathLike", bytes, IO, Iterable[Union[str, bytes]]]
+
+# Where long streams are cut into segments, strongest boundary first.
+_SEGMENT_SEPARATORS = ("\n\n", "\n", " ")
+_READ_SIZE = 1 << 16
 
 
 def chunk_text(
@@ -14,3 +24,214 @@ def chunk_text(
     from ._alith import chunk_text as _chunk_text
 
     return _chunk_text(text, max_chunk_token_size, overlap_percent)
+
+
+def chunk_texts(
+    texts: List[str], max_chunk_token_size: int = 200, overlap_percent: float = 0.0
+) -> List[List[str]]:
+    """Chunks many natural language texts in parallel and returns the chunks of each text.
+
+    The chunking runs on all cores and releases the GIL, so it is much faster
+    than calling `chunk_text` in a loop when ingesting many documents. A blank
+    text has no chunks; a text the chunker cannot split raises an exception
+    naming its index rather than being dropped.
+
+    ## Parameters
+    * `texts` - The natural language texts to chunk.
+    * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+    * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+    """
+    from ._alith import chunk_texts as _chunk_texts
+
+    return _chunk_texts(list(texts), max_chunk_token_size, overlap_percent)
+
+
+class ChunkView(Sequence):
+    """The chunks of one text as byte offsets into its UTF-8 `source`.
+
+    Chunk strings are only decoded when accessed, so a document costs one
+    blob plus two offset arrays however many (overlapping) chunks it has.
+    `source` is the whitespace-cleaned text the chunker worked on; a chunk is
+    the contiguous slice of it, so unlike `chunk_text` it keeps the paragraph
+    and line breaks between its pieces.
+    """
+
+    __slots__ = ("source", "starts", "ends")
+
+    def __init__(self, source: bytes, starts: np.ndarray, ends: np.ndarray):
+        self.source = source
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def _from_packed(cls, source: bytes, spans: bytes) -> "ChunkView":
+        offsets = np.frombuffer(spans, dtype="<u8").reshape(-1, 2).astype(np.int64)
+        return cls(source, offsets[:, 0].copy(), offsets[:, 1].copy())
+
+    @property
+    def text(self) -> str:
+        return self.source.decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.source[self.starts[index] : self.ends[index]].decode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"ChunkView({len(self)} chunks, {len(self.source)} bytes)"
+
+    def char_offsets(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The chunk offsets in characters of `text`, for slicing the decoded string."""
+        data = np.frombuffer(self.source, dtype=np.uint8)
+        # Count the bytes that start a UTF-8 character.
+        chars = np.zeros(len(data) + 1, dtype=np.int64)
+        np.cumsum((data & 0xC0) != 0x80, out=chars[1:])
+        return chars[self.starts], chars[self.ends]
+
+    def nbytes(self) -> int:
+        return len(self.source) + self.starts.nbytes + self.ends.nbytes
+
+
+def chunk_text_spans(
+    text: str, max_chunk_token_size: int = 200, overlap_percent: float = 0.0
+) -> ChunkView:
+    """Chunks a natural language text and returns the chunks as offsets instead of strings.
+
+    ## Parameters
+    * `text` - The natural language text to chunk.
+    * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+    * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+    """
+    return chunk_texts_spans([text], max_chunk_token_size, overlap_percent)[0]
+
+
+def chunk_texts_spans(
+    texts: List[str], max_chunk_token_size: int = 200, overlap_percent: float = 0.0
+) -> List[ChunkView]:
+    """Chunks many texts in parallel, like `chunk_texts`, returning a `ChunkView` per text.
+
+    ## Parameters
+    * `texts` - The natural language texts to chunk.
+    * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+    * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+    """
+    from ._alith import chunk_spans as _chunk_spans
+
+    return [
+        ChunkView._from_packed(source, spans)
+        for source, spans in _chunk_spans(list(texts), max_chunk_token_size, overlap_percent)
+    ]
+
+
+def _read_pieces(source: TextSource, encoding: str) -> Iterator[str]:
+    """Decode a path, binary or text stream, bytes, or iterable of pieces incrementally."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from _read_pieces(f, encoding)
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = [bytes(source)]
+    elif hasattr(source, "read"):
+        stream = source
+
+        def read() -> Iterator[Union[str, bytes]]:
+            while True:
+                piece = stream.read(_READ_SIZE)
+                if not piece:
+                    return
+                yield piece
+
+        source = read()
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for piece in source:
+        yield piece if isinstance(piece, str) else decoder.decode(piece)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _cut(buffer: str, segment_size: int) -> int:
+    for separator in _SEGMENT_SEPARATORS:
+        pos = buffer.rfind(separator, 0, segment_size)
+        if pos > 0:
+            return pos + len(separator)
+    return segment_size
+
+
+def _segments(pieces: Iterable[str], segment_size: int) -> Iterator[str]:
+    """Regroup text pieces into segments of at most `segment_size` characters.
+
+    Segments end at the last paragraph break, line break or space that fits,
+    and only depend on the concatenated text, not on how it was split up.
+    """
+    pending: List[str] = []
+    size = 0
+    for piece in pieces:
+        pending.append(piece)
+        size += len(piece)
+        if size < segment_size:
+            continue
+        buffer = "".join(pending)
+        while len(buffer) >= segment_size:
+            cut = _cut(buffer, segment_size)
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+        pending, size = [buffer], len(buffer)
+    if size:
+        yield "".join(pending)
+
+
+def chunk_stream(
+    source: TextSource,
+    max_chunk_token_size: int = 200,
+    overlap_percent: float = 0.0,
+    encoding: str = "utf-8",
+    segment_size: int = 1_000_000,
+) -> Iterator[str]:
+    """Chunks a text that does not need to fit in memory and yields the chunks in order.
+
+    The text is read incrementally and cut into segments of at most
+    `segment_size` characters at paragraph breaks (falling back to line breaks
+    and spaces). The last chunk of a segment may be cut short by the segment
+    end, so it is not yielded: it is carried over, overlap window included,
+    to the front of the next segment and chunked again there. Chunk
+    boundaries and overlaps therefore follow the text, not the segments, and
+    never depend on how the input is delivered. At most about `segment_size`
+    characters plus one chunk are held at once.
+
+    ## Parameters
+    * `source` - A file path, a binary or text stream, bytes, or an iterable of `str` or `bytes` pieces.
+      Pass a `str` holding the text itself as ``[text]``.
+    * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+    * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+    * `encoding` - The encoding used to decode bytes.
+    * `segment_size` - The maximum number of characters read before chunking.
+    """
+    from ._alith import chunk_spans as _chunk_spans
+    from ._alith import chunk_texts as _chunk_texts
+
+    carry = ""
+    segments = _segments(_read_pieces(source, encoding), segment_size)
+    segment = next(segments, None)
+    while segment is not None:
+        following = next(segments, None)
+        text = carry + segment
+        (chunks,) = _chunk_texts([text], max_chunk_token_size, overlap_percent)
+        if following is None:
+            yield from chunks
+            return
+        if len(chunks) > 1:
+            yield from chunks[:-1]
+            # Chunk offsets point into the whitespace-cleaned text, which
+            # drops the break the segment was cut at; put it back.
+            ((cleaned, spans),) = _chunk_spans([text], max_chunk_token_size, overlap_percent)
+            view = ChunkView._from_packed(cleaned, spans)
+            tail = text[len(text.rstrip()):]
+            carry = view.source[view.starts[-1]:].decode("utf-8").rstrip() + tail
+        else:
+            # Not a single full chunk yet: keep reading.
+            carry = text
+        segment = following
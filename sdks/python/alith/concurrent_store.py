@@ -0,0 +1,418 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .store import FAISSStore, Store, _min_training_vectors, doc_id
+
+try:
+    import faiss
+except ImportError:
+    pass
+
+
+# A delta segment: a small exact store, and a mask of its positions whose ids
+# were deleted or replaced since it was built (None when there are none).
+_Segment = Tuple[FAISSStore, Optional["np.ndarray"]]
+
+
+def _live_ids(segment: _Segment) -> List[int]:
+    store, dead = segment
+    ids = store._id_view()
+    return (ids if dead is None else ids[~dead]).tolist()
+
+
+class _Snapshot:
+    """An immutable view of the store: the main index plus the unmerged delta segments."""
+
+    __slots__ = ("main", "segments", "removed", "_excluded")
+
+    def __init__(self, main: FAISSStore, segments: Tuple[_Segment, ...], removed: frozenset):
+        self.main = main
+        self.segments = segments
+        # Ids deleted or replaced since the main index was built.
+        self.removed = removed
+        self._excluded = None
+
+    def excluded(self) -> Optional["np.ndarray"]:
+        """Mask of the main index positions holding removed ids, built on first use."""
+        if not self.removed:
+            return None
+        if self._excluded is None:
+            mask = np.zeros(len(self.main._docs), dtype=bool)
+            positions = [self.main._positions.get(i) for i in self.removed]
+            mask[[pos for pos in positions if pos is not None]] = True
+            self._excluded = mask
+        return self._excluded
+
+    def delta_size(self) -> int:
+        return sum(len(_live_ids(segment)) for segment in self.segments)
+
+
+class ConcurrentFAISSStore(Store):
+    """Thread-safe `FAISSStore` with lock-free reads against immutable snapshots.
+
+    Searches read the current snapshot once and never block. Writers are
+    serialized by a lock and add each batch of documents as a new small exact
+    delta segment; segments are never modified once published, and are
+    merged pairwise while the older one is not larger than the newer one, so
+    every document is copied O(log n) times and a search visits O(log n)
+    segments. Each write publishes a new snapshot by swapping a single
+    reference. Once the delta holds `merge_threshold` changes it is merged
+    into a copy of the main index, which is swapped in the same way, so
+    searches keep being served from the old snapshot while the merge runs.
+
+    The wrapped `store` must not be modified directly afterwards, and must
+    not use tiered inverted lists: merges copy the main index, and the
+    on-disk lists of a tiered store cannot be shared by two copies that
+    both write to them. `generation` is bumped by every published change.
+    """
+
+    thread_safe = True
+
+    def __init__(self, store: FAISSStore, merge_threshold: int = 10_000):
+        if store.tiers is not None:
+            raise ValueError(
+                "ConcurrentFAISSStore does not support stores with tiered inverted lists "
+                "(tier_dir); use a FAISSStore without tiering"
+            )
+        self.merge_threshold = merge_threshold
+        self.generation = 0
+        self._write_lock = threading.Lock()
+        self._pending: Dict[int, Tuple[np.ndarray, str, Optional[dict]]] = {}
+        # The delta segment holding each pending id.
+        self._segment_of: Dict[int, FAISSStore] = {}
+        self._segments: Tuple[_Segment, ...] = ()
+        self._removed: set = set()
+        self._publish(store)
+
+    def _new_delta(self, main: FAISSStore) -> FAISSStore:
+        return FAISSStore(
+            dimension=main.dimension,
+            embeddings=main.embeddings,
+            index_type="flat",
+            metric=main.metric,
+        )
+
+    def _publish(self, main: FAISSStore) -> None:
+        self._snapshot = _Snapshot(main, self._segments, frozenset(self._removed))
+        self.generation += 1
+
+    def _build_segment(self, ids: List[int]) -> FAISSStore:
+        segment = self._new_delta(self._snapshot.main)
+        entries = [self._pending[i] for i in ids]
+        segment._append_vectors(
+            np.stack([vector for vector, _, _ in entries]),
+            [doc for _, doc, _ in entries],
+            np.array(ids, dtype=np.int64),
+            [metadata for _, _, metadata in entries],
+        )
+        for i in ids:
+            self._segment_of[i] = segment
+        return segment
+
+    def _add_segment(self, ids: List[int]) -> None:
+        """Add the pending `ids` as a new segment, merging it with smaller older ones."""
+        segments = list(self._segments)
+        live = ids
+        while segments:
+            older_ids = _live_ids(segments[-1])
+            if len(older_ids) > len(live):
+                break
+            segments.pop()
+            live = older_ids + live
+        segments.append((self._build_segment(live), None))
+        self._segments = tuple(segments)
+
+    def _forget_pending(self, i: int) -> None:
+        """Drop a pending id, hiding its row in the segment that holds it."""
+        self._pending.pop(i)
+        segment = self._segment_of.pop(i)
+        segments = []
+        for store, dead in self._segments:
+            if store is segment:
+                # Copy on write: published snapshots keep the old mask.
+                dead = np.zeros(len(store._docs), dtype=bool) if dead is None else dead.copy()
+                dead[store._positions[i]] = True
+            segments.append((store, dead))
+        self._segments = tuple(segments)
+
+    @property
+    def texts(self) -> List[str]:
+        """The stored documents, main index first."""
+        snapshot = self._snapshot
+        main = snapshot.main
+        ids = main._id_view()
+        texts = [
+            doc
+            for doc, i in zip(main._docs, ids.tolist())
+            if doc is not None and i not in snapshot.removed
+        ]
+        for segment, dead in snapshot.segments:
+            texts.extend(
+                doc for pos, doc in enumerate(segment._docs)
+                if doc is not None and (dead is None or not dead[pos])
+            )
+        return texts
+
+    # ---------------------------------------------------------------------
+    # Reads
+    # ---------------------------------------------------------------------
+
+    def _search(
+        self, snapshot: _Snapshot, query_vectors, limit: int, score_threshold, filter
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        parts = [(snapshot.main, snapshot.excluded())] + list(snapshot.segments)
+        all_ids, all_scores = [], []
+        for store, excluded in parts:
+            scores, positions = store._search_core(
+                query_vectors, limit, score_threshold, filter, excluded=excluded
+            )
+            store_ids = store._id_view()
+            if len(store_ids):
+                ids = np.where(positions >= 0, store_ids[positions], -1)
+            else:
+                ids = np.full(positions.shape, -1, dtype=np.int64)
+            all_ids.append(ids)
+            all_scores.append(scores)
+        ids, scores = np.hstack(all_ids), np.hstack(all_scores)
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :limit]
+        return np.take_along_axis(ids, order, 1), np.take_along_axis(scores, order, 1)
+
+    def _texts(self, snapshot: _Snapshot, ids: Iterable[int]) -> List[Optional[str]]:
+        results = []
+        for i in ids:
+            i = int(i)
+            text = None
+            for segment, dead in reversed(snapshot.segments):
+                pos = segment._positions.get(i)
+                if pos is not None and (dead is None or not dead[pos]):
+                    text = segment._docs[pos]
+                    break
+            if text is not None:
+                results.append(text)
+                continue
+            pos = None if i in snapshot.removed else snapshot.main._positions.get(i)
+            results.append(None if pos is None else snapshot.main._docs[pos])
+        return results
+
+    def _embed_queries(self, queries: List[str]) -> "np.ndarray":
+        return self._snapshot.main._embed_queries(queries)
+
+    def search_vectors(
+        self,
+        query_vectors: "np.ndarray",
+        limit: int = 3,
+        score_threshold: Optional[float] = 0.4,
+        filter: Optional[dict] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Same as `FAISSStore.search_vectors`, against the current snapshot."""
+        return self._search(self._snapshot, query_vectors, limit, score_threshold, filter)
+
+    def search_with_scores(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[tuple]:
+        snapshot = self._snapshot
+        ids, scores = self._search(
+            snapshot, snapshot.main._embed_queries([query]), limit, score_threshold, filter
+        )
+        hits = [(i, score) for i, score in zip(ids[0].tolist(), scores[0].tolist()) if i >= 0]
+        texts = self._texts(snapshot, [i for i, _ in hits])
+        return [(text, score) for text, (_, score) in zip(texts, hits)]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[str]:
+        return [doc for doc, _ in self.search_with_scores(query, limit, score_threshold, filter)]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[List[str]]:
+        if not queries:
+            return []
+        snapshot = self._snapshot
+        ids, _ = self._search(
+            snapshot, snapshot.main._embed_queries(queries), limit, score_threshold, filter
+        )
+        return [self._texts(snapshot, [i for i in row if i >= 0]) for row in ids.tolist()]
+
+    def get_texts(self, ids: Iterable[int]) -> List[Optional[str]]:
+        return self._texts(self._snapshot, ids)
+
+    def get_stats(self) -> dict:
+        snapshot = self._snapshot
+        stats = snapshot.main.get_stats()
+        stats["total_documents"] += snapshot.delta_size() - len(snapshot.removed)
+        stats["delta_documents"] = snapshot.delta_size()
+        stats["delta_segments"] = len(snapshot.segments)
+        return stats
+
+    # ---------------------------------------------------------------------
+    # Writes
+    # ---------------------------------------------------------------------
+
+    def _contains(self, i: int) -> bool:
+        return i in self._pending or (
+            i in self._snapshot.main._positions and i not in self._removed
+        )
+
+    def _maybe_merge(self) -> None:
+        if len(self._pending) + len(self._removed) >= self.merge_threshold:
+            self._merge()
+
+    def _merge(self) -> None:
+        main = self._snapshot.main
+        if not self._pending and not self._removed:
+            return
+        if self._pending and not main._base.is_trained:
+            if len(self._pending) < _min_training_vectors(main._base):
+                # Keep serving from the delta until there is enough to train on.
+                return
+        merged = main._fork()
+        merged.delete(ids=list(self._removed))
+        if self._pending:
+            merged._add_vectors(
+                np.stack([vector for vector, _, _ in self._pending.values()]),
+                [doc for _, doc, _ in self._pending.values()],
+                list(self._pending),
+                [metadata for _, _, metadata in self._pending.values()],
+            )
+        self._pending = {}
+        self._segment_of = {}
+        self._segments = ()
+        self._removed = set()
+        self._publish(merged)
+
+    def _vectors(self, docs: List[str]) -> "np.ndarray":
+        main = self._snapshot.main
+        vectors = np.array(main._embed(docs), dtype=np.float32, order="C")
+        if main.metric == "IP":
+            faiss.normalize_L2(vectors)
+        return vectors
+
+    def save(self, value: str, metadata: Optional[dict] = None) -> None:
+        self.save_docs([value], [metadata] if metadata else None)
+
+    def save_docs(
+        self, docs: List[str], metadatas: Optional[List[Optional[dict]]] = None
+    ) -> "ConcurrentFAISSStore":
+        """Save documents, skipping stored ones; embedding happens outside the lock."""
+        if metadatas is not None and len(metadatas) != len(docs):
+            raise ValueError("docs and metadatas must have the same length")
+        new = {}
+        for pos, doc in enumerate(docs):
+            i = doc_id(doc)
+            if i not in new and not self._contains(i):
+                new[i] = (doc, metadatas[pos] if metadatas else None)
+        if not new:
+            return self
+        vectors = self._vectors([doc for doc, _ in new.values()])
+        with self._write_lock:
+            added = []
+            for (i, (doc, metadata)), vector in zip(new.items(), vectors):
+                if not self._contains(i):
+                    self._pending[i] = (vector, doc, metadata)
+                    added.append(i)
+            if added:
+                self._add_segment(added)
+                self._publish(self._snapshot.main)
+                self._maybe_merge()
+        return self
+
+    def upsert_docs(
+        self,
+        docs: List[str],
+        ids: Optional[List[int]] = None,
+        metadatas: Optional[List[Optional[dict]]] = None,
+    ) -> "ConcurrentFAISSStore":
+        """Insert documents or replace the documents stored under their ids.
+
+        Unlike `FAISSStore.upsert_docs`, a metadata update re-embeds the document.
+        """
+        if ids is None:
+            ids = [doc_id(doc) for doc in docs]
+        if len(ids) != len(docs):
+            raise ValueError("docs and ids must have the same length")
+        if metadatas is not None and len(metadatas) != len(docs):
+            raise ValueError("docs and metadatas must have the same length")
+        latest = {
+            int(i): (doc, metadatas[pos] if metadatas else None)
+            for pos, (i, doc) in enumerate(zip(ids, docs))
+        }
+        if metadatas is None:
+            stored = self.get_texts(list(latest))
+            latest = {
+                i: value for (i, value), text in zip(latest.items(), stored) if text != value[0]
+            }
+        if not latest:
+            return self
+        vectors = self._vectors([doc for doc, _ in latest.values()])
+        with self._write_lock:
+            main = self._snapshot.main
+            for (i, (doc, metadata)), vector in zip(latest.items(), vectors):
+                if i in main._positions:
+                    self._removed.add(i)
+                if i in self._pending:
+                    self._forget_pending(i)
+                self._pending[i] = (vector, doc, metadata)
+            self._add_segment(list(latest))
+            self._publish(main)
+            self._maybe_merge()
+        return self
+
+    def delete(
+        self,
+        ids: Optional[Iterable[int]] = None,
+        docs: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Delete documents by id or by content and return how many were removed."""
+        targets = [int(i) for i in ids or []]
+        targets.extend(doc_id(doc) for doc in docs or [])
+        with self._write_lock:
+            removed = 0
+            main = self._snapshot.main
+            for i in targets:
+                if not self._contains(i):
+                    continue
+                if i in self._pending:
+                    self._forget_pending(i)
+                if i in main._positions:
+                    self._removed.add(i)
+                removed += 1
+            if removed:
+                self._publish(main)
+                self._maybe_merge()
+        return removed
+
+    def merge(self) -> None:
+        """Merge the delta into a new main index and swap it in."""
+        with self._write_lock:
+            self._merge()
+
+    def reset(self) -> None:
+        with self._write_lock:
+            # A fresh store: the published one, its collections and their
+            # files stay untouched for the searches still reading it.
+            self._pending = {}
+            self._segment_of = {}
+            self._segments = ()
+            self._removed = set()
+            self._publish(self._snapshot.main._new_collection())
+
+    def save_to_disk(self, path: str) -> None:
+        """Merge pending changes and save the main store."""
+        with self._write_lock:
+            self._merge()
+            self._snapshot.main.save_to_disk(path)
@@ -1,4 +1,4 @@
-from .crypto import decrypt, encrypt
+from .crypto import decrypt, decrypt_file, encrypt
 from .download import download_file
 
-__all__ = ["encrypt", "decrypt", "download_file"]
+__all__ = ["encrypt", "decrypt", "decrypt_file", "download_file"]
@@ -12,4 +12,14 @@ def encrypt(data: bytes, password: str) -> bytes:
 def decrypt(data: bytes, password: str) -> bytes:
     gpg = gnupg.GPG()
     decrypted_data = gpg.decrypt(data, passphrase=password)
+    if not decrypted_data.ok:
+        raise ValueError(f"Decryption failed: {decrypted_data.status}")
     return decrypted_data.data
+
+
+def decrypt_file(path: str, password: str, output: str) -> None:
+    """Decrypt the file at `path` into `output` without reading it into memory."""
+    gpg = gnupg.GPG()
+    result = gpg.decrypt_file(path, passphrase=password, output=output)
+    if not result.ok:
+        raise ValueError(f"Decryption failed: {result.status}")
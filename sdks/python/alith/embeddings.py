@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 from abc import ABC, abstractmethod
+from importlib.util import find_spec
 from pathlib import Path
 from typing import List, Optional, Union
 
@@ -68,17 +69,9 @@ class Embeddings(ABC):
         return results
 
 
-try:
-    from fastembed_gpu import TextEmbedding  # type: ignore
-
-    FASTEMBED_AVAILABLE = True
-except ImportError:
-    try:
-        from fastembed import TextEmbedding
-
-        FASTEMBED_AVAILABLE = True
-    except ImportError:
-        FASTEMBED_AVAILABLE = False
+# The embedding backends are imported when a model is created, not with
+# the package; the flags only check that they are installed.
+FASTEMBED_AVAILABLE = any(find_spec(name) for name in ("fastembed_gpu", "fastembed"))
 
 
 class FastEmbeddings(Embeddings):
@@ -100,6 +93,10 @@ class FastEmbeddings(Embeddings):
                 "FastEmbed is not installed. Please install it with: "
                 "python3 -m pip install fastembed or python3 -m pip install fastembed-gpu for GPU support"
             )
+        try:
+            from fastembed_gpu import TextEmbedding  # type: ignore
+        except ImportError:
+            from fastembed import TextEmbedding
 
         self.model = TextEmbedding(
             model_name=model_name,
@@ -120,21 +117,20 @@ class FastEmbeddings(Embeddings):
         return embeddings
 
 
-try:
-    from pymilvus import model
-
-    MILVUS_AVAILABLE = True
-except ImportError:
-    MILVUS_AVAILABLE = False
+MILVUS_AVAILABLE = find_spec("pymilvus") is not None
 
 
 class MilvusEmbeddings(Embeddings):
     def __init__(self):
-        if not MILVUS_AVAILABLE:
+        try:
+            if not MILVUS_AVAILABLE:
+                raise ImportError("pymilvus")
+            from pymilvus import model
+        except ImportError:
             raise ImportError(
                 "pymilvus is not installed. Please install it with: "
                 "python3 -m pip install pymilvus pymilvus[model]"
-            )
+            ) from None
         self.model = model.DefaultEmbeddingFunction()
         self.embedding_fn = self.model
 
@@ -216,20 +212,20 @@ class OllamaEmbeddings(Embeddings):
         return embeddings
 
 
-# CLIP embeddings support
-try:
+# CLIP embeddings support; torch and clip are imported by the first `ClipEmbeddings`.
+CLIP_AVAILABLE = all(find_spec(name) for name in ("clip", "numpy", "torch", "PIL"))
+clip = None  # type: ignore
+torch = None  # type: ignore
+np = None  # type: ignore
+PILImage = None  # type: ignore
+
+
+def _import_clip() -> None:
+    global clip, np, torch, PILImage
     import clip
     import numpy as np
     import torch
     from PIL import Image as PILImage
-    
-    CLIP_AVAILABLE = True
-except ImportError:
-    CLIP_AVAILABLE = False
-    clip = None  # type: ignore
-    torch = None  # type: ignore
-    np = None  # type: ignore
-    PILImage = None  # type: ignore
 
 
 class ClipEmbeddings(Embeddings):
@@ -257,6 +253,7 @@ class ClipEmbeddings(Embeddings):
                 "CLIP is not installed. Install with: pip install -e \".[multimodal]\" "
                 "(local) or pip install \"alith[multimodal]\" (PyPI)"
             )
+        _import_clip()
         
         self.model_name = model_name
         self.device_str = device
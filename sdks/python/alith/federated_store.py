@@ -0,0 +1,182 @@
+import functools
+import threading
+import time
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .store import Store, _locked, doc_id
+
+
+def _rank_scored(store: Store, query: str, limit: int, score_threshold: float) -> List[tuple]:
+    docs = store.search(query, limit, score_threshold)
+    # Without scores, fall back to a rank-derived score for weighted fusion.
+    return [(doc, 1.0 / (rank + 1)) for rank, doc in enumerate(docs)]
+
+
+def _scored_search(store: Store, query: str, limit: int, score_threshold: float) -> List[tuple]:
+    """(document, score) hits of one store; calls on stores that are not thread safe are serialized."""
+    if hasattr(store, "search_with_scores"):
+        call = functools.partial(store.search_with_scores, query, limit, score_threshold)
+    else:
+        call = functools.partial(_rank_scored, store, query, limit, score_threshold)
+    if store.thread_safe:
+        return call()
+    return _locked(store._call_lock(), call)
+
+
+class FederatedStore(Store):
+    """Searches several stores concurrently and merges their results.
+
+    Every search fans out to all `stores` on a thread pool and waits at most
+    `timeout` seconds (one value, or one per store) for each of them; stores
+    that miss their deadline or fail are left out of that result, counted in
+    `missed` and reported with a warning, so retrieval takes as long as the slowest store within its
+    deadline rather than the sum of all of them. Scores from different
+    backends are not comparable, so they are fused like in `HybridStore`:
+    with a weighted sum of min-max normalized scores (``fusion="weighted"``)
+    or reciprocal rank fusion (``fusion="rrf"``). A document found by several
+    stores is returned once. `score_threshold` applies to each store.
+
+    A search that missed its deadline keeps running until the store returns;
+    until then the store is left out of new searches (and counted in
+    `missed`), so a hanging store holds at most one worker of the pool.
+    Writes (`save`, `save_docs`) go to the store at index `primary`. Call
+    `close`, or use the store as a context manager, to stop the pool.
+    """
+
+    thread_safe = True
+
+    def __init__(
+        self,
+        stores: Sequence[Store],
+        timeout: Union[float, Sequence[Optional[float]], None] = 1.0,
+        fusion: str = "weighted",
+        weights: Optional[Sequence[float]] = None,
+        rrf_k: int = 60,
+        candidates: int = 10,
+        max_workers: Optional[int] = None,
+        primary: int = 0,
+    ):
+        if not stores:
+            raise ValueError("at least one store is required")
+        if fusion not in ("rrf", "weighted"):
+            raise ValueError("fusion must be either 'rrf' or 'weighted'")
+        timeouts = list(timeout) if isinstance(timeout, (list, tuple)) else [timeout] * len(stores)
+        if len(timeouts) != len(stores):
+            raise ValueError("timeout must be a single value or one per store")
+        if weights is not None and len(weights) != len(stores):
+            raise ValueError("weights must have one value per store")
+        if not 0 <= primary < len(stores):
+            raise ValueError("primary must be the index of one of the stores")
+        self.stores = list(stores)
+        self.timeouts = timeouts
+        self.fusion = fusion
+        self.weights = list(weights) if weights is not None else [1.0] * len(stores)
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+        self.primary = primary
+        self.missed = [0] * len(stores)
+        # Per store, a search that outlived its deadline and is still running.
+        self._stragglers: List[Optional[Future]] = [None] * len(stores)
+        self._lock = threading.Lock()
+        # Every store can have a straggler and a search in flight at once.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or 2 * len(stores), thread_name_prefix="alith-federated"
+        )
+
+    def _gather(self, query: str, limit: int, score_threshold: float) -> List[Optional[List[tuple]]]:
+        """Per-store results, None for the stores that failed or missed their deadline."""
+        start = time.monotonic()
+        with self._lock:
+            busy = [f is not None and not f.done() for f in self._stragglers]
+        futures = [
+            None if busy[index] else self._executor.submit(
+                _scored_search, store, query, limit, score_threshold
+            )
+            for index, store in enumerate(self.stores)
+        ]
+        deadlines = [float("inf") if t is None else start + t for t in self.timeouts]
+        results: List[Optional[List[tuple]]] = [None] * len(self.stores)
+        for index in sorted(range(len(self.stores)), key=deadlines.__getitem__):
+            future = futures[index]
+            if future is None:
+                self.missed[index] += 1
+                continue
+            remaining = deadlines[index] - time.monotonic()
+            try:
+                results[index] = future.result(
+                    timeout=None if remaining == float("inf") else max(remaining, 0.0)
+                )
+            except Exception as e:
+                if future.done():
+                    warnings.warn(f"Store {index} ({type(self.stores[index]).__name__}) failed: {e}")
+                else:
+                    warnings.warn(
+                        f"Store {index} ({type(self.stores[index]).__name__}) missed its "
+                        f"{self.timeouts[index]}s deadline and was left out of the results"
+                    )
+                    if not future.cancel():
+                        with self._lock:
+                            self._stragglers[index] = future
+                self.missed[index] += 1
+        return results
+
+    def search_with_scores(
+        self, query: str, limit: int = 3, score_threshold: float = 0.4
+    ) -> List[Tuple[str, float]]:
+        """Search every store and return fused (document, score) pairs, best first."""
+        results = self._gather(query, max(self.candidates, limit), score_threshold)
+        texts: Dict[int, str] = {}
+        fused: Dict[int, float] = {}
+        for hits, weight in zip(results, self.weights):
+            if not hits:
+                continue
+            ids = []
+            for text, _ in hits:
+                i = doc_id(text)
+                texts.setdefault(i, text)
+                ids.append(i)
+            if self.fusion == "rrf":
+                normalized = [1.0 / (self.rrf_k + rank + 1) for rank in range(len(ids))]
+            else:
+                scores = np.array([score for _, score in hits], dtype=np.float64)
+                spread = scores.max() - scores.min()
+                normalized = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+            best: Dict[int, float] = {}
+            for i, score in zip(ids, normalized):
+                best[i] = max(best.get(i, 0.0), float(score))
+            for i, score in best.items():
+                fused[i] = fused.get(i, 0.0) + weight * score
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(texts[i], score) for i, score in ranked]
+
+    def search(
+        self, query: str, limit: int = 3, score_threshold: float = 0.4
+    ) -> List[str]:
+        return [text for text, _ in self.search_with_scores(query, limit, score_threshold)]
+
+    def save(self, value: str, *args, **kwargs) -> None:
+        """Save a document to the `primary` store."""
+        self.stores[self.primary].save(value, *args, **kwargs)
+
+    def save_docs(self, docs: List[str], *args, **kwargs) -> "FederatedStore":
+        """Save documents to the `primary` store."""
+        self.stores[self.primary].save_docs(docs, *args, **kwargs)
+        return self
+
+    def reset(self) -> None:
+        for store in self.stores:
+            store.reset()
+
+    def close(self) -> None:
+        """Stop the search pool without waiting for searches still running."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "FederatedStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
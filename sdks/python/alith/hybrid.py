@@ -0,0 +1,275 @@
+import math
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .store import Store, doc_id
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; identifiers such as ``0x1a2b`` or ``ERR_42`` stay whole."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class _Postings:
+    """Growable array-backed postings list of (document ordinal, term frequency)."""
+
+    __slots__ = ("docs", "freqs", "size")
+
+    def __init__(self):
+        self.docs = np.empty(4, dtype=np.int32)
+        self.freqs = np.empty(4, dtype=np.float32)
+        self.size = 0
+
+    def append(self, ordinal: int, freq: int) -> None:
+        if self.size == len(self.docs):
+            # Grow into new arrays so concurrent readers keep a consistent view.
+            capacity = 2 * len(self.docs)
+            docs = np.empty(capacity, dtype=np.int32)
+            freqs = np.empty(capacity, dtype=np.float32)
+            docs[: self.size] = self.docs[: self.size]
+            freqs[: self.size] = self.freqs[: self.size]
+            self.docs, self.freqs = docs, freqs
+        self.docs[self.size] = ordinal
+        self.freqs[self.size] = freq
+        self.size += 1
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        size = self.size
+        return self.docs[:size], self.freqs[:size]
+
+
+class BM25Index:
+    """Incremental in-process BM25 inverted index keyed by document id."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.reset()
+
+    def reset(self) -> None:
+        self._postings: Dict[str, _Postings] = {}
+        self._doc_freqs: Counter = Counter()
+        self._texts: List[Optional[str]] = []
+        self._ids: List[int] = []
+        self._lengths = np.empty(16, dtype=np.float32)
+        self._ordinals: Dict[int, int] = {}
+        self._total_length = 0
+        self._deleted: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._ordinals
+
+    def add(self, docs: Iterable[str], ids: Optional[Iterable[int]] = None) -> None:
+        """Index documents; documents whose id is already indexed are skipped."""
+        docs = list(docs)
+        ids = [doc_id(doc) for doc in docs] if ids is None else [int(i) for i in ids]
+        for doc, i in zip(docs, ids):
+            if i in self._ordinals:
+                continue
+            ordinal = len(self._texts)
+            counts = Counter(tokenize(doc))
+            for term, freq in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.append(ordinal, freq)
+            self._doc_freqs.update(counts.keys())
+            length = sum(counts.values())
+            if ordinal == len(self._lengths):
+                lengths = np.empty(2 * ordinal, dtype=np.float32)
+                lengths[:ordinal] = self._lengths
+                self._lengths = lengths
+            self._lengths[ordinal] = length
+            self._total_length += length
+            self._texts.append(doc)
+            self._ids.append(i)
+            self._ordinals[i] = ordinal
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """Remove documents by id and return how many were removed."""
+        removed = 0
+        for i in ids:
+            ordinal = self._ordinals.pop(int(i), None)
+            if ordinal is None:
+                continue
+            text = self._texts[ordinal]
+            self._doc_freqs.subtract(set(tokenize(text)))
+            self._total_length -= int(self._lengths[ordinal])
+            self._texts[ordinal] = None
+            self._deleted.add(ordinal)
+            removed += 1
+        if len(self._deleted) > 0.25 * len(self._texts):
+            self.compact()
+        return removed
+
+    def compact(self) -> None:
+        """Rebuild the postings without deleted documents."""
+        live = [(text, i) for text, i in zip(self._texts, self._ids) if text is not None]
+        self.reset()
+        self.add([text for text, _ in live], [i for _, i in live])
+
+    def text(self, id: int) -> Optional[str]:
+        ordinal = self._ordinals.get(id)
+        return None if ordinal is None else self._texts[ordinal]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Return up to `limit` (document id, BM25 score) pairs, best first."""
+        num_docs = len(self._ordinals)
+        if num_docs == 0:
+            return []
+        size = len(self._texts)
+        lengths = self._lengths[:size]
+        norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / num_docs))
+        scores = np.zeros(size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            df = self._doc_freqs.get(term, 0)
+            if postings is None or df <= 0:
+                continue
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            docs, freqs = postings.view()
+            scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + norm[docs])
+        if self._deleted:
+            scores[list(self._deleted)] = 0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._ids[o], float(scores[o])) for o in candidates]
+
+
+class HybridStore(Store):
+    """Combines a vector `Store` with an in-process BM25 index.
+
+    Dense search misses exact identifiers (contract addresses, token names,
+    error codes) that keyword search finds, and the reverse for paraphrases.
+    Both retrievals run concurrently and are fused either with reciprocal rank
+    fusion (``fusion="rrf"``) or a weighted sum of min-max normalized scores
+    (``fusion="weighted"``). Both sides key documents by the same content-hash
+    chunk id, so they stay in sync. `score_threshold` applies to the dense side.
+
+    Documents already in `store` are indexed for keyword search when the
+    store exposes its `texts` (as `FAISSStore` does); for other stores call
+    `rebuild_bm25` with the documents, or BM25 only sees documents saved
+    through the `HybridStore`. Dense searches run on `executor`, by default
+    a pool with one worker per CPU shared by concurrent searches.
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        fusion: str = "rrf",
+        rrf_k: int = 60,
+        vector_weight: float = 0.5,
+        candidates: int = 20,
+        k1: float = 1.5,
+        b: float = 0.75,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        if fusion not in ("rrf", "weighted"):
+            raise ValueError("fusion must be either 'rrf' or 'weighted'")
+        self.store = store
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.vector_weight = vector_weight
+        self.candidates = candidates
+        self.bm25 = BM25Index(k1=k1, b=b)
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=os.cpu_count(), thread_name_prefix="alith-hybrid"
+        )
+        if hasattr(store, "texts"):
+            self.rebuild_bm25()
+
+    def rebuild_bm25(self, docs: Optional[Iterable[str]] = None) -> None:
+        """Re-index `docs`, by default the `texts` of the vector store, for keyword search."""
+        if docs is None:
+            if not hasattr(self.store, "texts"):
+                raise TypeError(
+                    f"{type(self.store).__name__} does not expose its texts; pass the documents"
+                )
+            docs = self.store.texts
+        self.bm25.reset()
+        self.bm25.add(docs)
+
+    def _vector_search(self, query: str, limit: int, score_threshold: float):
+        if hasattr(self.store, "search_with_scores"):
+            return self.store.search_with_scores(query, limit, score_threshold)
+        docs = self.store.search(query, limit, score_threshold)
+        # Without scores, fall back to a rank-derived score for weighted fusion.
+        return [(doc, 1.0 / (rank + 1)) for rank, doc in enumerate(docs)]
+
+    def search_with_scores(
+        self, query: str, limit: int = 3, score_threshold: float = 0.4
+    ) -> List[Tuple[str, float]]:
+        """Search both indexes and return fused (document, score) pairs, best first."""
+        candidates = max(self.candidates, limit)
+        dense_future = self._executor.submit(
+            self._vector_search, query, candidates, score_threshold
+        )
+        sparse = self.bm25.search(query, candidates)
+        dense = dense_future.result()
+
+        texts: Dict[int, str] = {}
+        dense_hits = []
+        for text, score in dense:
+            i = doc_id(text)
+            texts[i] = text
+            dense_hits.append((i, score))
+        for i, _ in sparse:
+            if i not in texts:
+                texts[i] = self.bm25.text(i)
+
+        fused: Dict[int, float] = {}
+        if self.fusion == "rrf":
+            for hits, weight in ((dense_hits, self.vector_weight), (sparse, 1 - self.vector_weight)):
+                for rank, (i, _) in enumerate(hits):
+                    fused[i] = fused.get(i, 0.0) + 2 * weight / (self.rrf_k + rank + 1)
+        else:
+            for hits, weight in ((dense_hits, self.vector_weight), (sparse, 1 - self.vector_weight)):
+                if not hits:
+                    continue
+                scores = np.array([score for _, score in hits], dtype=np.float64)
+                spread = scores.max() - scores.min()
+                normalized = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+                for (i, _), score in zip(hits, normalized):
+                    fused[i] = fused.get(i, 0.0) + weight * float(score)
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(texts[i], score) for i, score in ranked]
+
+    def search(
+        self, query: str, limit: int = 3, score_threshold: float = 0.4
+    ) -> List[str]:
+        return [text for text, _ in self.search_with_scores(query, limit, score_threshold)]
+
+    def save(self, value: str) -> None:
+        self.save_docs([value])
+
+    def save_docs(self, docs: List[str]) -> "HybridStore":
+        """Save documents to the vector store and index them for keyword search."""
+        if not docs:
+            return self
+        self.store.save_docs(docs)
+        self.bm25.add(docs)
+        return self
+
+    def delete(self, docs: List[str]) -> int:
+        """Delete documents from both indexes; the vector store must support `delete`."""
+        if not hasattr(self.store, "delete"):
+            raise NotImplementedError(f"{type(self.store).__name__} does not support delete")
+        ids = [doc_id(doc) for doc in docs]
+        self.store.delete(ids=ids)
+        return self.bm25.delete(ids)
+
+    def reset(self) -> None:
+        self.store.reset()
+        self.bm25.reset()
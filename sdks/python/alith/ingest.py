@@ -0,0 +1,559 @@
+import inspect
+from abc import ABC, abstractmethod
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .embeddings import Embeddings
+from .store import Store, doc_id
+
+
+@dataclass
+class Document:
+    """A loaded document; `source` identifies what produced it for checkpointing."""
+
+    text: str
+    source: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class Loader(ABC):
+    """Produces documents grouped by source.
+
+    `sources` lists the source keys cheaply, `load` reads one of them. A
+    source whose documents were all stored is skipped on a resumed run
+    without being loaded again.
+    """
+
+    @abstractmethod
+    def sources(self) -> Iterable[str]:
+        """Lists the keys of the sources this loader reads."""
+        pass
+
+    @abstractmethod
+    def load(self, source: str) -> Iterable[Document]:
+        """Reads the documents of one source."""
+        pass
+
+
+def _expand_paths(paths: Union[str, Path, Sequence[Union[str, Path]]], patterns: Sequence[str]) -> List[Path]:
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found = {f for pattern in patterns for f in path.rglob(pattern) if f.is_file()}
+            files.extend(sorted(found))
+        else:
+            files.append(path)
+    return files
+
+
+def _file_source(path: Path) -> str:
+    # Include the modification time so edited files are ingested again.
+    return f"{path.absolute()}@{path.stat().st_mtime_ns}"
+
+
+def _source_path(source: str) -> str:
+    return source.rsplit("@", 1)[0]
+
+
+class FileLoader(Loader):
+    """Loads text files, and PDFs when PyPDF2 is installed, one document per file."""
+
+    def __init__(
+        self,
+        paths: Union[str, Path, Sequence[Union[str, Path]]],
+        patterns: Sequence[str] = ("*.txt", "*.md", "*.mdx", "*.rst", "*.pdf"),
+        encoding: str = "utf-8",
+    ):
+        self.paths = paths
+        self.patterns = patterns
+        self.encoding = encoding
+
+    def sources(self) -> Iterable[str]:
+        return [_file_source(path) for path in _expand_paths(self.paths, self.patterns)]
+
+    def load(self, source: str) -> Iterable[Document]:
+        path = Path(_source_path(source))
+        if path.suffix.lower() == ".pdf":
+            import PyPDF2
+
+            with open(path, "rb") as f:
+                text = "\n".join(page.extract_text() or "" for page in PyPDF2.PdfReader(f).pages)
+        else:
+            text = path.read_text(encoding=self.encoding, errors="replace")
+        if text.strip():
+            yield Document(text, source, {"source": str(path)})
+
+
+class JSONKnowledgeLoader(Loader):
+    """Loads JSON knowledge dumps such as ``knowledge/<name>/*.json``.
+
+    A file holds a list of items, or an object with the list under one of
+    `list_keys`; each item with a non-empty `content` becomes a document
+    prefixed by its title.
+    """
+
+    def __init__(
+        self,
+        paths: Union[str, Path, Sequence[Union[str, Path]]],
+        text_key: str = "content",
+        title_key: str = "title",
+        list_keys: Sequence[str] = ("blogs", "items", "data"),
+    ):
+        self.paths = paths
+        self.text_key = text_key
+        self.title_key = title_key
+        self.list_keys = list_keys
+
+    def sources(self) -> Iterable[str]:
+        return [_file_source(path) for path in _expand_paths(self.paths, ["*.json"])]
+
+    def load(self, source: str) -> Iterable[Document]:
+        path = _source_path(source)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = next((data[key] for key in self.list_keys if key in data), [])
+        for item in data:
+            text = item.get(self.text_key) or ""
+            if not text.strip():
+                continue
+            title = item.get(self.title_key) or ""
+            metadata = {"source": path}
+            if title:
+                metadata["title"] = title
+            if item.get("url"):
+                metadata["url"] = item["url"]
+            yield Document(f"{title}\n{text}" if title else text, source, metadata)
+
+
+_TAGS = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.DOTALL | re.IGNORECASE)
+
+
+class URLLoader(Loader):
+    """Fetches URLs with `requests`; HTML is reduced to its text."""
+
+    def __init__(self, urls: Sequence[str], timeout: float = 30.0):
+        self.urls = list(urls)
+        self.timeout = timeout
+
+    def sources(self) -> Iterable[str]:
+        return self.urls
+
+    def load(self, source: str) -> Iterable[Document]:
+        import html
+
+        import requests
+
+        response = requests.get(source, timeout=self.timeout)
+        response.raise_for_status()
+        text = response.text
+        if "html" in response.headers.get("content-type", ""):
+            text = html.unescape(_TAGS.sub(" ", text))
+            text = re.sub(r"[ \t]+", " ", text)
+            text = re.sub(r"\s*\n\s*", "\n", text).strip()
+        if text:
+            yield Document(text, source, {"source": source})
+
+
+@dataclass
+class IngestStats:
+    """Counters reported while a pipeline runs."""
+
+    documents: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    written: int = 0
+    skipped: int = 0
+    sources: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed if self.elapsed else 0.0
+
+
+class _Stopped(Exception):
+    pass
+
+
+_DONE = object()
+
+
+class _SourceTracker:
+    """Counts outstanding documents and chunks per source to know when a source is stored."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._documents: Dict[str, int] = {}
+        self._chunks: Dict[str, int] = {}
+        self._loaded: set = set()
+        # Sources of duplicate chunks, by the id of the first copy while it is unwritten.
+        self._waiting: Dict[int, List[str]] = {}
+        self.completed: List[str] = []
+
+    def _check(self, source: str) -> None:
+        if (
+            source in self._loaded
+            and self._documents.get(source, 0) == 0
+            and self._chunks.get(source, 0) == 0
+        ):
+            self._loaded.discard(source)
+            self._documents.pop(source, None)
+            self._chunks.pop(source, None)
+            self.completed.append(source)
+
+    def document_loaded(self, source: str) -> None:
+        with self._lock:
+            self._documents[source] = self._documents.get(source, 0) + 1
+
+    def source_loaded(self, source: str) -> None:
+        with self._lock:
+            self._loaded.add(source)
+            self._check(source)
+
+    def document_chunked(self, source: str, chunks: int) -> None:
+        with self._lock:
+            self._documents[source] -= 1
+            self._chunks[source] = self._chunks.get(source, 0) + chunks
+            self._check(source)
+
+    def _stored(self, source: str) -> None:
+        # A chunk can be stored before its document finished chunking.
+        self._chunks[source] = self._chunks.get(source, 0) - 1
+        self._check(source)
+
+    def chunks_queued(self, ids: Iterable[int]) -> None:
+        """Record chunks sent for writing; duplicates of them wait until they are written."""
+        with self._lock:
+            for i in ids:
+                self._waiting[i] = []
+
+    def chunk_duplicated(self, i: int, source: str) -> None:
+        """Record a skipped copy of chunk `i`, stored once the first copy is."""
+        with self._lock:
+            if i in self._waiting:
+                self._waiting[i].append(source)
+            else:
+                self._stored(source)
+
+    def chunks_stored(self, sources: Iterable[str], ids: Iterable[int] = ()) -> None:
+        with self._lock:
+            for source in sources:
+                self._stored(source)
+            for i in ids:
+                for source in self._waiting.pop(i, []):
+                    self._stored(source)
+
+    def take_completed(self) -> List[str]:
+        with self._lock:
+            completed, self.completed = self.completed, []
+            return completed
+
+
+def _default_chunker(text: str) -> List[str]:
+    from .chunking import chunk_text
+
+    return chunk_text(text)
+
+
+class IngestPipeline:
+    """Concurrent load → chunk → embed → store pipeline with bounded queues.
+
+    Loaders run on one thread, chunking on a pool of `chunk_workers`
+    threads, embedding on one thread in micro-batches of `embed_batch_size`
+    (by default the embeddings' own ``batch_size``, else 64), and store
+    writes on the calling thread in batches of `write_batch_size`. Every
+    queue holds at most `queue_size` items, so a slow stage throttles the
+    ones before it. Chunks already in the store, by content hash, are
+    skipped before embedding.
+
+    When the store accepts precomputed vectors (`save_vectors`) the pipeline
+    embeds them itself; otherwise chunks are handed to `save_docs`.
+
+    With a `checkpoint_path`, sources whose chunks are all stored are
+    recorded there (after `store_path` is saved, if given) at most every
+    `checkpoint_interval` seconds and at the end, and skipped on the next
+    run. `progress` is called with an `IngestStats` at most every
+    `progress_interval` seconds and once at the end.
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        embeddings: Optional[Embeddings] = None,
+        chunker: Optional[Callable[[str], List[str]]] = None,
+        chunk_workers: int = 4,
+        embed_batch_size: Optional[int] = None,
+        write_batch_size: int = 512,
+        queue_size: int = 1024,
+        checkpoint_path: Optional[str] = None,
+        store_path: Optional[str] = None,
+        checkpoint_interval: float = 5.0,
+        progress: Optional[Callable[[IngestStats], None]] = None,
+        progress_interval: float = 1.0,
+    ):
+        self.store = store
+        self.embeddings = embeddings or getattr(store, "embeddings", None)
+        self.chunker = chunker or _default_chunker
+        self.chunk_workers = chunk_workers
+        self.embed_batch_size = (
+            embed_batch_size or getattr(self.embeddings, "batch_size", None) or 64
+        )
+        self.write_batch_size = write_batch_size
+        self.queue_size = queue_size
+        self.checkpoint_path = checkpoint_path
+        self.store_path = store_path
+        self.checkpoint_interval = checkpoint_interval
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self._embeds = self.embeddings is not None and hasattr(store, "save_vectors")
+        self._with_metadata = "metadatas" in inspect.signature(store.save_docs).parameters
+
+    # ---------------------------------------------------------------------
+    # Checkpoints
+    # ---------------------------------------------------------------------
+
+    def _read_checkpoint(self) -> set:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, "r") as f:
+            return set(json.load(f)["completed"])
+
+    def _write_checkpoint(self, completed: set) -> None:
+        if self.store_path and hasattr(self.store, "save_to_disk"):
+            self.store.save_to_disk(self.store_path)
+        if not self.checkpoint_path:
+            return
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"completed": sorted(completed)}, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    # ---------------------------------------------------------------------
+    # Stages
+    # ---------------------------------------------------------------------
+
+    def _put(self, q: queue.Queue, item) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _get(self, q: queue.Queue, timeout: Optional[float] = None):
+        """Next item of `q`; with a `timeout`, None when nothing arrived in time."""
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                return q.get(timeout=timeout or 0.1)
+            except queue.Empty:
+                if timeout is not None:
+                    return None
+
+    def _stage(self, fn, *args) -> threading.Thread:
+        def run():
+            try:
+                fn(*args)
+            except _Stopped:
+                pass
+            except BaseException as e:
+                self._errors.append(e)
+                self._stop.set()
+
+        thread = threading.Thread(target=run, name=f"alith-ingest-{fn.__name__}", daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self, loaders: List[Loader], done: set, documents: queue.Queue) -> None:
+        for loader in loaders:
+            for source in loader.sources():
+                if source in done:
+                    continue
+                for document in loader.load(source):
+                    self._tracker.document_loaded(source)
+                    self._stats.documents += 1
+                    self._put(documents, document)
+                self._tracker.source_loaded(source)
+        self._put(documents, _DONE)
+
+    def _chunk(self, documents: queue.Queue, chunks: queue.Queue) -> None:
+        slots = threading.Semaphore(2 * self.chunk_workers)
+
+        def chunk(document: Document) -> None:
+            try:
+                pieces = [piece for piece in self.chunker(document.text) if piece.strip()]
+                for index, piece in enumerate(pieces):
+                    self._put(chunks, (piece, document.source, {**document.metadata, "chunk": index}))
+                self._tracker.document_chunked(document.source, len(pieces))
+            except _Stopped:
+                pass
+            except BaseException as e:
+                self._errors.append(e)
+                self._stop.set()
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(self.chunk_workers, thread_name_prefix="alith-chunk") as pool:
+            while True:
+                document = self._get(documents)
+                if document is _DONE:
+                    break
+                while not slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        raise _Stopped
+                pool.submit(chunk, document)
+        self._put(chunks, _DONE)
+
+    def _embed(self, chunks: queue.Queue, batches: queue.Queue) -> None:
+        seen = set()
+        lookup = getattr(self.store, "get_texts", None)
+        batch: List[tuple] = []
+
+        def flush() -> None:
+            if not batch:
+                return
+            ids = [doc_id(text) for text, _, _ in batch]
+            stored = lookup(ids) if lookup else [None] * len(ids)
+            fresh, skipped = [], []
+            for item, i, text in zip(batch, ids, stored):
+                if text is not None:
+                    skipped.append(item[1])
+                elif i in seen:
+                    # The first copy may still be on its way to the store.
+                    self._stats.skipped += 1
+                    self._tracker.chunk_duplicated(i, item[1])
+                else:
+                    seen.add(i)
+                    self._tracker.chunks_queued([i])
+                    fresh.append(item)
+            self._stats.skipped += len(skipped)
+            self._tracker.chunks_stored(skipped)
+            batch.clear()
+            if not fresh:
+                return
+            vectors = None
+            if self._embeds:
+                vectors = np.array(
+                    self.embeddings.embed_texts([text for text, _, _ in fresh]), dtype=np.float32
+                )
+                self._stats.embedded += len(fresh)
+            self._put(batches, (fresh, vectors))
+
+        while True:
+            # Wait briefly for a full micro-batch, then embed what has arrived.
+            item = self._get(chunks, timeout=0.05) if batch else self._get(chunks)
+            if item is None:
+                flush()
+                continue
+            if item is _DONE:
+                break
+            self._stats.chunks += 1
+            batch.append(item)
+            if len(batch) >= self.embed_batch_size:
+                flush()
+        flush()
+        self._put(batches, _DONE)
+
+    def _write(self, items: List[tuple], vectors: List["np.ndarray"]) -> None:
+        texts = [text for text, _, _ in items]
+        metadatas = [metadata for _, _, metadata in items]
+        if vectors:
+            self.store.save_vectors(np.concatenate(vectors), texts, metadatas)
+        elif self._with_metadata:
+            self.store.save_docs(texts, metadatas)
+        else:
+            self.store.save_docs(texts)
+        self._stats.written += len(items)
+        self._tracker.chunks_stored(
+            [source for _, source, _ in items], [doc_id(text) for text in texts]
+        )
+
+    # ---------------------------------------------------------------------
+    # Running
+    # ---------------------------------------------------------------------
+
+    def run(self, loaders: Union[Loader, Iterable[Loader]]) -> IngestStats:
+        """Ingest every source of `loaders` not completed by a previous run."""
+        loaders = [loaders] if isinstance(loaders, Loader) else list(loaders)
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._tracker = _SourceTracker()
+        self._stats = stats = IngestStats()
+        completed = self._read_checkpoint()
+        documents: queue.Queue = queue.Queue(self.queue_size)
+        chunks: queue.Queue = queue.Queue(self.queue_size)
+        batches: queue.Queue = queue.Queue(max(1, self.queue_size // self.embed_batch_size))
+
+        start = time.perf_counter()
+        last_progress = last_checkpoint = start
+        threads = [
+            self._stage(self._load, loaders, completed, documents),
+            self._stage(self._chunk, documents, chunks),
+            self._stage(self._embed, chunks, batches),
+        ]
+        pending: List[tuple] = []
+        pending_vectors: List["np.ndarray"] = []
+        try:
+            while True:
+                try:
+                    item = self._get(batches)
+                except _Stopped:
+                    break
+                finished = item is _DONE
+                if not finished:
+                    items, vectors = item
+                    pending.extend(items)
+                    if vectors is not None:
+                        pending_vectors.append(vectors)
+                if pending and (finished or len(pending) >= self.write_batch_size):
+                    self._write(pending, pending_vectors)
+                    pending, pending_vectors = [], []
+                now = time.perf_counter()
+                stats.elapsed = now - start
+                if finished or now - last_checkpoint >= self.checkpoint_interval:
+                    newly = self._tracker.take_completed()
+                    stats.sources += len(newly)
+                    if newly or finished:
+                        completed.update(newly)
+                        self._write_checkpoint(completed)
+                    last_checkpoint = now
+                if self.progress and (finished or now - last_progress >= self.progress_interval):
+                    self.progress(replace(stats))
+                    last_progress = now
+                if finished:
+                    break
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        if self._errors:
+            raise self._errors[0]
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+
+def ingest(
+    loaders: Union[Loader, Iterable[Loader]], store: Store, **kwargs
+) -> IngestStats:
+    """Run an `IngestPipeline` over `loaders` into `store`; see `IngestPipeline` for options."""
+    return IngestPipeline(store, **kwargs).run(loaders)
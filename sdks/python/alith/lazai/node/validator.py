@@ -9,11 +9,12 @@ import os
 import pathlib
 import sys
 import json
+import tempfile
 
 import rsa
 from fastapi import FastAPI, Response, status
 
-from alith.data import decrypt, download_file
+from alith.data import decrypt, decrypt_file, download_file
 from alith.lazai import Client, ProofData, ProofRequest
 
 # Logging configuration
@@ -41,13 +42,37 @@ app = FastAPI(title="Alith Validator Node", version="1.0.0")
 client = Client()
 
 
+def file_password(encryption_key: str) -> str:
+    """Recover the file password from the encryption_key hex format."""
+    priv_key = rsa.PrivateKey.load_pkcs1(rsa_private_key.strip().encode())
+    return rsa.decrypt(bytes.fromhex(encryption_key.removeprefix("0x")), priv_key).decode()
+
+
 def decrypt_file_url(url: str, encryption_key: str) -> bytes:
     """Download the encrypted file and use the encryption_key hex format to decrypt it."""
     file = download_file(url)
     content = pathlib.Path(file).read_bytes()
-    priv_key = rsa.PrivateKey.load_pkcs1(rsa_private_key.strip().encode())
-    password = rsa.decrypt(bytes.fromhex(encryption_key.removeprefix("0x")), priv_key)
-    return decrypt(content, password=password.decode())
+    return decrypt(content, password=file_password(encryption_key))
+
+
+def decrypt_file_url_to_path(url: str, encryption_key: str) -> str:
+    """Like `decrypt_file_url`, but decrypt into a temporary file and return its path.
+
+    Neither the encrypted nor the decrypted content is loaded into memory;
+    the caller removes the returned file.
+    """
+    file = download_file(url)
+    try:
+        fd, output = tempfile.mkstemp(suffix=".dec")
+        os.close(fd)
+        try:
+            decrypt_file(file, file_password(encryption_key), output)
+        except BaseException:
+            os.remove(output)
+            raise
+        return output
+    finally:
+        os.remove(file)
 
 
 @app.post("/proof")
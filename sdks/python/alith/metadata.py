@@ -0,0 +1,214 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Filter operators, following the `where` syntax of ChromaDB.
+_COMPARISONS = {
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(
+        value, (bool, np.bool_)
+    )
+
+
+# Marks the dictionary keys of unhashable values, e.g. lists and dicts.
+_UNHASHABLE = object()
+
+
+def _key(value: Any) -> Any:
+    """The dictionary-encoding key of `value`: itself, or its JSON text if unhashable."""
+    try:
+        hash(value)
+    except TypeError:
+        return (_UNHASHABLE, json.dumps(value, sort_keys=True, default=repr))
+    return value
+
+
+class MetadataColumn:
+    """One metadata field stored as a dense array.
+
+    Numeric fields are kept as float64 with NaN for missing values, any other
+    field is dictionary encoded into int32 codes with -1 for missing values.
+    Unhashable values such as lists are encoded by their JSON text, so equal
+    lists share a code and ``$eq`` / ``$in`` match them whole.
+    """
+
+    def __init__(self, numeric: bool):
+        self.numeric = numeric
+        self.integral = True
+        self.size = 0
+        self.data = np.empty(16, dtype=np.float64 if numeric else np.int32)
+        self.categories: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def _encode(self, value: Any):
+        if value is None:
+            return np.nan if self.numeric else -1
+        if self.numeric:
+            if not isinstance(value, (int, np.integer)):
+                self.integral = False
+            return float(value)
+        key = _key(value)
+        code = self._codes.get(key)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(value)
+            self._codes[key] = code
+        return code
+
+    def _decode(self, raw) -> Any:
+        if self.numeric:
+            if np.isnan(raw):
+                return None
+            return int(raw) if self.integral else float(raw)
+        return None if raw < 0 else self.categories[raw]
+
+    def _to_categorical(self) -> None:
+        values = [self._decode(raw) for raw in self.data[: self.size]]
+        self.numeric = False
+        self.data = np.empty(max(16, len(self.data)), dtype=np.int32)
+        self.size = 0
+        self.extend(values)
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed > len(self.data):
+            grown = np.empty(max(needed, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[: self.size] = self.data[: self.size]
+            self.data = grown
+
+    def extend(self, values: List[Any]) -> None:
+        if self.numeric and any(v is not None and not _is_number(v) for v in values):
+            self._to_categorical()
+        self._reserve(len(values))
+        for offset, value in enumerate(values):
+            self.data[self.size + offset] = self._encode(value)
+        self.size += len(values)
+
+    def set(self, pos: int, value: Any) -> None:
+        if self.numeric and value is not None and not _is_number(value):
+            self._to_categorical()
+        self.data[pos] = self._encode(value)
+
+    def get(self, pos: int) -> Any:
+        return self._decode(self.data[pos])
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Drop the rows where `mask` is False."""
+        kept = self.data[: self.size][mask]
+        self.data = np.empty(max(16, len(kept)), dtype=self.data.dtype)
+        self.data[: len(kept)] = kept
+        self.size = len(kept)
+
+    def compare(self, op: str, operand: Any) -> np.ndarray:
+        """Evaluate one filter operator over every row."""
+        values = self.data[: self.size]
+        if op in ("$eq", "$ne", "$in", "$nin"):
+            operands = operand if op in ("$in", "$nin") else [operand]
+            if not isinstance(operands, (list, tuple, set)):
+                raise ValueError(f"{op} expects a list, got {operand!r}")
+            if self.numeric:
+                encoded = [float(v) for v in operands if _is_number(v)]
+            else:
+                keys = [_key(v) for v in operands]
+                encoded = [self._codes[k] for k in keys if k in self._codes]
+            hits = np.isin(values, encoded)
+            return ~hits if op in ("$ne", "$nin") else hits
+        compare = _COMPARISONS.get(op)
+        if compare is None:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if self.numeric:
+            if not _is_number(operand):
+                return np.zeros(self.size, dtype=bool)
+            with np.errstate(invalid="ignore"):
+                return compare(values, float(operand))
+        # Evaluate once per distinct value, then broadcast through the codes.
+        matches = np.zeros(len(self.categories) + 1, dtype=bool)
+        for code, category in enumerate(self.categories):
+            try:
+                matches[code] = bool(compare(category, operand))
+            except TypeError:
+                pass
+        return matches[values]
+
+
+class MetadataTable:
+    """Columnar metadata aligned with the positions of a vector index."""
+
+    def __init__(self):
+        self.size = 0
+        self.columns: Dict[str, MetadataColumn] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.columns)
+
+    def extend(self, rows: List[Optional[dict]]) -> None:
+        for row in rows:
+            for key, value in (row or {}).items():
+                if key not in self.columns:
+                    column = MetadataColumn(numeric=_is_number(value))
+                    column.extend([None] * self.size)
+                    self.columns[key] = column
+        for key, column in self.columns.items():
+            column.extend([row.get(key) if row else None for row in rows])
+        self.size += len(rows)
+
+    def set_row(self, pos: int, row: Optional[dict]) -> None:
+        row = row or {}
+        for key, value in row.items():
+            if key not in self.columns:
+                column = MetadataColumn(numeric=_is_number(value))
+                column.extend([None] * self.size)
+                self.columns[key] = column
+        for key, column in self.columns.items():
+            column.set(pos, row.get(key))
+
+    def row(self, pos: int) -> dict:
+        result = {}
+        for key, column in self.columns.items():
+            value = column.get(pos)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def keep(self, mask: np.ndarray) -> None:
+        for column in self.columns.values():
+            column.keep(mask)
+        self.size = int(mask.sum())
+
+    def mask(self, where: dict) -> np.ndarray:
+        """Compile a `where` filter into a boolean mask over the rows.
+
+        Supports ``{"field": value}``, ``{"field": {"$op": operand}}`` with
+        ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in`` and
+        ``$nin``, and nesting with ``$and`` / ``$or``.
+        """
+        result = np.ones(self.size, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for sub in condition:
+                    result &= self.mask(sub)
+            elif key == "$or":
+                matched = np.zeros(self.size, dtype=bool)
+                for sub in condition:
+                    matched |= self.mask(sub)
+                result &= matched
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                column = self.columns.get(key)
+                for op, operand in condition.items():
+                    if column is None:
+                        # A field no document has: only negations can match.
+                        if op not in ("$ne", "$nin"):
+                            result[:] = False
+                    else:
+                        result &= column.compare(op, operand)
+        return result
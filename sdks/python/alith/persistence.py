@@ -0,0 +1,396 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# op, position, document id, text length, metadata length
+_RECORD = struct.Struct("<Bqqii")
+OP_ADD = 1
+OP_DELETE = 2
+OP_METADATA = 3
+OP_RESET = 4
+OP_DROP = 5
+# Change log only: marks a document as an image of an `ImageFAISSStore`.
+OP_IMAGE = 6
+
+# op, document id, collection name length, text length, metadata length
+_CHANGE = struct.Struct("<BqHii")
+
+
+def _map_file(path: str):
+    """Read-only memory map of `path`, or empty bytes for an empty file."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _replace(tmp: str, path: str) -> None:
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class DocumentList:
+    """Positional list of documents stored as UTF-8 blobs with offset arrays.
+
+    The first ``len(offsets) - 1`` documents live in a memory-mapped blob file
+    and are decoded on access, so only the pages that are actually read
+    become resident. Documents appended afterwards go into an in-memory blob,
+    so no Python object is kept per document. Deleted (None) and replaced
+    documents are recorded as overrides.
+    """
+
+    def __init__(self, blob=b"", offsets: Optional[np.ndarray] = None, deleted: Iterable[int] = ()):
+        self._blob = blob
+        self._offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+        self._base = len(self._offsets) - 1
+        self._overrides: Dict[int, Optional[str]] = {pos: None for pos in deleted}
+        self._tail_blob = bytearray()
+        self._tail_offsets = np.zeros(16, dtype=np.int64)
+        self._tail_size = 0
+
+    @classmethod
+    def open(cls, path: str, deleted: Iterable[int] = ()) -> "DocumentList":
+        offsets = np.load(f"{path}.offsets.npy", mmap_mode="r")
+        return cls(_map_file(f"{path}.texts"), offsets, deleted)
+
+    def __len__(self) -> int:
+        return self._base + self._tail_size
+
+    def __getitem__(self, pos: int) -> Optional[str]:
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError("document position out of range")
+        if pos in self._overrides:
+            return self._overrides[pos]
+        if pos < self._base:
+            start, end = self._offsets[pos], self._offsets[pos + 1]
+            return self._blob[start:end].decode("utf-8")
+        pos -= self._base
+        start, end = self._tail_offsets[pos], self._tail_offsets[pos + 1]
+        return self._tail_blob[start:end].decode("utf-8")
+
+    def __setitem__(self, pos: int, doc: Optional[str]) -> None:
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError("document position out of range")
+        self._overrides[pos] = doc
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for pos in range(len(self)):
+            yield self[pos]
+
+    def copy(self) -> "DocumentList":
+        docs = DocumentList(self._blob, self._offsets)
+        docs._overrides = dict(self._overrides)
+        docs._tail_blob = bytearray(self._tail_blob)
+        docs._tail_offsets = self._tail_offsets.copy()
+        docs._tail_size = self._tail_size
+        return docs
+
+    def append(self, doc: Optional[str]) -> None:
+        self.extend([doc])
+
+    def extend(self, docs: Iterable[Optional[str]]) -> None:
+        for doc in docs:
+            if self._tail_size + 2 > len(self._tail_offsets):
+                grown = np.zeros(2 * len(self._tail_offsets), dtype=np.int64)
+                grown[: self._tail_size + 1] = self._tail_offsets[: self._tail_size + 1]
+                self._tail_offsets = grown
+            if doc is None:
+                self._overrides[len(self)] = None
+            else:
+                self._tail_blob += doc.encode("utf-8")
+            self._tail_size += 1
+            self._tail_offsets[self._tail_size] = len(self._tail_blob)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the documents appended in this process."""
+        return len(self._tail_blob) + self._tail_offsets.nbytes
+
+
+def write_documents(path: str, docs) -> None:
+    """Write documents as a text blob plus an ``offsets`` array (deleted ones are empty)."""
+    offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    with open(f"{path}.texts.tmp", "wb") as f:
+        for pos, doc in enumerate(docs):
+            data = b"" if doc is None else doc.encode("utf-8")
+            f.write(data)
+            offsets[pos + 1] = offsets[pos] + len(data)
+    with open(f"{path}.offsets.tmp", "wb") as f:
+        np.save(f, offsets)
+    _replace(f"{path}.texts.tmp", f"{path}.texts")
+    _replace(f"{path}.offsets.tmp", f"{path}.offsets.npy")
+
+
+def write_manifest(path: str, manifest: dict) -> None:
+    with open(f"{path}.manifest.tmp", "w") as f:
+        json.dump(manifest, f)
+    _replace(f"{path}.manifest.tmp", f"{path}.manifest.json")
+
+
+def read_manifest(path: str) -> Optional[dict]:
+    if not os.path.exists(f"{path}.manifest.json"):
+        return None
+    with open(f"{path}.manifest.json", "r") as f:
+        return json.load(f)
+
+
+class WriteAheadLog:
+    """Append-only segment of the changes made since the last full save.
+
+    Each record is a fixed header followed by, for additions, the float32
+    vector, the UTF-8 text and the JSON metadata of the document.
+    """
+
+    def __init__(self, path: str, dimension: int):
+        self.path = f"{path}.wal"
+        self.dimension = dimension
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def append(self, records: Iterable[Tuple[int, int, int, Optional[np.ndarray], Optional[str], Optional[dict]]]) -> int:
+        """Append ``(op, position, id, vector, text, metadata)`` records; returns how many."""
+        count = 0
+        with open(self.path, "ab") as f:
+            for op, pos, i, vector, text, metadata in records:
+                data = b"" if text is None else text.encode("utf-8")
+                meta = b"" if not metadata else json.dumps(metadata, default=str).encode("utf-8")
+                f.write(_RECORD.pack(op, pos, i, len(data), len(meta)))
+                if op == OP_ADD:
+                    f.write(np.asarray(vector, dtype=np.float32).tobytes())
+                f.write(data)
+                f.write(meta)
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        return count
+
+    def read(self) -> Iterator[Tuple[int, int, int, Optional[np.ndarray], Optional[str], Optional[dict]]]:
+        """Yield the logged records, stopping at a torn record left by a crash."""
+        if not os.path.exists(self.path):
+            return
+        data = _map_file(self.path)
+        size = len(data)
+        vector_size = 4 * self.dimension
+        offset = 0
+        try:
+            while offset + _RECORD.size <= size:
+                op, pos, i, text_len, meta_len = _RECORD.unpack_from(data, offset)
+                end = offset + _RECORD.size + (vector_size if op == OP_ADD else 0) + text_len + meta_len
+                if end > size:
+                    break
+                cursor = offset + _RECORD.size
+                vector = None
+                if op == OP_ADD:
+                    vector = np.frombuffer(data[cursor:cursor + vector_size], dtype=np.float32)
+                    cursor += vector_size
+                text = data[cursor:cursor + text_len].decode("utf-8") if op == OP_ADD else None
+                cursor += text_len
+                metadata = json.loads(data[cursor:end]) if meta_len else None
+                yield op, pos, i, vector, text, metadata
+                offset = end
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+        if offset < size:
+            with open(self.path, "rb+") as f:
+                f.truncate(offset)
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def encode_changes(
+    records: Iterable[Tuple[int, Optional[str], int, Optional[np.ndarray], Optional[str], Optional[dict]]],
+) -> bytes:
+    """Serialize ``(op, collection, id, vector, text, metadata)`` change records."""
+    out = bytearray()
+    for op, collection, i, vector, text, metadata in records:
+        name = (collection or "").encode("utf-8")
+        data = b"" if text is None else text.encode("utf-8")
+        meta = b"" if metadata is None else json.dumps(metadata, default=str).encode("utf-8")
+        out += _CHANGE.pack(op, i, len(name), len(data), len(meta))
+        if op == OP_ADD:
+            out += np.asarray(vector, dtype=np.float32).tobytes()
+        out += name
+        out += data
+        out += meta
+    return bytes(out)
+
+
+def decode_changes(
+    data: bytes, dimension: int, offset: int = 0
+) -> Iterator[Tuple[int, Tuple[int, Optional[str], int, Optional[np.ndarray], Optional[str], Optional[dict]]]]:
+    """Yield ``(end offset, record)`` for the complete records in `data` after `offset`.
+
+    Stops at a record that is not fully written yet, so readers can tail a
+    file while it is being appended to.
+    """
+    vector_size = 4 * dimension
+    size = len(data)
+    while offset + _CHANGE.size <= size:
+        op, i, name_len, text_len, meta_len = _CHANGE.unpack_from(data, offset)
+        cursor = offset + _CHANGE.size
+        end = cursor + (vector_size if op == OP_ADD else 0) + name_len + text_len + meta_len
+        if end > size:
+            return
+        vector = None
+        if op == OP_ADD:
+            vector = np.frombuffer(data[cursor:cursor + vector_size], dtype=np.float32)
+            cursor += vector_size
+        collection = bytes(data[cursor:cursor + name_len]).decode("utf-8") or None
+        cursor += name_len
+        text = bytes(data[cursor:cursor + text_len]).decode("utf-8") if op == OP_ADD else None
+        cursor += text_len
+        metadata = json.loads(bytes(data[cursor:end])) if meta_len else None
+        yield end, (op, collection, i, vector, text, metadata)
+        offset = end
+
+
+class ChangeLog:
+    """Append-only log of the changes made to a store and its collections, for replicas.
+
+    Records carry everything needed to apply them without re-embedding:
+    additions include the vector, text and metadata of the document, deletes
+    and metadata updates refer to the document id. Every record has a
+    sequence number, counting from 1. The log is split into segment files
+    named after the sequence of their first record, so old segments can be
+    pruned once every replica has a newer snapshot. Appends are fsynced
+    before they return; readers only ever see whole records.
+    """
+
+    SUFFIX = ".changes"
+
+    def __init__(
+        self, directory: str, dimension: int, segment_records: int = 4096, writable: bool = True
+    ):
+        self.directory = directory
+        self.dimension = dimension
+        self.segment_records = segment_records
+        self.writable = writable
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        # Where the last `read` stopped, so tailing readers do not rescan segments.
+        self._cursor: Tuple[int, int, int] = (-1, 0, 0)
+        self.sequence = 0
+        if not writable:
+            # Readers tail a log another process appends to; leave its files alone.
+            return
+        os.makedirs(directory, exist_ok=True)
+        segments = self.segments()
+        self._segment = segments[-1] if segments else 1
+        self._segment_count = 0
+        if segments:
+            path = self._path(self._segment)
+            with open(path, "rb") as f:
+                data = f.read()
+            end = 0
+            for end, _ in decode_changes(data, dimension):
+                self._segment_count += 1
+            if end < len(data):
+                # Drop a record torn by a crash.
+                with open(path, "rb+") as f:
+                    f.truncate(end)
+        self.sequence = self._segment + self._segment_count - 1
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:016d}{self.SUFFIX}")
+
+    def segments(self) -> List[int]:
+        """First sequence number of every segment, in order."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            int(name[: -len(self.SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(self.SUFFIX)
+        )
+
+    def append(
+        self,
+        records: Iterable[Tuple[int, Optional[str], int, Optional[np.ndarray], Optional[str], Optional[dict]]],
+    ) -> int:
+        """Append ``(op, collection, id, vector, text, metadata)`` records; returns the last sequence."""
+        if not self.writable:
+            raise ValueError("This change log was opened for reading only")
+        records = list(records)
+        with self._lock:
+            while records:
+                if self._segment_count >= self.segment_records:
+                    self._segment += self._segment_count
+                    self._segment_count = 0
+                batch = records[: self.segment_records - self._segment_count]
+                records = records[len(batch):]
+                with open(self._path(self._segment), "ab") as f:
+                    f.write(encode_changes(batch))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._segment_count += len(batch)
+                self.sequence += len(batch)
+            return self.sequence
+
+    def read_raw(self, after: int = 0, max_bytes: int = 16 * 2**20) -> Tuple[bytes, int]:
+        """Encoded records following sequence `after`, and how many there are.
+
+        Stops after the record that brings the result past `max_bytes`.
+        """
+        with self._read_lock:
+            segments = self.segments()
+            if self._cursor[0] == after:
+                sequence, segment, offset = self._cursor
+            else:
+                starts = [start for start in segments if start <= after + 1]
+                if segments and not starts:
+                    raise ValueError(f"Changes after {after} were pruned; start from a newer snapshot")
+                segment = starts[-1] if starts else 1
+                sequence, offset = segment - 1, 0
+            chunks, size = [], 0
+            while size < max_bytes and os.path.exists(self._path(segment)):
+                with open(self._path(segment), "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                start = 0
+                for end, _ in decode_changes(data, self.dimension):
+                    sequence += 1
+                    if sequence > after:
+                        chunks.append(data[start:end])
+                        size += end - start
+                    start = end
+                    if size >= max_bytes:
+                        break
+                offset += start
+                if size >= max_bytes or sequence + 1 not in segments:
+                    break
+                # The writer moved on to the next segment, so this one is complete.
+                segment, offset = sequence + 1, 0
+            self._cursor = (sequence, segment, offset)
+            return b"".join(chunks), max(sequence - after, 0)
+
+    def read(
+        self, after: int = 0, max_bytes: int = 16 * 2**20
+    ) -> Iterator[Tuple[int, Tuple[int, Optional[str], int, Optional[np.ndarray], Optional[str], Optional[dict]]]]:
+        """Yield ``(sequence, record)`` for the records following sequence `after`."""
+        data, _ = self.read_raw(after, max_bytes)
+        for sequence, (_, record) in enumerate(decode_changes(data, self.dimension), after + 1):
+            yield sequence, record
+
+    def prune(self, sequence: int) -> int:
+        """Delete the segments holding only records up to `sequence`; returns how many."""
+        segments = self.segments()
+        removed = 0
+        for start, following in zip(segments, segments[1:]):
+            if following - 1 > sequence:
+                break
+            os.remove(self._path(start))
+            removed += 1
+        return removed
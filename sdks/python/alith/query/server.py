@@ -13,19 +13,24 @@ curl http://localhost:8000/query/rag \
 }'
 """
 
+import asyncio
+import contextlib
 import logging
+import os
 import sys
 import json
 import uvicorn
 import argparse
+from typing import Dict, Tuple
+from itertools import islice
 
 from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
 from alith.lazai import Client
 from alith.lazai.node.middleware import HeaderValidationMiddleware
-from alith.lazai.node.validator import decrypt_file_url
-from alith import MilvusStore, chunk_text
+from alith.lazai.node.validator import decrypt_file_url_to_path
+from alith import MilvusStore, chunk_stream
 from .types import QueryRequest
 from .settlement import QueryBillingMiddleware
 
@@ -41,6 +46,62 @@ client = Client()
 app = FastAPI(title="Alith LazAI Privacy Data Query Node", version="1.0.0")
 store = MilvusStore()
 collection_prefix = "query_"
+# Chunks saved per call while a file is ingested.
+ingest_batch_size = 512
+# One ingestion per collection at a time, so concurrent first queries for
+# the same file do not ingest it twice: the lock and how many requests use it.
+ingest_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking chain or file call without stalling the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+@contextlib.asynccontextmanager
+async def ingest_lock(collection_name: str):
+    """Hold the ingestion lock of `collection_name`, removing it once no request uses it."""
+    lock, users = ingest_locks.get(collection_name, (None, 0))
+    lock = lock or asyncio.Lock()
+    ingest_locks[collection_name] = (lock, users + 1)
+    try:
+        async with lock:
+            yield
+    finally:
+        lock, users = ingest_locks[collection_name]
+        if users == 1:
+            del ingest_locks[collection_name]
+        else:
+            ingest_locks[collection_name] = (lock, users - 1)
+
+
+async def ingest_file(file_id: int, file_url: str, collection_name: str) -> None:
+    """Decrypt the file and save its chunks into `collection_name`, batch by batch.
+
+    If anything fails the collection is dropped, so a partly ingested file
+    is not mistaken for an ingested one and the next query retries it.
+    """
+    encryption_key = await run_blocking(
+        client.get_file_permission, file_id, client.contract_config.data_registry_address
+    )
+    path = await run_blocking(decrypt_file_url_to_path, file_url, encryption_key)
+    try:
+        await store.acreate_collection(collection_name=collection_name)
+        chunks = chunk_stream(path)
+        while True:
+            batch = await run_blocking(list, islice(chunks, ingest_batch_size))
+            if not batch:
+                break
+            await store.asave_docs(batch, collection_name=collection_name)
+    except BaseException:
+        try:
+            await store.adrop_collection(collection_name)
+        except Exception as e:
+            logger.error(f"Dropping partly ingested collection {collection_name} failed: {e}")
+        raise
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
 
 
 @app.post("/query/rag")
@@ -48,9 +109,9 @@ async def query_rag(req: QueryRequest):
     try:
         file_id = req.file_id
         if req.file_url:
-            file_id = client.get_file_id_by_url(req.file_url)
+            file_id = await run_blocking(client.get_file_id_by_url, req.file_url)
         if file_id:
-            file = client.get_file(file_id)
+            file = await run_blocking(client.get_file, file_id)
         else:
             return Response(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -66,14 +127,10 @@ async def query_rag(req: QueryRequest):
         owner, file_url, file_hash = file[1], file[2], file[3]
         collection_name = collection_prefix + file_hash
         # Cache data in the vector database
-        if not store.has_collection(collection_name):
-            encryption_key = client.get_file_permission(
-                file_id, client.contract_config.data_registry_address
-            )
-            data = decrypt_file_url(file_url, encryption_key).decode("utf-8")
-            store.create_collection(collection_name=collection_name)
-            store.save_docs(chunk_text(data), collection_name=collection_name)
-        data = store.search_in(
+        async with ingest_lock(collection_name):
+            if not await store.ahas_collection(collection_name):
+                await ingest_file(file_id, file_url, collection_name)
+        data = await store.asearch_in(
             req.query, limit=req.limit, collection_name=collection_name
         )
         logger.info(f"Successfully processed request for file: {file}")
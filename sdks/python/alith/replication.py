@@ -0,0 +1,186 @@
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from .persistence import ChangeLog, decode_changes, read_manifest
+from .store import FAISSStore, _locked
+
+
+class ChangeLogServer:
+    """Serves a `ChangeLog` over HTTP so replicas on other hosts can tail it.
+
+    ``GET /changes?after=<sequence>`` returns the encoded records following
+    `sequence` (at most about `max_bytes` of them), with their count in the
+    ``X-Change-Count`` header and the last logged sequence in
+    ``X-Change-Sequence``. Changes that were already pruned answer with
+    ``410 Gone``. The server runs on a background thread; `port` 0 picks a
+    free port, see `url`.
+    """
+
+    def __init__(
+        self,
+        change_log: ChangeLog,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_bytes: int = 16 * 2**20,
+    ):
+        self.change_log = change_log
+        self.max_bytes = max_bytes
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                if url.path.rstrip("/") != "/changes":
+                    self.send_error(404)
+                    return
+                query = urllib.parse.parse_qs(url.query)
+                try:
+                    after = int(query.get("after", ["0"])[0])
+                    data, count = server.change_log.read_raw(after, server.max_bytes)
+                except ValueError as e:
+                    self.send_error(410, str(e))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-Change-Count", str(count))
+                self.send_header("X-Change-Sequence", str(server.change_log.sequence))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "ChangeLogServer":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="alith-changelog", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "ChangeLogServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _oldest_sequence(store: FAISSStore) -> int:
+    """The oldest `log_sequence` among the store and its collections."""
+    sequences = [store.log_sequence]
+    for name in store.list_collections():
+        collection = store._resident.get(name)
+        if collection is not None:
+            sequences.append(collection.log_sequence)
+        else:
+            manifest = read_manifest(store._collection_path(name))
+            sequences.append(manifest.get("log_sequence", 0) if manifest else 0)
+    return min(sequences)
+
+
+class StoreReplica:
+    """Keeps a `FAISSStore` up to date with the change log of a primary store.
+
+    `source` is either the `change_log_dir` of the primary, e.g. on a shared
+    volume, or the `url` of a `ChangeLogServer` in front of it. The replica
+    continues from `store.log_sequence`, or the oldest sequence of its
+    collections, so a new node loads a snapshot saved by the primary and only
+    applies the changes made after it; vectors come from the log, so nothing
+    is re-embedded. Call `pull` to catch up, or `start` to poll every
+    `poll_interval` seconds on a background thread. Changes are applied while
+    holding the store's call lock, so searches made through the async
+    methods never see a half-applied batch.
+    """
+
+    def __init__(
+        self,
+        store: FAISSStore,
+        source: str,
+        poll_interval: float = 1.0,
+        timeout: float = 10.0,
+        max_bytes: int = 16 * 2**20,
+    ):
+        self.store = store
+        self.source = source
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.sequence = _oldest_sequence(store)
+        self._remote = urllib.parse.urlsplit(source).scheme in ("http", "https")
+        self._log = None if self._remote else ChangeLog(source, store.dimension, writable=False)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _fetch(self) -> List[Tuple[int, tuple]]:
+        if self._log is not None:
+            return list(self._log.read(self.sequence, self.max_bytes))
+        url = f"{self.source.rstrip('/')}/changes?after={self.sequence}"
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                data = response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 410:
+                raise ValueError(e.reason) from e
+            raise
+        return [
+            (sequence, record)
+            for sequence, (_, record) in enumerate(
+                decode_changes(data, self.store.dimension), self.sequence + 1
+            )
+        ]
+
+    def pull(self) -> int:
+        """Apply every change logged since the last pull; returns how many."""
+        total = 0
+        while True:
+            changes = self._fetch()
+            if not changes:
+                return total
+            total += _locked(self.store._call_lock(), lambda: self.store.apply_changes(changes))
+            self.sequence = changes[-1][0]
+
+    def _poll(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.pull()
+            except Exception as e:
+                warnings.warn(f"Replicating {self.source} failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> "StoreReplica":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="alith-replica", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,223 @@
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .cache import LRUCache
+from .cached_store import normalize_query
+from .store import Store, doc_id
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+class CrossEncoder:
+    """ONNX cross-encoder scoring ``(query, document)`` pairs on the CPU.
+
+    `model_path` is an exported sequence-classification model, for example
+    ``cross-encoder/ms-marco-MiniLM-L-6-v2``, and `tokenizer_path` its
+    ``tokenizer.json``, by default the one next to the model. Pairs are
+    truncated to `max_length` tokens, sorted by length and run `batch_size`
+    at a time, each batch padded only to its longest pair.
+    """
+
+    def __init__(
+        self,
+        model_path: Union[str, Path],
+        tokenizer_path: Optional[Union[str, Path]] = None,
+        max_length: int = 256,
+        batch_size: int = 64,
+        threads: Optional[int] = None,
+    ):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError(
+                "onnxruntime is not installed. Please install it with: "
+                "python3 -m pip install onnxruntime tokenizers"
+            )
+        model_path = Path(model_path)
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(
+            str(tokenizer_path or model_path.with_name("tokenizer.json"))
+        )
+        padding = self.tokenizer.padding or {}
+        self._pad_id = padding.get("pad_id", 0)
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length, strategy="longest_first")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    def _feed(self, encodings: list) -> Dict[str, "np.ndarray"]:
+        width = max(len(encoding.ids) for encoding in encodings)
+        ids = np.full((len(encodings), width), self._pad_id, dtype=np.int64)
+        mask = np.zeros((len(encodings), width), dtype=np.int64)
+        types = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            size = len(encoding.ids)
+            ids[row, :size] = encoding.ids
+            mask[row, :size] = encoding.attention_mask
+            types[row, :size] = encoding.type_ids
+        feed = {"input_ids": ids, "attention_mask": mask, "token_type_ids": types}
+        return {name: array for name, array in feed.items() if name in self._inputs}
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]]) -> "np.ndarray":
+        """Relevance logits of ``(query, document)`` pairs, in input order."""
+        scores = np.empty(len(pairs), dtype=np.float32)
+        if not pairs:
+            return scores
+        encodings = self.tokenizer.encode_batch(list(pairs))
+        order = np.argsort([len(encoding.ids) for encoding in encodings], kind="stable")
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start : start + self.batch_size]
+            logits = self.session.run(None, self._feed([encodings[k] for k in batch]))[0]
+            # Single-logit models score directly; two-class ones use the positive class.
+            scores[batch] = np.asarray(logits, dtype=np.float32).reshape(len(batch), -1)[:, -1]
+        return scores
+
+    def score(self, query: str, docs: Sequence[str]) -> "np.ndarray":
+        return self.score_pairs([(query, doc) for doc in docs])
+
+
+class Reranker(Store):
+    """Reranks the candidates of another store with a cross-encoder.
+
+    A search takes the `fetch_k` best candidates of each query from `store`,
+    scores the ``(query, candidate)`` pairs missing from the pair cache in
+    one `score_pairs` call and returns the best `limit` by that score.
+    `fetch_k`, together with the model's `max_length` and `batch_size`,
+    bounds the work done per query. Pair scores are cached by normalized
+    query and document id, so they stay valid while the store changes.
+
+    `model` is a `CrossEncoder` or anything with the same `score_pairs`.
+    Other attributes are forwarded to the wrapped store.
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        model: CrossEncoder,
+        fetch_k: int = 20,
+        cache_size: int = 65536,
+        normalize: Callable[[str], str] = normalize_query,
+    ):
+        self.store = store
+        self.model = model
+        self.fetch_k = fetch_k
+        self.normalize = normalize
+        self._lock = threading.Lock()
+        self._scores = LRUCache(cache_size)
+
+    @property
+    def thread_safe(self) -> bool:
+        return self.store.thread_safe
+
+    def __getattr__(self, name: str):
+        if name == "store":
+            raise AttributeError(name)
+        return getattr(self.store, name)
+
+    def rerank(
+        self, queries: List[str], candidates: List[List[str]], limit: int
+    ) -> List[List[tuple]]:
+        """Order each query's candidates by cross-encoder score and keep `limit`."""
+        keys = [
+            [(self.normalize(query), doc_id(doc)) for doc in docs]
+            for query, docs in zip(queries, candidates)
+        ]
+        with self._lock:
+            scores = {key: self._scores.get(key) for row in keys for key in row}
+        missing = {}
+        for query, docs, row in zip(queries, candidates, keys):
+            for doc, key in zip(docs, row):
+                if scores[key] is None:
+                    missing.setdefault(key, (query, doc))
+        if missing:
+            fresh = self.model.score_pairs(list(missing.values())).tolist()
+            with self._lock:
+                for key, score in zip(missing, fresh):
+                    self._scores.put(key, score)
+                    scores[key] = score
+        results = []
+        for docs, row in zip(candidates, keys):
+            ranked = sorted(zip(docs, row), key=lambda pair: -scores[pair[1]])
+            results.append([(doc, scores[key]) for doc, key in ranked[:limit]])
+        return results
+
+    def _candidates(
+        self, queries: List[str], score_threshold: float, filter: Optional[dict]
+    ) -> List[List[str]]:
+        kwargs = {} if filter is None else {"filter": filter}
+        if len(queries) > 1 and hasattr(self.store, "search_batch"):
+            return self.store.search_batch(queries, self.fetch_k, score_threshold, **kwargs)
+        return [self.store.search(query, self.fetch_k, score_threshold, **kwargs) for query in queries]
+
+    def search_with_scores(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[tuple]:
+        """Search and return ``(document, cross-encoder score)`` pairs.
+
+        `score_threshold` and `filter` apply to the candidate search.
+        """
+        return self.rerank([query], self._candidates([query], score_threshold, filter), limit)[0]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[str]:
+        return [doc for doc, _ in self.search_with_scores(query, limit, score_threshold, filter)]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[List[str]]:
+        """Batch search; the pairs of all queries are scored in a single model call."""
+        if not queries:
+            return []
+        results = self.rerank(queries, self._candidates(queries, score_threshold, filter), limit)
+        return [[doc for doc, _ in hits] for hits in results]
+
+    def search_in(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        collection_name: Optional[str] = None,
+    ) -> List[str]:
+        candidates = self.store.search_in(
+            query, limit=self.fetch_k, score_threshold=score_threshold, collection_name=collection_name
+        )
+        return [doc for doc, _ in self.rerank([query], [candidates], limit)[0]]
+
+    def cache_stats(self) -> dict:
+        """Size, hit counts and hit rate of the pair score cache."""
+        with self._lock:
+            return self._scores.stats()
+
+    def save(self, value: str, *args, **kwargs) -> None:
+        self.store.save(value, *args, **kwargs)
+
+    def reset(self) -> None:
+        self.store.reset()
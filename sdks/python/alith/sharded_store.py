@@ -0,0 +1,325 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .embeddings import Embeddings
+from .store import FAISSStore, Store, doc_id
+
+
+class ShardedFAISSStore(Store):
+    """Partitions documents across several `FAISSStore` shards searched in parallel.
+
+    `partition` is ``"hash"`` (shard ``id % num_shards``, so an id's shard is
+    known without a lookup) or ``"round_robin"`` (new documents go to the
+    smallest shards, keeping them balanced). A search fans out to every shard
+    on a thread pool, FAISS releases the GIL while scanning, and the per-shard
+    top-k lists are merged. Remaining keyword arguments configure each shard.
+    """
+
+    def __init__(
+        self,
+        num_shards: int = 4,
+        dimension: int = 768,
+        embeddings: Optional[Embeddings] = None,
+        partition: str = "hash",
+        max_workers: Optional[int] = None,
+        **store_kwargs,
+    ):
+        if partition not in ("hash", "round_robin"):
+            raise ValueError("partition must be either 'hash' or 'round_robin'")
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self.dimension = dimension
+        self.embeddings = embeddings
+        self.partition = partition
+        self.max_workers = max_workers
+        self._store_kwargs = store_kwargs
+        self.shards: List[FAISSStore] = [self._new_shard() for _ in range(num_shards)]
+        self._executor = self._new_executor()
+        self._layout_generation = 0
+
+    def _new_shard(self) -> FAISSStore:
+        return FAISSStore(
+            dimension=self.dimension, embeddings=self.embeddings, **self._store_kwargs
+        )
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers or len(self.shards),
+            thread_name_prefix="alith-shard",
+        )
+
+    @property
+    def num_shards(self) -> int:
+        return len(self.shards)
+
+    @property
+    def generation(self) -> Tuple[int, ...]:
+        """Changes whenever a shard changes or shards are added or reloaded."""
+        return (self._layout_generation, *(shard.generation for shard in self.shards))
+
+    @property
+    def texts(self) -> List[str]:
+        """The stored documents, shard by shard."""
+        return [doc for shard in self.shards for doc in shard.texts]
+
+    def _map(self, fn, *args) -> list:
+        if len(self.shards) == 1:
+            return [fn(self.shards[0], *args)]
+        return list(self._executor.map(lambda shard: fn(shard, *args), self.shards))
+
+    def _shard_of(self, i: int) -> Optional[FAISSStore]:
+        if self.partition == "hash":
+            shard = self.shards[i % len(self.shards)]
+            if i in shard._positions:
+                return shard
+        # Ids placed before a shard was added, or round-robin placement.
+        for shard in self.shards:
+            if i in shard._positions:
+                return shard
+        return None
+
+    def _assign(self, ids: List[int]) -> "np.ndarray":
+        if self.partition == "hash":
+            return np.array([i % len(self.shards) for i in ids], dtype=np.int64)
+        sizes = np.array([len(shard._positions) for shard in self.shards])
+        targets = np.empty(len(ids), dtype=np.int64)
+        for pos in range(len(ids)):
+            targets[pos] = np.argmin(sizes)
+            sizes[targets[pos]] += 1
+        return targets
+
+    # ---------------------------------------------------------------------
+    # Search methods
+    # ---------------------------------------------------------------------
+
+    def _embed_queries(self, queries: List[str]) -> "np.ndarray":
+        return self.shards[0]._embed_queries(queries)
+
+    def search_vectors(
+        self,
+        query_vectors: "np.ndarray",
+        limit: int = 3,
+        score_threshold: Optional[float] = 0.4,
+        filter: Optional[dict] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Same as `FAISSStore.search_vectors`, merged across shards."""
+        results = self._map(
+            FAISSStore.search_vectors, query_vectors, limit, score_threshold, filter
+        )
+        ids = np.hstack([ids for ids, _ in results])
+        scores = np.hstack([scores for _, scores in results])
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :limit]
+        return np.take_along_axis(ids, order, 1), np.take_along_axis(scores, order, 1)
+
+    def get_texts(self, ids: Iterable[int]) -> List[Optional[str]]:
+        results = []
+        for i in ids:
+            shard = self._shard_of(int(i))
+            results.append(None if shard is None else shard._docs[shard._positions[int(i)]])
+        return results
+
+    def get_metadata(self, ids: Iterable[int]) -> List[Optional[dict]]:
+        results = []
+        for i in ids:
+            shard = self._shard_of(int(i))
+            results.append(None if shard is None else shard.get_metadata([i])[0])
+        return results
+
+    def search_with_scores(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[tuple]:
+        ids, scores = self.search_vectors(
+            self.shards[0]._embed_queries([query]), limit, score_threshold, filter
+        )
+        hits = [(i, score) for i, score in zip(ids[0].tolist(), scores[0].tolist()) if i >= 0]
+        texts = self.get_texts([i for i, _ in hits])
+        return [(text, score) for text, (_, score) in zip(texts, hits)]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[str]:
+        return [doc for doc, _ in self.search_with_scores(query, limit, score_threshold, filter)]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+    ) -> List[List[str]]:
+        if not queries:
+            return []
+        ids, _ = self.search_vectors(
+            self.shards[0]._embed_queries(queries), limit, score_threshold, filter
+        )
+        return [self.get_texts([i for i in row if i >= 0]) for row in ids.tolist()]
+
+    # ---------------------------------------------------------------------
+    # Store interface implementation
+    # ---------------------------------------------------------------------
+
+    def save(self, value: str, metadata: Optional[dict] = None) -> None:
+        self.save_docs([value], [metadata] if metadata else None)
+
+    def save_docs(
+        self, docs: List[str], metadatas: Optional[List[Optional[dict]]] = None
+    ) -> "ShardedFAISSStore":
+        """Embed new documents in one batch and add each to its shard."""
+        if metadatas is not None and len(metadatas) != len(docs):
+            raise ValueError("docs and metadatas must have the same length")
+        new: Dict[int, Tuple[str, Optional[dict]]] = {}
+        for pos, doc in enumerate(docs):
+            i = doc_id(doc)
+            if i not in new and self._shard_of(i) is None:
+                new[i] = (doc, metadatas[pos] if metadatas else None)
+        if not new:
+            return self
+        ids = list(new)
+        vectors = self.shards[0]._embed([doc for doc, _ in new.values()])
+        targets = self._assign(ids)
+
+        def add(shard_index: int) -> None:
+            rows = np.flatnonzero(targets == shard_index)
+            if len(rows):
+                self.shards[shard_index]._add_vectors(
+                    vectors[rows],
+                    [new[ids[row]][0] for row in rows],
+                    [ids[row] for row in rows],
+                    [new[ids[row]][1] for row in rows] if metadatas else None,
+                )
+
+        list(self._executor.map(add, range(len(self.shards))))
+        return self
+
+    def delete(
+        self,
+        ids: Optional[Iterable[int]] = None,
+        docs: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Delete documents by id or by content and return how many were removed."""
+        targets = [int(i) for i in ids or []]
+        targets.extend(doc_id(doc) for doc in docs or [])
+        removed = 0
+        for i in targets:
+            shard = self._shard_of(i)
+            if shard is not None:
+                removed += shard.delete(ids=[i])
+        return removed
+
+    def reset(self) -> None:
+        for shard in self.shards:
+            shard.reset()
+
+    def get_stats(self) -> dict:
+        stats = [shard.get_stats() for shard in self.shards]
+        return {
+            "num_shards": len(self.shards),
+            "partition": self.partition,
+            "total_documents": sum(s["total_documents"] for s in stats),
+            "shard_documents": [s["total_documents"] for s in stats],
+            "dimension": self.dimension,
+            "estimated_memory": sum(s["estimated_memory"] for s in stats),
+        }
+
+    # ---------------------------------------------------------------------
+    # Resharding
+    # ---------------------------------------------------------------------
+
+    def _move(self, source: FAISSStore, target: FAISSStore, ids: List[int]) -> None:
+        """Move documents between shards without re-embedding them.
+
+        IVF-PQ shards hand over their decoded, hence approximate, vectors.
+        """
+        if not ids:
+            return
+        positions = np.array([source._positions[i] for i in ids], dtype=np.int64)
+        vectors = source._base.reconstruct_batch(positions)
+        target._append_vectors(
+            vectors,
+            [source._docs[pos] for pos in positions.tolist()],
+            np.array(ids, dtype=np.int64),
+            [source._metadata.row(pos) for pos in positions.tolist()],
+        )
+        target._maybe_migrate_index()
+        source.delete(ids=ids)
+
+    def add_shard(self, rebalance: bool = True) -> FAISSStore:
+        """Add an empty shard and, by default, rebalance documents onto it."""
+        shard = self._new_shard()
+        self.shards.append(shard)
+        self._layout_generation += 1
+        self._executor.shutdown(wait=False)
+        self._executor = self._new_executor()
+        if rebalance:
+            self.rebalance()
+        return shard
+
+    def rebalance(self) -> None:
+        """Move documents so the placement matches the partitioning again.
+
+        With hash partitioning every document moves to shard ``id % num_shards``;
+        with round-robin the largest shards hand documents to the smallest
+        until their sizes differ by at most one.
+        """
+        if self.partition == "hash":
+            moves: Dict[Tuple[int, int], List[int]] = {}
+            for index, shard in enumerate(self.shards):
+                for i in shard._positions:
+                    target = i % len(self.shards)
+                    if target != index:
+                        moves.setdefault((index, target), []).append(i)
+            for (source, target), ids in moves.items():
+                self._move(self.shards[source], self.shards[target], ids)
+            return
+        total = sum(len(shard._positions) for shard in self.shards)
+        quota = [total // len(self.shards)] * len(self.shards)
+        for index in range(total % len(self.shards)):
+            quota[index] += 1
+        order = sorted(range(len(self.shards)), key=lambda s: -len(self.shards[s]._positions))
+        surplus = {s: len(self.shards[s]._positions) - quota[k] for k, s in enumerate(order)}
+        donors = [s for s in order if surplus[s] > 0]
+        for receiver in (s for s in order if surplus[s] < 0):
+            while surplus[receiver] < 0 and donors:
+                donor = donors[0]
+                count = min(surplus[donor], -surplus[receiver])
+                ids = list(self.shards[donor]._positions)[-count:]
+                self._move(self.shards[donor], self.shards[receiver], ids)
+                surplus[donor] -= count
+                surplus[receiver] += count
+                if surplus[donor] == 0:
+                    donors.pop(0)
+
+    # ---------------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------------
+
+    def save_to_disk(self, path: str) -> None:
+        """Save every shard next to a small manifest recording the layout."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        for index, shard in enumerate(self.shards):
+            shard.save_to_disk(f"{path}.shard-{index}")
+        with open(f"{path}.shards.json", "w") as f:
+            json.dump({"num_shards": len(self.shards), "partition": self.partition}, f)
+
+    def load_from_disk(self, path: str) -> None:
+        with open(f"{path}.shards.json", "r") as f:
+            layout = json.load(f)
+        self.partition = layout["partition"]
+        self.shards = [self._new_shard() for _ in range(layout["num_shards"])]
+        self._layout_generation += 1
+        for index, shard in enumerate(self.shards):
+            shard.load_from_disk(f"{path}.shard-{index}")
+        self._executor.shutdown(wait=False)
+        self._executor = self._new_executor()
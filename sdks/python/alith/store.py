@@ -1,14 +1,76 @@
+import asyncio
+import functools
 import hashlib
+import re
 import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Callable, List, Optional, Union
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 from .embeddings import Embeddings
+from .metadata import MetadataTable
+from .persistence import (
+    OP_ADD,
+    OP_DELETE,
+    OP_DROP,
+    OP_IMAGE,
+    OP_METADATA,
+    OP_RESET,
+    ChangeLog,
+    DocumentList,
+    WriteAheadLog,
+    read_manifest,
+    write_documents,
+    write_manifest,
+)
+from .tiering import ListTiers, empty_copy, lists_to_memory, on_disk_lists
+
+
+# Threads shared by the async methods of every store that has no native
+# async client, so event loops hand blocking calls to a bounded pool.
+STORE_EXECUTOR_WORKERS = 8
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _store_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=STORE_EXECUTOR_WORKERS, thread_name_prefix="alith-store"
+            )
+        return _executor
 
 
 class Store(ABC):
-    """Abstract base class for a storage backend."""
+    """Abstract base class for a storage backend.
+
+    Every method has an ``a``-prefixed async variant (`asearch`, `asave_docs`,
+    ...) for use inside event loops. Unless a backend overrides them with a
+    native async client, they run the blocking method on a bounded thread
+    pool. Calls on stores that are not `thread_safe` are serialized per store,
+    so reads and writes from concurrent requests never interleave.
+    """
+
+    # Whether the methods of one store may run from several threads at once.
+    thread_safe: bool = False
+
+    def _call_lock(self) -> threading.Lock:
+        """The lock that serializes calls on this store when it is not `thread_safe`."""
+        # Created on first use, so subclasses need not call a base __init__.
+        return self.__dict__.setdefault("_calls_lock", threading.Lock())
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        if not self.thread_safe:
+            call = functools.partial(_locked, self._call_lock(), call)
+        return await loop.run_in_executor(_store_executor(), call)
 
     @abstractmethod
     def search(
@@ -30,20 +92,62 @@ class Store(ABC):
         """Resets the storage by clearing all stored data."""
         pass
 
+    async def asearch(
+        self, query: str, limit: int = 3, score_threshold: float = 0.4, **kwargs
+    ) -> List[str]:
+        """Async variant of `search`."""
+        return await self._run(self.search, query, limit, score_threshold, **kwargs)
 
-try:
-    import chromadb
-    import chromadb.errors
-    from chromadb import EmbeddingFunction
-    from chromadb.config import Settings
+    async def asave(self, value: str, **kwargs) -> None:
+        """Async variant of `save`."""
+        await self._run(self.save, value, **kwargs)
 
-    CHROMADB_AVAILABLE = True
+    async def asave_docs(self, docs: List[str], **kwargs) -> "Store":
+        """Async variant of `save_docs`."""
+        await self._run(self.save_docs, docs, **kwargs)
+        return self
 
-except ImportError:
-    CHROMADB_AVAILABLE = False
+    async def areset(self) -> None:
+        """Async variant of `reset`."""
+        await self._run(self.reset)
+
+    async def asearch_in(self, query: str, **kwargs) -> List[str]:
+        """Async variant of `search_in`, for stores with named collections."""
+        return await self._run(self.search_in, query, **kwargs)
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        """Async variant of `has_collection`, for stores with named collections."""
+        return await self._run(self.has_collection, collection_name)
+
+    async def acreate_collection(self, collection_name: str) -> "Store":
+        """Async variant of `create_collection`, for stores with named collections."""
+        await self._run(self.create_collection, collection_name=collection_name)
+        return self
+
+    async def adrop_collection(self, collection_name: str) -> None:
+        """Async variant of `drop_collection`, for stores with named collections."""
+        await self._run(self.drop_collection, collection_name)
+
+
+def _locked(lock: threading.Lock, call: Callable):
+    with lock:
+        return call()
+
+
+# chromadb and pymilvus take about a second each to import, so they are
+# only imported by the stores that use them.
+CHROMADB_AVAILABLE = find_spec("chromadb") is not None
+
+
+# Batch size used when the Chroma client does not report its limit.
+CHROMA_DEFAULT_BATCH_SIZE = 5461
 
 
 class ChromaDBStore(Store):
+    # The Chroma client serializes its own writes, so concurrent calls only
+    # contend in Chroma rather than on the per-store lock.
+    thread_safe = True
+
     path: str = "."
     collection_name: str = "alith"
     embeddings: Optional[Embeddings] = None
@@ -59,10 +163,15 @@ class ChromaDBStore(Store):
                 "chromadb is not installed. Please install it with: "
                 "python3 -m pip install chromadb"
             )
+        import chromadb
+        from chromadb import EmbeddingFunction
+        from chromadb.config import Settings
+
         self.embeddings = embeddings
         if collection_name:
             self.collection_name = collection_name
         self.path = path
+        self._batch_limit: Optional[int] = None
         self.app = chromadb.PersistentClient(
             path=self.path,
             settings=Settings(allow_reset=True),
@@ -84,51 +193,117 @@ class ChromaDBStore(Store):
             ),
         )
 
+    def _max_batch_size(self) -> int:
+        """The largest batch the Chroma server accepts in one call."""
+        if self._batch_limit is None:
+            limit = getattr(self.app, "get_max_batch_size", None)
+            limit = limit() if callable(limit) else getattr(self.app, "max_batch_size", None)
+            self._batch_limit = int(limit or CHROMA_DEFAULT_BATCH_SIZE)
+        return self._batch_limit
+
+    def _query(self, queries: List[str], limit: int) -> dict:
+        if self.embeddings:
+            return self.collection.query(
+                query_embeddings=self.embeddings.embed_texts(queries),
+                n_results=limit,
+            )
+        return self.collection.query(query_texts=queries, n_results=limit)
+
+    def _space(self) -> str:
+        """The distance function of the collection: ``l2``, ``cosine`` or ``ip``."""
+        configuration = getattr(self.collection, "configuration", None) or {}
+        space = (configuration.get("hnsw") or {}).get("space")
+        return space or (self.collection.metadata or {}).get("hnsw:space", "l2")
+
+    @staticmethod
+    def _score(distance: float, space: str) -> float:
+        if space == "l2":
+            return 1.0 / (1.0 + max(distance, 0.0))
+        # Chroma reports cosine and inner product distances as 1 - similarity.
+        return 1.0 - distance
+
     def search(
         self, query: str, limit: int = 3, score_threshold: float = 0.4
     ) -> List[str]:
-        if self.collection:
-            fetched = self.collection.query(
-                query_texts=[query],
-                n_results=limit,
-            )
-            results = []
-            for i in range(len(fetched["ids"][0])):  # type: ignore
-                result = {
-                    "id": fetched["ids"][0][i],  # type: ignore
-                    "metadata": fetched["metadatas"][0][i],  # type: ignore
-                    "context": fetched["documents"][0][i],  # type: ignore
-                    "score": fetched["distances"][0][i],  # type: ignore
-                }
-                if result["score"] >= score_threshold:
-                    results.append(result)
-            results = [result["context"] for result in results]
-            return results
-        else:
+        return self.search_batch([query], limit, score_threshold)[0]
+
+    def search_batch(
+        self, queries: List[str], limit: int = 3, score_threshold: float = 0.4
+    ) -> List[List[str]]:
+        """Search many queries with one embedding batch and one query call per server batch.
+
+        Chroma returns distances, so hits are kept when their similarity is at
+        least `score_threshold`: ``1 - distance`` for ``cosine`` and ``ip``
+        collections and ``1 / (1 + distance)`` for ``l2``.
+        """
+        if not self.collection:
             raise Exception("Collection not initialized")
+        if not queries:
+            return []
+        results = []
+        space = self._space()
+        step = self._max_batch_size()
+        for start in range(0, len(queries), step):
+            fetched = self._query(queries[start:start + step], limit)
+            for documents, distances in zip(fetched["documents"], fetched["distances"]):  # type: ignore
+                results.append(
+                    [
+                        document
+                        for document, distance in zip(documents, distances)
+                        if self._score(distance, space) >= score_threshold
+                    ]
+                )
+        return results
 
     def save(self, value: str):
-        documents = [value]
-        ids = [hashlib.sha256(value.encode("utf-8")).hexdigest()]
-        metadatas = [None]
-        self.collection.upsert(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids,
-        )
+        self.save_docs([value])
 
-    def save_docs(self, docs: List[str]) -> "ChromaDBStore":
-        ids = [hashlib.sha256(doc.encode("utf-8")).hexdigest() for doc in docs]
-        metadatas = [None] * len(docs)
-        self.collection.upsert(
-            documents=docs,
-            metadatas=metadatas,
-            ids=ids,
-        )
+    def save_docs(
+        self,
+        docs: List[str],
+        metadatas: Optional[List[Optional[dict]]] = None,
+        batch_size: int = 1024,
+    ) -> "ChromaDBStore":
+        """Upsert documents in batches capped at the server's max batch size.
+
+        With `embeddings` configured, each batch is embedded here in one call
+        while the previous batch is being upserted.
+        """
+        if metadatas is not None and len(metadatas) != len(docs):
+            raise ValueError("docs and metadatas must have the same length")
+        # Chroma rejects repeated ids within one upsert; the last copy wins.
+        rows = {
+            hashlib.sha256(doc.encode("utf-8")).hexdigest(): pos
+            for pos, doc in enumerate(docs)
+        }
+        ids = list(rows)
+        step = max(1, min(batch_size, self._max_batch_size()))
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="alith-chroma") as upserts:
+            pending = None
+            for start in range(0, len(ids), step):
+                batch_ids = ids[start:start + step]
+                batch_docs = [docs[rows[i]] for i in batch_ids]
+                batch = {
+                    "ids": batch_ids,
+                    "documents": batch_docs,
+                    "metadatas": [metadatas[rows[i]] for i in batch_ids]
+                    if metadatas
+                    else [None] * len(batch_ids),
+                }
+                if self.embeddings:
+                    batch["embeddings"] = self.embeddings.embed_texts(batch_docs)
+                if pending is not None:
+                    pending.result()
+                pending = upserts.submit(self.collection.upsert, **batch)
+            if pending is not None:
+                pending.result()
         return self
 
     def reset(self):
         if not self.app:
+            import chromadb
+            from chromadb.config import Settings
+
             self.app = chromadb.PersistentClient(
                 path=self.path,
                 settings=Settings(allow_reset=True),
@@ -139,15 +314,29 @@ class ChromaDBStore(Store):
         self.collection = None
 
 
-try:
-    from pymilvus import MilvusClient, MilvusException, model
-
-    MILVUS_AVAILABLE = True
-except ImportError:
-    MILVUS_AVAILABLE = False
+MILVUS_AVAILABLE = find_spec("pymilvus") is not None
+# Capacity in bytes of the VARCHAR field holding the document text.
+MILVUS_MAX_TEXT_BYTES = 65535
 
 
 class MilvusStore(Store):
+    """Milvus vector store, local through Milvus Lite or remote through `uri`.
+
+    Documents are keyed by the 63-bit hash of their content, so re-saving a
+    document is an idempotent upsert. `save_docs` embeds and upserts in
+    batches of `batch_size`, embedding the next batch while the previous one
+    is written; documents longer than `MILVUS_MAX_TEXT_BYTES` in UTF-8 are
+    rejected up front, so chunk them first. Searches send up to
+    `batch_size` query vectors per request.
+    Scores are similarities for ``COSINE`` and ``IP`` and ``1 / (1 + distance)``
+    for ``L2``, and hits below `score_threshold` are dropped. `index_params`
+    (e.g. ``{"index_type": "HNSW", "params": {"M": 16}}``) and
+    `search_params` are passed to Milvus for the collections this store creates.
+    Calls from several threads run concurrently over the Milvus client.
+    """
+
+    thread_safe = True
+
     uri: str = "alith.db"
     dimension: int = 768
     collection_name: str = "alith"
@@ -160,62 +349,156 @@ class MilvusStore(Store):
         dimension: int = 768,
         collection_name: str = "alith",
         embeddings: Optional[Embeddings] = None,
+        metric_type: str = "COSINE",
+        index_params: Optional[dict] = None,
+        search_params: Optional[dict] = None,
+        batch_size: int = 512,
+        token: str = "",
     ):
         if not MILVUS_AVAILABLE:
             raise ImportError(
                 "pymilvus is not installed. Please install it with: "
                 "python3 -m pip install pymilvus pymilvus[model]"
             )
+        if metric_type not in ("COSINE", "IP", "L2"):
+            raise ValueError("metric_type must be one of 'COSINE', 'IP' or 'L2'")
         self.uri = uri
         self.dimension = dimension
         self.collection_name = collection_name
         self.embeddings = embeddings
+        self.metric_type = metric_type
+        self.index_params = index_params or {"index_type": "AUTOINDEX"}
+        self.search_params = search_params or {}
+        self.batch_size = batch_size
         if self.embeddings:
             self.embeddings.encode_documents = self.embeddings.embed_texts
             self.embedding_fn = self.embeddings
         else:
+            from pymilvus import model
+
             # If connection to https://huggingface.co/ failed, uncomment the following path.
             # import os
             # os.environ["HF_ENDPOINT"] = "https://hf-mirror.com"
             self.model = model.DefaultEmbeddingFunction()
             self.embedding_fn = self.model
-        self.client = MilvusClient("alith.db")
-        self.client.create_collection(
-            collection_name=self.collection_name,
-            dimension=self.dimension,
-        )
+        from pymilvus import MilvusClient
+
+        self.client = MilvusClient(uri=uri, token=token)
+        if not self.has_collection(self.collection_name):
+            self.create_collection(self.collection_name)
+
+    def _embed(self, docs: List[str]) -> list:
+        return list(self.embedding_fn.encode_documents(docs))
+
+    def _score(self, distance: float) -> float:
+        if self.metric_type == "L2":
+            return 1.0 / (1.0 + max(distance, 0.0))
+        return distance
+
+    def search_batch_with_scores(
+        self,
+        queries: List[str],
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        collection_name: Optional[str] = None,
+    ) -> List[List[tuple]]:
+        """Search many queries, embedding them in one call and batching the requests."""
+        if not queries:
+            return []
+        vectors = self._embed(queries)
+        results = []
+        for start in range(0, len(queries), self.batch_size):
+            hits = self.client.search(
+                collection_name=collection_name or self.collection_name,
+                data=vectors[start:start + self.batch_size],
+                limit=limit,
+                output_fields=["text"],
+                search_params={"metric_type": self.metric_type, **self.search_params},
+            )
+            for row in hits:
+                scored = [(hit["entity"]["text"], self._score(hit["distance"])) for hit in row]
+                results.append([(text, score) for text, score in scored if score >= score_threshold])
+        return results
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        collection_name: Optional[str] = None,
+    ) -> List[List[str]]:
+        return [
+            [text for text, _ in hits]
+            for hits in self.search_batch_with_scores(
+                queries, limit, score_threshold, collection_name
+            )
+        ]
+
+    def search_with_scores(
+        self, query: str, limit: int = 3, score_threshold: float = 0.4
+    ) -> List[tuple]:
+        return self.search_batch_with_scores([query], limit, score_threshold)[0]
 
     def search(
         self, query: str, limit: int = 3, score_threshold: float = 0.4
     ) -> List[str]:
-        query_vectors = self.embedding_fn.encode_documents([query])
-        results = self.client.search(
-            collection_name=self.collection_name,
-            data=query_vectors,
-            limit=limit,
-            output_fields=["text"],
-        )
-        docs = [d["entity"]["text"] for r in results for d in r]
-        return docs
+        return self.search_batch([query], limit, score_threshold)[0]
 
-    def save(self, value: str):
-        self.save_docs([value])
+    def save(self, value: str, metadata: Optional[dict] = None):
+        self.save_docs([value], metadatas=[metadata] if metadata else None)
 
     def save_docs(
-        self, docs: List[str], collection_name: Optional[str] = None
+        self,
+        docs: List[str],
+        collection_name: Optional[str] = None,
+        metadatas: Optional[List[Optional[dict]]] = None,
+        batch_size: Optional[int] = None,
     ) -> "MilvusStore":
-        vectors = self.embedding_fn.encode_documents(docs)
-        data = [
-            {"id": i, "vector": vectors[i], "text": docs[i], "subject": "history"}
-            for i in range(len(vectors))
-        ]
-        self.client.insert(
-            collection_name=collection_name or self.collection_name, data=data
-        )
+        """Upsert documents under their content-hash ids, `batch_size` at a time.
+
+        Metadata keys are stored as dynamic fields next to the text.
+        """
+        if metadatas is not None and len(metadatas) != len(docs):
+            raise ValueError("docs and metadatas must have the same length")
+        for pos, doc in enumerate(docs):
+            size = len(doc.encode("utf-8"))
+            if size > MILVUS_MAX_TEXT_BYTES:
+                raise ValueError(
+                    f"Document {pos} is {size} bytes, more than the {MILVUS_MAX_TEXT_BYTES} "
+                    "a Milvus text field holds; chunk it before saving"
+                )
+        # Milvus rejects repeated primary keys within one upsert; the last copy wins.
+        rows = {doc_id(doc): pos for pos, doc in enumerate(docs)}
+        ids = list(rows)
+        step = batch_size or self.batch_size
+        collection_name = collection_name or self.collection_name
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="alith-milvus") as upserts:
+            pending = None
+            for start in range(0, len(ids), step):
+                batch_ids = ids[start:start + step]
+                vectors = self._embed([docs[rows[i]] for i in batch_ids])
+                data = [
+                    {
+                        **((metadatas[rows[i]] or {}) if metadatas else {}),
+                        "id": i,
+                        "vector": vector,
+                        "text": docs[rows[i]],
+                    }
+                    for i, vector in zip(batch_ids, vectors)
+                ]
+                if pending is not None:
+                    pending.result()
+                pending = upserts.submit(
+                    self.client.upsert, collection_name=collection_name, data=data
+                )
+            if pending is not None:
+                pending.result()
         return self
 
     def reset(self):
+        """Drop the default collection and recreate it empty."""
         self.client.drop_collection(self.collection_name)
+        self.create_collection(self.collection_name)
 
     def search_in(
         self,
@@ -224,31 +507,38 @@ class MilvusStore(Store):
         score_threshold: float = 0.4,
         collection_name: Optional[str] = None,
     ) -> List[str]:
-        query_vectors = self.embedding_fn.encode_documents([query])
-        results = self.client.search(
-            collection_name=collection_name or self.collection_name,
-            data=query_vectors,
-            limit=limit,
-            output_fields=["text"],
-        )
-        docs = [d["entity"]["text"] for r in results for d in r]
-        return docs
+        return self.search_batch([query], limit, score_threshold, collection_name)[0]
 
     def has_collection(self, collection_name: str) -> bool:
         """Check if the collection exists."""
+        from pymilvus import MilvusException
+
         try:
             return self.client.has_collection(collection_name)
         except MilvusException:
             return False
 
     def create_collection(self, collection_name: str) -> "MilvusStore":
-        """Create a new collection."""
+        """Create a new collection keyed by content-hash ids, with this store's index."""
+        from pymilvus import DataType, MilvusClient
+
+        schema = MilvusClient.create_schema(auto_id=False, enable_dynamic_field=True)
+        schema.add_field("id", DataType.INT64, is_primary=True)
+        schema.add_field("vector", DataType.FLOAT_VECTOR, dim=self.dimension)
+        schema.add_field("text", DataType.VARCHAR, max_length=MILVUS_MAX_TEXT_BYTES)
+        index_params = self.client.prepare_index_params()
+        index_params.add_index(
+            field_name="vector", metric_type=self.metric_type, **self.index_params
+        )
         self.client.create_collection(
-            collection_name=collection_name,
-            dimension=self.dimension,
+            collection_name=collection_name, schema=schema, index_params=index_params
         )
         return self
 
+    def drop_collection(self, collection_name: str) -> None:
+        """Drop a collection and its documents; dropping a missing one is a no-op."""
+        self.client.drop_collection(collection_name)
+
 
 try:
     import faiss
@@ -258,14 +548,218 @@ except ImportError:
     FAISS_AVAILABLE = False
 
 
+# Below this many vectors an exact flat scan is fast enough and needs no training.
+FLAT_MAX_VECTORS = 50_000
+# IVF-PQ needs enough vectors to train its coarse quantizer and codebooks.
+IVFPQ_MIN_VECTORS = 100_000
+# Filters matching at most this many documents are answered by an exact scan
+# of the matches, which beats a filtered graph or IVF traversal.
+FILTER_EXACT_MAX_VECTORS = 4096
+# `save_to_disk` rewrites the snapshot instead of appending to the write-ahead
+# log once the log holds more than this fraction of the snapshot's records.
+WAL_CHECKPOINT_RATIO = 0.5
+
+_INDEX_KINDS = ("flat", "hnsw", "ivfpq")
+
+
+def estimate_index_memory(
+    index_kind: str, num_vectors: int, dimension: int, hnsw_m: int = 32
+) -> int:
+    """Estimate the resident size in bytes of an index holding `num_vectors` vectors."""
+    if index_kind == "flat":
+        return num_vectors * dimension * 4
+    if index_kind == "hnsw":
+        # Full vectors plus ~2*M int32 links on level 0 and a small upper-level overhead.
+        return int(num_vectors * (dimension * 4 + hnsw_m * 2 * 4 * 1.1))
+    if index_kind == "ivfpq":
+        pq_m = _pq_subquantizers(dimension)
+        nlist = _ivf_nlist(num_vectors)
+        return num_vectors * (pq_m + 8) + nlist * dimension * 4
+    raise ValueError(f"Unknown index kind: {index_kind}")
+
+
+def select_index_type(
+    num_vectors: int,
+    dimension: int,
+    memory_budget: Optional[int] = None,
+    hnsw_m: int = 32,
+) -> str:
+    """Pick an index kind for a corpus size and an optional memory budget in bytes.
+
+    Small corpora use an exact flat index, larger ones HNSW while it fits the
+    budget, and IVF-PQ once the full vectors no longer fit.
+    """
+    if num_vectors < FLAT_MAX_VECTORS:
+        return "flat"
+    if memory_budget is None or memory_budget >= estimate_index_memory(
+        "hnsw", num_vectors, dimension, hnsw_m
+    ):
+        return "hnsw"
+    if num_vectors < IVFPQ_MIN_VECTORS:
+        # Not enough data to train IVF-PQ yet, so stay on the graph index.
+        return "hnsw"
+    return "ivfpq"
+
+
+def _pq_subquantizers(dimension: int) -> int:
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2):
+        if dimension % m == 0 and dimension // m >= 2:
+            return m
+    return 1
+
+
+def _ivf_nlist(num_vectors: int) -> int:
+    return max(1, min(65536, int(4 * num_vectors**0.5)))
+
+
+def _training_sample(vectors: "np.ndarray", nlist: int) -> "np.ndarray":
+    """Subsample training vectors; k-means gains little beyond ~50 points per centroid."""
+    max_points = max(nlist, 256) * 50
+    if len(vectors) <= max_points:
+        return vectors
+    rng = np.random.default_rng(0)
+    return vectors[np.sort(rng.choice(len(vectors), max_points, replace=False))]
+
+
+def _min_training_vectors(index) -> int:
+    """Smallest first batch an untrained IVF index can be trained on."""
+    if isinstance(index, faiss.IndexIVFPQ):
+        return max(256, index.nlist)
+    return index.nlist
+
+
+def doc_id(doc: Union[str, bytes]) -> int:
+    """Stable 63-bit id derived from the SHA-256 of a document's content."""
+    data = doc.encode("utf-8") if isinstance(doc, str) else doc
+    return int.from_bytes(hashlib.sha256(data).digest()[:8], "little") & 0x7FFF_FFFF_FFFF_FFFF
+
+
+def maximal_marginal_relevance(
+    query_vector: "np.ndarray",
+    candidate_vectors: "np.ndarray",
+    limit: int,
+    lambda_mult: float = 0.5,
+) -> "np.ndarray":
+    """Greedily pick `limit` candidates by maximal marginal relevance.
+
+    Each step takes the candidate maximizing ``lambda_mult * sim(query, c) -
+    (1 - lambda_mult) * max sim(c, picked)`` with cosine similarities, so
+    ``lambda_mult=1`` is plain relevance order and lower values favour
+    diversity. Returns indexes into `candidate_vectors`, in pick order.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    count = min(limit, len(candidates))
+    if count <= 0:
+        return np.empty(0, dtype=np.int64)
+    unit = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+    relevance = unit @ (query / max(float(np.linalg.norm(query)), 1e-12))
+    similarity = unit @ unit.T
+    picked = np.empty(count, dtype=np.int64)
+    picked[0] = np.argmax(relevance)
+    redundancy = similarity[picked[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[picked[0]] = False
+    for step in range(1, count):
+        mmr = np.where(
+            available, lambda_mult * relevance - (1.0 - lambda_mult) * redundancy, -np.inf
+        )
+        picked[step] = np.argmax(mmr)
+        available[picked[step]] = False
+        np.maximum(redundancy, similarity[picked[step]], out=redundancy)
+    return picked
+
+
+def _top_k_from_ranges(lims, distances, labels, k: int, higher_is_better: bool):
+    """Turn ``range_search`` output into best-first ``(nq, k)`` matrices padded with -1."""
+    lims = lims.astype(np.int64)
+    num_queries = len(lims) - 1
+    out_distances = np.full(
+        (num_queries, k), -np.inf if higher_is_better else np.inf, dtype=np.float32
+    )
+    out_labels = np.full((num_queries, k), -1, dtype=np.int64)
+    query_of = np.repeat(np.arange(num_queries), np.diff(lims))
+    order = np.lexsort((-distances if higher_is_better else distances, query_of))
+    ranks = np.arange(len(order)) - lims[query_of[order]]
+    keep = ranks < k
+    rows, cols = query_of[order][keep], ranks[keep]
+    out_distances[rows, cols] = distances[order][keep]
+    out_labels[rows, cols] = labels[order][keep]
+    return out_distances, out_labels
+
+
+def _index_kind_of(index) -> str:
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
 class FAISSStore(Store):
-    """FAISS vector store implementation."""
-    
+    """FAISS vector store implementation.
+
+    `index_type` selects the index: ``"L2"`` and ``"IP"`` are exact flat indexes
+    with that metric, ``"flat"``, ``"hnsw"`` and ``"ivfpq"`` use `metric`, and
+    ``"auto"`` starts flat and migrates to HNSW or IVF-PQ as the store grows,
+    based on `memory_budget` (bytes).
+
+    Vectors live in an ``IndexIDMap2`` keyed by stable 64-bit document ids, by
+    default derived from the content hash, so re-saving a document is a no-op.
+    Deleted documents are tombstoned and excluded from searches until the
+    index is compacted, which happens automatically once more than
+    `compaction_threshold` of the stored vectors are dead.
+
+    Documents can carry a metadata dict, kept in a columnar side table, and
+    searches take a `filter` in the ChromaDB ``where`` syntax, e.g.
+    ``{"source": "docs", "year": {"$gte": 2024}}``. Filters are compiled to a
+    FAISS ``IDSelector`` so non-matching vectors are skipped inside the scan.
+
+    Named collections are separate stores with the same configuration. At
+    most `max_resident_collections` of them, and at most
+    `collection_memory_budget` bytes of index, stay in memory; the least
+    recently used ones are saved under `collection_dir` (a temporary directory
+    by default) and memory-mapped back on their next use. Collections already
+    saved under `collection_dir` are picked up on start.
+
+    `generation` is bumped by every change to the stored documents, their
+    metadata or the index, so caches can tell that their results are stale.
+    Changes to a named collection bump the generation of its parent store too.
+
+    With a `tier_dir`, IVF indexes (``"ivfpq"``, ``"auto"`` once migrated, or
+    `create_ivf_index`) keep their inverted lists in a memory-mapped file
+    under it and only the lists probed most often stay resident, within
+    `tier_memory_budget` bytes; see `ListTiers`, available as `tiers`. Tiered
+    stores cannot be forked, so they do not work with `ConcurrentFAISSStore`.
+
+    With a `change_log_dir`, every addition (with its vector), delete,
+    metadata update, reset and dropped collection of the store and its
+    collections is appended to a `ChangeLog` there, available as
+    `change_log`. `StoreReplica` tails it to keep read replicas up to date
+    without re-embedding; `log_sequence` is the last change reflected in the
+    store and is kept in snapshots, so a new replica can start from a
+    snapshot and only apply the changes made since.
+    """
+
     def __init__(
         self,
         dimension: int = 768,
         embeddings: Optional[Embeddings] = None,
-        index_type: str = "L2"
+        index_type: str = "L2",
+        metric: Optional[str] = None,
+        hnsw_m: int = 32,
+        ef_construction: int = 128,
+        ef_search: int = 128,
+        memory_budget: Optional[int] = None,
+        compaction_threshold: float = 0.25,
+        collection_dir: Optional[str] = None,
+        max_resident_collections: int = 64,
+        collection_memory_budget: Optional[int] = None,
+        tier_dir: Optional[str] = None,
+        tier_memory_budget: Optional[int] = None,
+        change_log_dir: Optional[str] = None,
     ):
         if not FAISS_AVAILABLE:
             raise ImportError(
@@ -274,414 +768,1414 @@ class FAISSStore(Store):
                 "# or\n"
                 "python3 -m pip install faiss-gpu  # for GPU support"
             )
-        
+        if index_type in ("L2", "IP"):
+            metric = metric or index_type
+        elif index_type not in _INDEX_KINDS and index_type != "auto":
+            raise ValueError(
+                "index_type must be one of 'L2', 'IP', 'flat', 'hnsw', 'ivfpq' or 'auto'"
+            )
+        if (metric or "L2") not in ("L2", "IP"):
+            raise ValueError("metric must be either 'L2' or 'IP'")
+
         self.dimension = dimension
         self.embeddings = embeddings
         self.index_type = index_type
-        
-        if index_type == "L2":
-            self.index = faiss.IndexFlatL2(self.dimension)
-        elif index_type == "IP":
-            self.index = faiss.IndexFlatIP(self.dimension)
+        self.metric = metric or "L2"
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.memory_budget = memory_budget
+        self.compaction_threshold = compaction_threshold
+        self.collection_dir = collection_dir
+        self.max_resident_collections = max_resident_collections
+        self.collection_memory_budget = collection_memory_budget
+        self.tier_dir = tier_dir
+        self.tier_memory_budget = tier_memory_budget
+        self.tiers = ListTiers(tier_dir, tier_memory_budget) if tier_dir else None
+        self.change_log = ChangeLog(change_log_dir, dimension) if change_log_dir else None
+        # Collections write to the log of their parent store under their name.
+        self.log_collection: Optional[str] = None
+        self.log_sequence = 0
+        # The store whose `generation` follows this collection's, if any.
+        self._parent: Optional["FAISSStore"] = None
+        self._generation = 0
+        self._clear()
+        # Named collections: resident ones in LRU order, plus every known name.
+        self._resident: "OrderedDict[str, FAISSStore]" = OrderedDict()
+        self._collection_names: Set[str] = set()
+        if collection_dir:
+            for manifest in Path(collection_dir).glob("*.manifest.json"):
+                self._collection_names.add(manifest.name[: -len(".manifest.json")])
+
+    @property
+    def texts(self) -> List[str]:
+        """The stored documents, in insertion order."""
+        return [doc for doc in self._docs if doc is not None]
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @generation.setter
+    def generation(self, value: int) -> None:
+        if self._parent is not None:
+            self._parent.generation += 1
+        self._generation = value
+
+    def _clear(self) -> None:
+        initial_kind = self.index_type if self.index_type in _INDEX_KINDS else "flat"
+        self._set_index(self._new_index(initial_kind), initial_kind)
+        # Position i in `_docs` is the document stored at position i of the
+        # wrapped index; deleted documents are None until compaction.
+        self._docs = DocumentList()
+        self._positions: Dict[int, int] = {}
+        self._deleted: Set[int] = set()
+        self._alive = None
+        self._metadata = MetadataTable()
+        self.generation += 1
+        # Changes since the last save to `_disk_path`, or None when the next
+        # save has to write a full snapshot.
+        self._journal: Optional[List[tuple]] = None
+        self._disk_path: Optional[str] = None
+        self._snapshot_size = 0
+        self._wal_records = 0
+
+    # ---------------------------------------------------------------------
+    # Index construction
+    # ---------------------------------------------------------------------
+
+    def _faiss_metric(self) -> int:
+        return faiss.METRIC_L2 if self.metric == "L2" else faiss.METRIC_INNER_PRODUCT
+
+    def _new_index(
+        self, index_kind: str, num_vectors: int = 0, nlist: Optional[int] = None
+    ):
+        """Create an empty index of the given kind sized for `num_vectors`."""
+        if index_kind == "flat":
+            if self.metric == "L2":
+                return faiss.IndexFlatL2(self.dimension)
+            return faiss.IndexFlatIP(self.dimension)
+        if index_kind == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, self._faiss_metric())
+            index.hnsw.efConstruction = self.ef_construction
+            index.hnsw.efSearch = self.ef_search
+            return index
+        quantizer = (
+            faiss.IndexFlatL2(self.dimension)
+            if self.metric == "L2"
+            else faiss.IndexFlatIP(self.dimension)
+        )
+        if index_kind == "ivf":
+            return faiss.IndexIVFFlat(
+                quantizer,
+                self.dimension,
+                nlist or _ivf_nlist(num_vectors),
+                self._faiss_metric(),
+            )
+        if index_kind == "ivfpq":
+            index = faiss.IndexIVFPQ(
+                quantizer,
+                self.dimension,
+                nlist or _ivf_nlist(num_vectors),
+                _pq_subquantizers(self.dimension),
+                8,
+                self._faiss_metric(),
+            )
+            index.nprobe = max(1, index.nlist // 64)
+            return index
+        raise ValueError(f"Unknown index kind: {index_kind}")
+
+    def _set_index(self, base, index_kind: str) -> None:
+        """Install `base` wrapped in an id map as the store's index."""
+        self._adopt_index(faiss.IndexIDMap2(base))
+        self.index_kind = index_kind
+
+    def _adopt_index(self, index) -> None:
+        self.index = index
+        self._base = faiss.downcast_index(index.index)
+        self.index_kind = _index_kind_of(self._base)
+        if isinstance(self._base, faiss.IndexIVF):
+            if self.tiers is not None:
+                self.tiers.attach(self._base)
+            elif on_disk_lists(self._base) is not None:
+                lists_to_memory(self._base)
+            # Searches reconstruct vectors (filtered subsets, MMR) without
+            # locking, so the direct map is built here, by the writer, and
+            # kept up to date by every add.
+            self._base.make_direct_map()
+        elif self.tiers is not None:
+            self.tiers.detach()
+
+    def _id_view(self) -> "np.ndarray":
+        """Zero-copy view of the document id at each index position."""
+        ntotal = self.index.ntotal
+        if ntotal == 0:
+            return np.empty(0, dtype=np.int64)
+        return faiss.rev_swig_ptr(self.index.id_map.data(), ntotal)
+
+    def _alive_selector(self):
+        """Selector excluding tombstoned positions, or None when nothing is deleted."""
+        if not self._deleted:
+            return None
+        if self._alive is None:
+            mask = np.ones(len(self._docs), dtype=bool)
+            mask[list(self._deleted)] = False
+            bitmap = np.packbits(mask, bitorder="little")
+            # Keep the bitmap referenced for as long as the selector is in use.
+            self._alive = (faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap)), bitmap)
+        return self._alive[0]
+
+    def _search_params(self, selector):
+        if isinstance(self._base, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(
+                sel=selector, efSearch=self._base.hnsw.efSearch
+            )
+        if isinstance(self._base, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self._base.nprobe)
+        return faiss.SearchParameters(sel=selector)
+
+    def _filter_mask(self, filter: dict) -> "np.ndarray":
+        """Positions of live documents whose metadata matches `filter`."""
+        mask = self._metadata.mask(filter)
+        if self._deleted:
+            mask[list(self._deleted)] = False
+        return mask
+
+    def _search_positions(
+        self,
+        query_vectors: "np.ndarray",
+        k: int,
+        filter: Optional[dict] = None,
+        radius: Optional[float] = None,
+        excluded: Optional["np.ndarray"] = None,
+    ):
+        """Search the wrapped index, returning distances and index positions.
+
+        With a `radius`, only hits within it are returned (via ``range_search``)
+        and rows are padded with position -1. Positions set in the boolean
+        `excluded` mask are skipped inside the scan.
+        """
+        if not filter and excluded is None:
+            selector = self._alive_selector()
+            params = None if selector is None else self._search_params(selector)
+            return self._knn_or_range(self._base, query_vectors, k, params, radius)
+
+        if filter:
+            mask = self._filter_mask(filter)
         else:
-            raise ValueError("index_type must be either 'L2' or 'IP'")
-            
-        self.texts: List[str] = []
-        
+            mask = np.ones(len(self._docs), dtype=bool)
+            if self._deleted:
+                mask[list(self._deleted)] = False
+        if excluded is not None:
+            n = min(len(mask), len(excluded))
+            mask[:n] &= ~excluded[:n]
+        hits = np.flatnonzero(mask)
+        k = min(k, len(hits))
+        if k == 0:
+            return (
+                np.empty((len(query_vectors), 0), dtype=np.float32),
+                np.empty((len(query_vectors), 0), dtype=np.int64),
+            )
+        if len(hits) <= FILTER_EXACT_MAX_VECTORS:
+            subset = faiss.IndexFlat(self.dimension, self._faiss_metric())
+            subset.add(self._base.reconstruct_batch(hits))
+            distances, rows = self._knn_or_range(subset, query_vectors, k, None, radius)
+            return distances, np.where(rows >= 0, hits[rows], -1)
+        if hits[-1] - hits[0] + 1 == len(hits):
+            selector = faiss.IDSelectorRange(int(hits[0]), int(hits[-1]) + 1)
+        else:
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+        return self._knn_or_range(
+            self._base, query_vectors, k, self._search_params(selector), radius
+        )
+
+    def _knn_or_range(self, index, query_vectors, k: int, params, radius: Optional[float]):
+        if radius is None:
+            return index.search(query_vectors, k, params=params)
+        try:
+            lims, distances, labels = index.range_search(query_vectors, radius, params=params)
+        except RuntimeError:
+            # Index types without range search: exact top-k, then apply the radius.
+            distances, labels = index.search(query_vectors, k, params=params)
+            outside = distances < radius if self.metric == "IP" else distances > radius
+            labels[outside] = -1
+            return distances, labels
+        return _top_k_from_ranges(lims, distances, labels, k, self.metric == "IP")
+
+    def _search_core(
+        self,
+        query_vectors: "np.ndarray",
+        limit: int,
+        score_threshold: Optional[float] = None,
+        filter: Optional[dict] = None,
+        excluded: Optional["np.ndarray"] = None,
+        radius: Optional[float] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Vectorized search returning ``(scores, positions)`` of shape ``(nq, limit)``.
+
+        Positions set in the boolean `excluded` mask are never returned. The
+        `limit` nearest neighbours are searched and those scoring below
+        `score_threshold` dropped; an explicit `radius`, in the index's own
+        distance (similarity for IP), uses a range search instead.
+        """
+        query_vectors = np.ascontiguousarray(query_vectors, dtype=np.float32).reshape(
+            -1, self.dimension
+        )
+        scores = np.full((len(query_vectors), limit), -np.inf, dtype=np.float32)
+        positions = np.full((len(query_vectors), limit), -1, dtype=np.int64)
+        if not self._positions or limit <= 0 or len(query_vectors) == 0:
+            return scores, positions
+        if self.metric == "IP":
+            query_vectors = query_vectors.copy()
+            faiss.normalize_L2(query_vectors)
+        if score_threshold is not None and self.metric != "IP" and score_threshold > 1.0:
+            # L2 scores are 1/(1+d), which never exceeds 1.
+            return scores, positions
+
+        k = min(limit, self.index.ntotal)
+        probed = None
+        if self.tiers is not None and self.tiers.active:
+            probed = self.tiers.record(query_vectors, self._base.nprobe)
+        distances, found = self._search_positions(query_vectors, k, filter, radius, excluded)
+        if probed is not None:
+            self.tiers.release(probed)
+        found_scores = distances if self.metric == "IP" else 1.0 / (1.0 + np.maximum(distances, 0))
+        valid = found >= 0
+        if score_threshold is not None:
+            valid &= found_scores >= score_threshold
+        width = found.shape[1]
+        positions[:, :width] = np.where(valid, found, -1)
+        scores[:, :width] = np.where(valid, found_scores, -np.inf)
+        return scores, positions
+
+    def _embed_queries(self, queries: List[str]) -> "np.ndarray":
+        if self.embeddings:
+            embeddings = self.embeddings.embed_texts(queries)
+        else:
+            raise ValueError("Embeddings must be provided for search")
+        return np.array(embeddings, dtype=np.float32).reshape(len(queries), -1)
+
+    def _reconstruct_vectors(self) -> "np.ndarray":
+        """Read back every stored vector, including tombstoned ones."""
+        ntotal = self._base.ntotal
+        if ntotal == 0:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return self._base.reconstruct_n(0, ntotal)
+
+    def _rebuild_index(self, index_kind: str, nlist: Optional[int] = None) -> None:
+        """Move every live vector into a fresh index of `index_kind`, dropping tombstones."""
+        vectors = self._reconstruct_vectors()
+        ids = self._id_view().copy()
+        docs = self._docs
+        if self._deleted:
+            keep = np.ones(len(docs), dtype=bool)
+            keep[list(self._deleted)] = False
+            vectors, ids = vectors[keep], ids[keep]
+            docs = [doc for doc in docs if doc is not None]
+            self._metadata.keep(keep)
+        if index_kind == self.index_kind and nlist == getattr(self._base, "nlist", None):
+            # Compaction: keep the trained quantizer and codebooks.
+            base = empty_copy(self._base)
+        else:
+            base = self._new_index(index_kind, len(vectors), nlist)
+            if not base.is_trained and len(vectors):
+                base.train(_training_sample(vectors, base.nlist))
+        self._set_index(base, index_kind)
+        self._docs = DocumentList()
+        self._docs.extend(docs)
+        self._positions = {i: pos for pos, i in enumerate(ids.tolist())}
+        self._deleted = set()
+        self._alive = None
+        self._journal = None
+        self.generation += 1
+        if len(vectors):
+            self.index.add_with_ids(vectors, ids)
+
+    def _maybe_migrate_index(self) -> None:
+        """In ``auto`` mode, switch to a larger index kind once the corpus outgrows the current one."""
+        if self.index_type != "auto" or self.index_kind not in _INDEX_KINDS:
+            return
+        target = select_index_type(
+            len(self._positions), self.dimension, self.memory_budget, self.hnsw_m
+        )
+        if _INDEX_KINDS.index(target) > _INDEX_KINDS.index(self.index_kind):
+            self._rebuild_index(target)
+
+    def _add_vectors(
+        self,
+        vectors: "np.ndarray",
+        docs: List[str],
+        ids: Optional[Sequence[int]] = None,
+        metadatas: Optional[List[Optional[dict]]] = None,
+    ) -> None:
+        """Add precomputed vectors with their documents, ids and metadata to the store."""
+        vectors = np.array(vectors, dtype=np.float32, order="C")
+        if self.metric == "IP":
+            # Unit vectors make inner products cosine similarities.
+            faiss.normalize_L2(vectors)
+        if ids is None:
+            ids = [doc_id(doc) for doc in docs]
+        ids = np.asarray(ids, dtype=np.int64)
+        self._append_vectors(vectors, docs, ids, metadatas)
+        self._log_changes(
+            (OP_ADD, i, vector, doc, metadatas[offset] if metadatas else None)
+            for offset, (i, vector, doc) in enumerate(zip(ids.tolist(), vectors, docs))
+        )
+        self._maybe_migrate_index()
+
+    def _log_changes(self, records: Iterable[tuple], collection: Optional[str] = None) -> None:
+        """Append ``(op, id, vector, text, metadata)`` records to the change log, if any."""
+        if self.change_log is not None:
+            collection = collection or self.log_collection
+            self.log_sequence = self.change_log.append(
+                (op, collection, i, vector, text, metadata)
+                for op, i, vector, text, metadata in records
+            )
+
+    def _append_vectors(
+        self,
+        vectors: "np.ndarray",
+        docs: List[str],
+        ids: "np.ndarray",
+        metadatas: Optional[List[Optional[dict]]] = None,
+    ) -> None:
+        """Append already normalized vectors without migrating the index kind."""
+        if not self._base.is_trained:
+            # A manually chosen IVF index is trained on its first batch.
+            base = self._new_index(self.index_kind, len(vectors), getattr(self._base, "nlist", None))
+            if len(vectors) < _min_training_vectors(base):
+                raise ValueError(
+                    f"A {self.index_kind} index needs at least {_min_training_vectors(base)} "
+                    "vectors in its first batch to train; save a larger batch or "
+                    "use index_type='auto'"
+                )
+            base.train(_training_sample(vectors, base.nlist))
+            self._set_index(base, self.index_kind)
+        start = len(self._docs)
+        # Texts and metadata go first so a position found by the index always
+        # resolves to its document.
+        self._docs.extend(docs)
+        self._metadata.extend(metadatas or [None] * len(docs))
+        self.index.add_with_ids(vectors, ids)
+        if self.tiers is not None and self.tiers.active:
+            self.tiers.enforce_budget()
+        for offset, i in enumerate(ids.tolist()):
+            self._positions[i] = start + offset
+        self._alive = None
+        self.generation += 1
+        if self._journal is not None:
+            self._journal.extend(
+                (OP_ADD, start + offset, i, vector)
+                for offset, (i, vector) in enumerate(zip(ids.tolist(), vectors))
+            )
+
+    def _fork(self) -> "FAISSStore":
+        """Copy of the store that shares no mutable state with it."""
+        import copy
+
+        if self.tiers is not None:
+            raise NotImplementedError("Stores with tiered inverted lists cannot be forked")
+        fork = copy.copy(self)
+        fork._adopt_index(faiss.clone_index(self.index))
+        fork._docs = self._docs.copy()
+        fork._positions = dict(self._positions)
+        fork._deleted = set(self._deleted)
+        fork._alive = None
+        fork._metadata = copy.deepcopy(self._metadata)
+        fork._journal = None
+        fork._disk_path = None
+        fork.change_log = None
+        fork._parent = None
+        return fork
+
+    def _embed(self, docs: List[str]) -> "np.ndarray":
+        if self.embeddings:
+            embeddings = self.embeddings.embed_texts(docs)
+        else:
+            raise ValueError("Embeddings must be provided for saving documents")
+        return np.array(embeddings).astype('float32')
+
     # ---------------------------------------------------------------------
     # Search methods
     # ---------------------------------------------------------------------
 
+    def search_vectors(
+        self,
+        query_vectors: "np.ndarray",
+        limit: int = 3,
+        score_threshold: Optional[float] = 0.4,
+        filter: Optional[dict] = None,
+        radius: Optional[float] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Search with precomputed query vectors.
+
+        Returns ``(ids, scores)`` arrays of shape ``(len(query_vectors), limit)``,
+        best first. Slots without a hit scoring at least `score_threshold` have
+        id -1 and score -inf. Scores are ``1 / (1 + distance)`` for L2 indexes
+        and cosine similarity for IP indexes. With a `radius` (a squared L2
+        distance, or a cosine similarity for IP) only hits within it are
+        returned, found with a range search. FAISS releases the GIL while
+        scanning, so batches can be searched from several threads.
+        """
+        scores, positions = self._search_core(
+            query_vectors, limit, score_threshold, filter, radius=radius
+        )
+        ids = self._id_view()
+        if len(ids) == 0:
+            return positions, scores
+        return np.where(positions >= 0, ids[positions], -1), scores
+
+    def search_ids(
+        self,
+        queries: List[str],
+        limit: int = 3,
+        score_threshold: Optional[float] = 0.4,
+        filter: Optional[dict] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Embed `queries` in one batch and return `search_vectors` id and score arrays."""
+        if not queries:
+            empty = np.empty((0, limit))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        return self.search_vectors(self._embed_queries(queries), limit, score_threshold, filter)
+
+    def get_texts(self, ids: Iterable[int]) -> List[Optional[str]]:
+        """Return the document stored under each id, or None for -1 and unknown ids."""
+        results = []
+        for i in ids:
+            pos = self._positions.get(int(i))
+            results.append(None if pos is None else self._docs[pos])
+        return results
+
     def search(
         self,
         query: str,
         limit: int = 3,
-        score_threshold: float = 0.4
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
     ) -> List[str]:
         """Search for similar documents using FAISS with optimized performance."""
-        if not self.texts:
-            return []
-            
-        if self.embeddings:
-            query_embedding = self.embeddings.embed_texts([query])[0]
-        else:
-            raise ValueError("Embeddings must be provided for search")
-            
-        query_vector = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
-        
-        distances, indices = self.index.search(query_vector, min(limit * 2, len(self.texts)))
-        
-        results = []
-        results_append = results.append
-        
-        for i, distance in zip(indices[0], distances[0]):
-            if i == -1: 
-                continue
-                
-            if distance == 0.0:
-                score = 1.0
-            else:
-                score = 1.0 / (1.0 + distance)
-            
-            if score >= score_threshold:
-                results_append(self.texts[i])
-                if len(results) >= limit:
-                    break
-                    
-        return results
+        return [doc for doc, _ in self.search_with_scores(query, limit, score_threshold, filter)]
 
     def search_batch(
         self,
         queries: List[str],
         limit: int = 3,
-        score_threshold: float = 0.4
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
     ) -> List[List[str]]:
         """Batch search for multiple queries at once - much more efficient."""
-        if not self.texts or not queries:
-            return []
-            
-        if self.embeddings:
-            query_embeddings = self.embeddings.embed_texts(queries)
-        else:
-            raise ValueError("Embeddings must be provided for search")
-            
-        query_vectors = np.array(query_embeddings, dtype=np.float32)
-        
-        distances, indices = self.index.search(query_vectors, min(limit * 2, len(self.texts)))
-        
-        all_results = []
-        for query_idx in range(len(queries)):
-            results = []
-            results_append = results.append
-            
-            for i, distance in zip(indices[query_idx], distances[query_idx]):
-                if i == -1:
-                    continue
-                    
-                if distance == 0.0:
-                    score = 1.0
-                else:
-                    score = 1.0 / (1.0 + distance)
-                
-                if score >= score_threshold:
-                    results_append(self.texts[i])
-                    if len(results) >= limit:
-                        break
-                        
-            all_results.append(results)
-            
-        return all_results
+        if not self._positions or not queries:
+            return [[] for _ in queries]
+        _, positions = self._search_core(
+            self._embed_queries(queries), limit, score_threshold, filter
+        )
+        docs = self._docs
+        return [[docs[p] for p in row if p >= 0] for row in positions.tolist()]
 
     def search_with_scores(
         self,
         query: str,
         limit: int = 3,
-        score_threshold: float = 0.4
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
     ) -> List[tuple]:
         """Search and return results with similarity scores."""
-        if not self.texts:
+        if not self._positions:
             return []
-            
-        if self.embeddings:
-            query_embedding = self.embeddings.embed_texts([query])[0]
-        else:
-            raise ValueError("Embeddings must be provided for search")
-            
-        query_vector = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
-        distances, indices = self.index.search(query_vector, min(limit * 2, len(self.texts)))
-        
-        results = []
-        for i, distance in zip(indices[0], distances[0]):
-            if i == -1:
-                continue
-                
-            if distance == 0.0:
-                score = 1.0
-            else:
-                score = 1.0 / (1.0 + distance)
-            
-            if score >= score_threshold:
-                results.append((self.texts[i], score))
-                if len(results) >= limit:
-                    break
-                    
-        return results
+        scores, positions = self._search_core(
+            self._embed_queries([query]), limit, score_threshold, filter
+        )
+        return [
+            (self._docs[p], score)
+            for p, score in zip(positions[0].tolist(), scores[0].tolist())
+            if p >= 0
+        ]
+
+    def _search_mmr(
+        self,
+        query_vector: "np.ndarray",
+        limit: int,
+        fetch_k: int,
+        lambda_mult: float,
+        score_threshold: Optional[float],
+        filter: Optional[dict],
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """MMR-reranked ``(positions, scores)`` of the `fetch_k` nearest documents."""
+        scores, positions = self._search_core(
+            query_vector, max(fetch_k, limit), score_threshold, filter
+        )
+        found = positions[0] >= 0
+        positions, scores = positions[0][found], scores[0][found]
+        if len(positions) > 1:
+            order = maximal_marginal_relevance(
+                query_vector, self._base.reconstruct_batch(positions), limit, lambda_mult
+            )
+            positions, scores = positions[order], scores[order]
+        return positions, scores
+
+    def search_mmr_with_scores(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+    ) -> List[tuple]:
+        """Like `search_with_scores`, but diversified with maximal marginal relevance.
+
+        The `fetch_k` best matches are reranked with `maximal_marginal_relevance`
+        over their stored vectors, so near-duplicate chunks do not crowd out
+        the rest of the top `limit`. Scores are the usual similarity scores.
+        """
+        if not self._positions:
+            return []
+        positions, scores = self._search_mmr(
+            self._embed_queries([query]), limit, fetch_k, lambda_mult, score_threshold, filter
+        )
+        return [(self._docs[p], score) for p, score in zip(positions.tolist(), scores.tolist())]
+
+    def search_mmr(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.4,
+        filter: Optional[dict] = None,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+    ) -> List[str]:
+        """Diversified search; see `search_mmr_with_scores`."""
+        return [
+            doc
+            for doc, _ in self.search_mmr_with_scores(
+                query, limit, score_threshold, filter, fetch_k, lambda_mult
+            )
+        ]
 
     def search_approximate(
         self,
         query: str,
         limit: int = 3,
         score_threshold: float = 0.4,
-        nprobe: int = 10
+        nprobe: int = 10,
+        filter: Optional[dict] = None,
     ) -> List[str]:
         """Approximate search using IVF index for very large datasets."""
-        if not self.texts:
-            return []
-            
-        if hasattr(self.index, 'nprobe'):
-            self.index.nprobe = nprobe
-            
-        if self.embeddings:
-            query_embedding = self.embeddings.embed_texts([query])[0]
-        else:
-            raise ValueError("Embeddings must be provided for search")
-            
-        query_vector = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
-        distances, indices = self.index.search(query_vector, min(limit * 2, len(self.texts)))
-        
-        results = []
-        for i, distance in zip(indices[0], distances[0]):
-            if i == -1:
-                continue
-                
-            if distance == 0.0:
-                score = 1.0
-            else:
-                score = 1.0 / (1.0 + distance)
-            
-            if score >= score_threshold:
-                results.append(self.texts[i])
-                if len(results) >= limit:
-                    break
-                    
-        return results
+        if hasattr(self._base, 'nprobe'):
+            self._base.nprobe = nprobe
+        elif hasattr(self._base, 'hnsw'):
+            self._base.hnsw.efSearch = max(self.ef_search, limit * 2)
+        return self.search(query, limit, score_threshold, filter)
 
     def create_ivf_index(self, nlist: int = 100) -> None:
         """Create an IVF index for better performance on large datasets."""
-        if len(self.texts) == 0:
+        if not self._positions:
             return
-            
-        if self.embeddings:
-            all_embeddings = self.embeddings.embed_texts(self.texts)
-        else:
-            raise ValueError("Embeddings must be provided")
-            
-        vectors = np.array(all_embeddings, dtype=np.float32)
-        
-        quantizer = faiss.IndexFlatL2(self.dimension) if self.index_type == "L2" else faiss.IndexFlatIP(self.dimension)
-        self.index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist)
-        
-        self.index.train(vectors)
-        self.index.add(vectors)
+        self._rebuild_index("ivf", nlist)
 
     # ---------------------------------------------------------------------
     # Store interface implementation
     # ---------------------------------------------------------------------
 
-    def save(self, value: str) -> None:
+    def save(self, value: str, metadata: Optional[dict] = None) -> None:
         """Save a single document to the store."""
-        self.save_docs([value])
+        self.save_docs([value], [metadata] if metadata else None)
+
+    def save_docs(
+        self,
+        docs: List[str],
+        metadatas: Optional[List[Optional[dict]]] = None,
+        collection_name: Optional[str] = None,
+    ) -> "FAISSStore":
+        """Save multiple documents, each with an optional metadata dict, to the store.
 
-    def save_docs(self, docs: List[str]) -> "FAISSStore":
-        """Save multiple documents to the store."""
-        if not docs:
+        Documents whose content is already stored, and repeats within `docs`,
+        are skipped before embedding. A `collection_name` saves into that
+        collection, creating it if needed.
+        """
+        if collection_name is not None:
+            self.collection(collection_name).save_docs(docs, metadatas)
             return self
-            
-        if self.embeddings:
-            embeddings = self.embeddings.embed_texts(docs)
-        else:
-            raise ValueError("Embeddings must be provided for saving documents")
-            
-        vectors = np.array(embeddings).astype('float32')
-        
-        self.index.add(vectors)
-        
-        self.texts.extend(docs)
-        
+        rows, ids = self._new_rows(docs, metadatas)
+        if rows:
+            new_docs = [docs[pos] for pos in rows]
+            self._add_vectors(
+                self._embed(new_docs),
+                new_docs,
+                ids,
+                [metadatas[pos] for pos in rows] if metadatas else None,
+            )
+        return self
+
+    def save_vectors(
+        self,
+        vectors: "np.ndarray",
+        docs: List[str],
+        metadatas: Optional[List[Optional[dict]]] = None,
+    ) -> "FAISSStore":
+        """Save documents with precomputed embeddings, skipping stored ones like `save_docs`."""
+        if len(vectors) != len(docs):
+            raise ValueError("vectors and docs must have the same length")
+        rows, ids = self._new_rows(docs, metadatas)
+        if rows:
+            self._add_vectors(
+                np.asarray(vectors, dtype=np.float32)[rows],
+                [docs[pos] for pos in rows],
+                ids,
+                [metadatas[pos] for pos in rows] if metadatas else None,
+            )
+        return self
+
+    def _new_rows(
+        self, docs: List[str], metadatas: Optional[List[Optional[dict]]]
+    ) -> Tuple[List[int], List[int]]:
+        """Rows of `docs` whose content is not stored yet (first repeat only), and their ids."""
+        if metadatas is not None and len(metadatas) != len(docs):
+            raise ValueError("docs and metadatas must have the same length")
+        rows, ids = [], []
+        seen = set()
+        for pos, doc in enumerate(docs):
+            i = doc_id(doc)
+            if i in self._positions or i in seen:
+                continue
+            seen.add(i)
+            rows.append(pos)
+            ids.append(i)
+        return rows, ids
+
+    def upsert_docs(
+        self,
+        docs: List[str],
+        ids: Optional[Sequence[int]] = None,
+        metadatas: Optional[List[Optional[dict]]] = None,
+    ) -> "FAISSStore":
+        """Insert documents or replace the documents stored under their ids.
+
+        Ids default to the content hash. An id whose stored document differs is
+        re-embedded and replaced, an unchanged one only has its metadata
+        updated when `metadatas` is given. The last of repeated ids wins.
+        """
+        if ids is None:
+            ids = [doc_id(doc) for doc in docs]
+        if len(ids) != len(docs):
+            raise ValueError("docs and ids must have the same length")
+        if metadatas is not None and len(metadatas) != len(docs):
+            raise ValueError("docs and metadatas must have the same length")
+        latest = {
+            int(i): (doc, metadatas[pos] if metadatas else None)
+            for pos, (i, doc) in enumerate(zip(ids, docs))
+        }
+        changed = {}
+        for i, (doc, metadata) in latest.items():
+            pos = self._positions.get(i)
+            if pos is None or self._docs[pos] != doc:
+                changed[i] = (doc, metadata)
+            elif metadatas is not None:
+                self._set_metadata(pos, i, metadata)
+                self._log_changes([(OP_METADATA, i, None, None, metadata)])
+        if not changed:
+            return self
+        self.delete(ids=[i for i in changed if i in self._positions])
+        new_docs = [doc for doc, _ in changed.values()]
+        self._add_vectors(
+            self._embed(new_docs),
+            new_docs,
+            list(changed),
+            [metadata for _, metadata in changed.values()] if metadatas else None,
+        )
         return self
 
+    def _set_metadata(self, pos: int, i: int, metadata: Optional[dict]) -> None:
+        self._metadata.set_row(pos, metadata)
+        self.generation += 1
+        if self._journal is not None:
+            self._journal.append((OP_METADATA, pos, i, None))
+
+    def get_metadata(self, ids: Iterable[int]) -> List[Optional[dict]]:
+        """Return the metadata stored for each id, or None for unknown ids."""
+        results = []
+        for i in ids:
+            pos = self._positions.get(int(i))
+            results.append(None if pos is None else self._metadata.row(pos))
+        return results
+
+    def delete(
+        self,
+        ids: Optional[Iterable[int]] = None,
+        docs: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Delete documents by id or by content and return how many were removed."""
+        targets = [int(i) for i in ids or []]
+        targets.extend(doc_id(doc) for doc in docs or [])
+        removed = []
+        for i in targets:
+            pos = self._positions.pop(i, None)
+            if pos is None:
+                continue
+            self._docs[pos] = None
+            self._deleted.add(pos)
+            if self._journal is not None:
+                self._journal.append((OP_DELETE, pos, i, None))
+            removed.append(i)
+        self._log_changes((OP_DELETE, i, None, None, None) for i in removed)
+        if removed:
+            self._alive = None
+            self.generation += 1
+            if len(self._deleted) > self.compaction_threshold * len(self._docs):
+                self.compact()
+        return len(removed)
+
+    def compact(self) -> None:
+        """Rebuild the index without tombstoned documents to reclaim their space."""
+        if self._deleted:
+            self._rebuild_index(self.index_kind, getattr(self._base, "nlist", None))
+
+    def apply_changes(self, changes: Iterable[Tuple[int, tuple]]) -> int:
+        """Apply ``(sequence, record)`` pairs read from a `ChangeLog`; returns how many.
+
+        Records are applied by document id, so replaying changes the store
+        already reflects is harmless: a replica can start from any snapshot
+        taken after `log_sequence` and converge to the primary. Consecutive
+        additions to a store are added as one batch.
+        """
+        pending: Dict[int, tuple] = {}
+        target = self
+
+        def flush() -> None:
+            if pending:
+                values = list(pending.values())
+                target._append_vectors(
+                    np.stack([vector for vector, _, _ in values]),
+                    [text for _, text, _ in values],
+                    np.fromiter(pending, dtype=np.int64, count=len(pending)),
+                    [metadata for _, _, metadata in values],
+                )
+                target._maybe_migrate_index()
+                pending.clear()
+
+        count = 0
+        for sequence, (op, collection, i, vector, text, metadata) in changes:
+            store = self if collection is None or op == OP_DROP else self.collection(collection)
+            if store is not target or op != OP_ADD:
+                flush()
+                target = store
+            if op == OP_ADD:
+                if i not in target._positions:
+                    pending[i] = (vector, text, metadata)
+            elif op == OP_DELETE:
+                target.delete(ids=[i])
+            elif op == OP_METADATA:
+                pos = target._positions.get(i)
+                if pos is not None:
+                    target._set_metadata(pos, i, metadata)
+            elif op == OP_RESET:
+                target._clear()
+            elif op == OP_DROP:
+                self.drop_collection(collection)
+            target.log_sequence = self.log_sequence = sequence
+            count += 1
+        flush()
+        return count
+
     def reset(self) -> None:
-        """Reset the store by clearing all stored data."""
-        if self.index_type == "L2":
-            self.index = faiss.IndexFlatL2(self.dimension)
+        """Reset the store by clearing all stored data, including named collections."""
+        self._clear()
+        self._log_changes([(OP_RESET, 0, None, None, None)])
+        for name in list(self._collection_names):
+            self.drop_collection(name)
+
+    # ---------------------------------------------------------------------
+    # Collections
+    # ---------------------------------------------------------------------
+
+    def _collection_path(self, name: str) -> str:
+        import os
+        import tempfile
+
+        if self.collection_dir is None:
+            self.collection_dir = tempfile.mkdtemp(prefix="alith-collections-")
+        return os.path.join(self.collection_dir, name)
+
+    def _new_collection(self) -> "FAISSStore":
+        return FAISSStore(
+            dimension=self.dimension,
+            embeddings=self.embeddings,
+            index_type=self.index_type,
+            metric=self.metric,
+            hnsw_m=self.hnsw_m,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+            memory_budget=self.memory_budget,
+            compaction_threshold=self.compaction_threshold,
+            tier_dir=self.tier_dir,
+            tier_memory_budget=self.tier_memory_budget,
+        )
+
+    def _evict_collections(self) -> None:
+        """Spill least recently used collections to disk until within the limits."""
+
+        def over_budget() -> bool:
+            if len(self._resident) > self.max_resident_collections:
+                return True
+            if self.collection_memory_budget is None:
+                return False
+            used = sum(c.get_stats()["estimated_memory"] for c in self._resident.values())
+            return used > self.collection_memory_budget
+
+        # The most recently used collection always stays resident.
+        while len(self._resident) > 1 and over_budget():
+            name, collection = self._resident.popitem(last=False)
+            collection.save_to_disk(self._collection_path(name))
+
+    def collection(self, collection_name: str, create: bool = True) -> "FAISSStore":
+        """Return the named collection, loading it from disk if it was spilled."""
+        if collection_name is None:
+            return self
+        collection = self._resident.get(collection_name)
+        if collection is not None:
+            self._resident.move_to_end(collection_name)
+            return collection
+        if not re.fullmatch(r"[\w.-]+", collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name!r}")
+        if collection_name not in self._collection_names and not create:
+            raise KeyError(f"Collection {collection_name!r} does not exist")
+        collection = self._new_collection()
+        collection.change_log = self.change_log
+        collection.log_collection = collection_name
+        collection._parent = self
+        if collection_name in self._collection_names:
+            collection.load_from_disk(self._collection_path(collection_name))
         else:
-            self.index = faiss.IndexFlatIP(self.dimension)
-        self.texts = []
+            # Replicas create the collection even if nothing is saved into it.
+            collection._log_changes([(OP_RESET, 0, None, None, None)])
+        self._collection_names.add(collection_name)
+        self._resident[collection_name] = collection
+        self._evict_collections()
+        return collection
+
+    def list_collections(self) -> List[str]:
+        return sorted(self._collection_names)
 
     def has_collection(self, collection_name: str = None) -> bool:
-        """Check if the collection exists. For FAISS, this always returns True since we use a single index."""
-        return True
+        """Check if the collection exists; the default collection always does."""
+        return collection_name is None or collection_name in self._collection_names
 
     def create_collection(self, collection_name: str = None) -> "FAISSStore":
-        """Create a new collection. For FAISS, this resets the current index."""
-        self.reset()
+        """Create a named collection, or reset the default one when no name is given."""
+        if collection_name is None:
+            self._clear()
+            self._log_changes([(OP_RESET, 0, None, None, None)])
+        else:
+            self.collection(collection_name)
         return self
 
+    def drop_collection(self, collection_name: str) -> None:
+        """Remove a named collection from memory and disk."""
+        import os
+
+        self._resident.pop(collection_name, None)
+        if collection_name not in self._collection_names:
+            return
+        self._collection_names.discard(collection_name)
+        self.generation += 1
+        self._log_changes([(OP_DROP, 0, None, None, None)], collection=collection_name)
+        path = self._collection_path(collection_name)
+        for suffix in (
+            ".index", ".ivfdata", ".texts", ".offsets.npy", ".metadata.json", ".wal", ".manifest.json"
+        ):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
     def search_in(
         self,
         query: str,
         limit: int = 3,
         score_threshold: float = 0.4,
-        collection_name: str = None
+        collection_name: str = None,
+        filter: Optional[dict] = None,
     ) -> List[str]:
-        """Search in a specific collection. For FAISS, this is the same as search since we use a single index."""
-        return self.search(query, limit, score_threshold)
+        """Search in a named collection, or the default one when no name is given."""
+        if collection_name is not None and collection_name not in self._collection_names:
+            return []
+        return self.collection(collection_name).search(query, limit, score_threshold, filter)
 
     def get_stats(self) -> dict:
         """Get statistics about the FAISS store."""
-        return {
-            "total_documents": len(self.texts),
+        stats = {
+            "total_documents": len(self._positions),
             "index_size": self.index.ntotal if hasattr(self.index, 'ntotal') else 0,
+            "deleted_documents": len(self._deleted),
             "dimension": self.dimension,
-            "index_type": self.index_type
+            "index_type": self.index_type,
+            "index_kind": self.index_kind,
+            "metric": self.metric,
+            "estimated_memory": estimate_index_memory(
+                "flat" if self.index_kind == "ivf" else self.index_kind,
+                self.index.ntotal,
+                self.dimension,
+                self.hnsw_m,
+            ),
         }
+        if self.tiers is not None and self.tiers.active:
+            stats["tiers"] = self.tiers.stats()
+            # Centroids and hot lists; cold lists are only mapped while probed.
+            stats["estimated_memory"] = (
+                self._base.nlist * self.dimension * 4 + stats["tiers"]["hot_bytes"]
+            )
+        return stats
 
     def save_to_disk(self, path: str) -> None:
-        """Save the FAISS index and texts to disk."""
+        """Save the store to disk.
+
+        The first save to `path` writes a snapshot: the FAISS index, a text blob
+        with an offsets array, the metadata and a small manifest. Later saves to
+        the same path only append the changes since the previous save to a
+        write-ahead log, until the log outgrows `WAL_CHECKPOINT_RATIO` of the
+        snapshot or the index is rebuilt, at which point a new snapshot is
+        written and the log is discarded.
+        """
+        import os
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        wal = WriteAheadLog(path, self.dimension)
+        if self._journal is not None and self._disk_path == path:
+            pending = self._wal_records + len(self._journal)
+            if pending <= WAL_CHECKPOINT_RATIO * self._snapshot_size:
+                self._wal_records += wal.append(
+                    (
+                        op,
+                        pos,
+                        i,
+                        vector,
+                        self._docs[pos] if op == OP_ADD else None,
+                        self._metadata.row(pos) if op != OP_DELETE else None,
+                    )
+                    for op, pos, i, vector in self._journal
+                )
+                self._journal = []
+                return
+        self._write_snapshot(path)
+        wal.remove()
+        self._journal = []
+        self._disk_path = path
+        self._snapshot_size = len(self._docs)
+        self._wal_records = 0
+
+    def _write_snapshot(self, path: str) -> None:
         import json
         import os
-        
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        
-        faiss.write_index(self.index, f"{path}.index")
-        
-        with open(f"{path}.json", 'w') as f:
-            json.dump(self.texts, f)
+
+        tmp = f"{path}.index.tmp"
+        if self.tiers is not None and self.tiers.active:
+            self.tiers.write_index(self.index, tmp, f"{path}.ivfdata")
+        else:
+            faiss.write_index(self.index, tmp)
+        os.replace(tmp, f"{path}.index")
+        write_documents(path, self._docs)
+        if self._metadata:
+            rows = [self._metadata.row(pos) for pos in range(len(self._docs))]
+            with open(f"{path}.metadata.json", 'w') as f:
+                json.dump(rows, f, default=str)
+        elif os.path.exists(f"{path}.metadata.json"):
+            os.remove(f"{path}.metadata.json")
+        write_manifest(
+            path,
+            {
+                "version": 1,
+                "count": len(self._docs),
+                "deleted": sorted(self._deleted),
+                "dimension": self.dimension,
+                "metric": self.metric,
+                "index_kind": self.index_kind,
+                "log_sequence": self.log_sequence,
+            },
+        )
 
     def load_from_disk(self, path: str) -> None:
-        """Load the FAISS index and texts from disk."""
+        """Load the store from disk.
+
+        Flat and HNSW indexes are memory-mapped and document texts are read
+        from the blob file on access, so loading does not scale with the size
+        of the corpus apart from the id lookup table. Changes in the
+        write-ahead log are replayed on top of the snapshot.
+        """
         import json
         import os
-        
+
+        manifest = read_manifest(path)
+        if manifest is None:
+            self._load_legacy(path)
+            return
+
+        flags = faiss.IO_FLAG_MMAP if manifest["index_kind"] in ("flat", "hnsw") else 0
+        try:
+            index = faiss.read_index(f"{path}.index", flags)
+        except RuntimeError:
+            if not os.path.exists(f"{path}.ivfdata"):
+                raise
+            # A tiered snapshot whose `.ivfdata` list file moved along with it.
+            index = faiss.read_index(f"{path}.index", flags | faiss.IO_FLAG_ONDISK_SAME_DIR)
+        self._adopt_index(index)
+        deleted = manifest["deleted"]
+        self._docs = DocumentList.open(path, deleted)
+        self._metadata = MetadataTable()
+        if os.path.exists(f"{path}.metadata.json"):
+            with open(f"{path}.metadata.json", 'r') as f:
+                self._metadata.extend(json.load(f))
+        else:
+            self._metadata.extend([None] * len(self._docs))
+        self._deleted = set(deleted)
+        ids = self._id_view().tolist()
+        self._positions = {
+            i: pos for pos, i in enumerate(ids) if pos not in self._deleted
+        }
+        self._alive = None
+        self._journal = None
+        self.generation += 1
+        self._snapshot_size = manifest["count"]
+        self._wal_records = 0
+        self.log_sequence = manifest.get("log_sequence", 0)
+
+        for op, pos, i, vector, text, metadata in WriteAheadLog(path, self.dimension).read():
+            if op == OP_ADD:
+                if pos != len(self._docs):
+                    raise ValueError(f"Corrupt write-ahead log for {path}: unexpected position {pos}")
+                self._append_vectors(
+                    vector.reshape(1, -1), [text], np.array([i], dtype=np.int64), [metadata]
+                )
+            elif op == OP_DELETE:
+                self._docs[pos] = None
+                self._deleted.add(pos)
+                if self._positions.get(i) == pos:
+                    del self._positions[i]
+            elif op == OP_METADATA:
+                self._metadata.set_row(pos, metadata)
+            self._wal_records += 1
+        self._journal = []
+        self._disk_path = path
+        self._maybe_migrate_index()
+
+    def _load_legacy(self, path: str) -> None:
+        """Load files written by `save_to_disk` before it kept a manifest."""
+        import json
+        import os
+
+        index = None
+        docs: List[Optional[str]] = []
         if os.path.exists(f"{path}.index"):
-            self.index = faiss.read_index(f"{path}.index")
-            
+            index = faiss.read_index(f"{path}.index")
         if os.path.exists(f"{path}.json"):
             with open(f"{path}.json", 'r') as f:
-                self.texts = json.load(f)
+                docs = json.load(f)
+        if index is None:
+            return
+
+        if not isinstance(index, faiss.IndexIDMap2):
+            # Files written before the store kept ids: re-key them by content hash.
+            ivf = faiss.try_extract_index_ivf(index)
+            if ivf is not None:
+                ivf.make_direct_map()
+            vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+            self._clear()
+            if vectors is not None:
+                keep = {}
+                for pos, doc in enumerate(docs):
+                    keep.setdefault(doc_id(doc), pos)
+                rows = sorted(keep.values())
+                self._add_vectors(vectors[rows], [docs[pos] for pos in rows], list(keep))
+            return
+
+        self._clear()
+        self._adopt_index(index)
+        self._docs.extend(docs)
+        if os.path.exists(f"{path}.metadata.json"):
+            with open(f"{path}.metadata.json", 'r') as f:
+                self._metadata.extend(json.load(f))
+        else:
+            self._metadata.extend([None] * len(docs))
+        ids = self._id_view().tolist()
+        self._positions = {
+            i: pos for pos, i in enumerate(ids) if docs[pos] is not None
+        }
+        self._deleted = {pos for pos, doc in enumerate(docs) if doc is None}
+
+
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+
+
+def _read_image(path: str, known: Dict[int, int]):
+    """Read and hash an image file; decode it unless its content id is in `known`."""
+    with open(path, "rb") as f:
+        data = f.read()
+    image_id = doc_id(data)
+    if image_id in known:
+        return image_id, None
+    try:
+        from PIL import Image
+    except ImportError:
+        # Leave decoding to the embeddings.
+        return image_id, path
+    import io
+
+    with Image.open(io.BytesIO(data)) as opened:
+        return image_id, opened.convert("RGB")
 
 
 class ImageFAISSStore(FAISSStore):
-    """FAISS vector store with image support."""
-    
+    """FAISS vector store with image support.
+
+    Images are stored under the content hash of the file, with their absolute
+    path as the document, so the same picture is only embedded once. Image
+    ids are kept in an int64 array next to the index, and logged to the
+    change log so replicas know them too.
+    """
+
     def __init__(
         self,
         dimension: int = 512,
         embeddings: Optional[Embeddings] = None,
-        index_type: str = "L2"
+        index_type: str = "L2",
+        change_log_dir: Optional[str] = None,
     ):
         super().__init__(
-            dimension=dimension, embeddings=embeddings, index_type=index_type
+            dimension=dimension,
+            embeddings=embeddings,
+            index_type=index_type,
+            change_log_dir=change_log_dir,
         )
-        self.image_paths: List[str] = []
-        self.index_to_document: dict[int, str] = {}
+
+    def _clear(self) -> None:
+        super()._clear()
+        self._image_ids = np.empty(16, dtype=np.int64)
+        self._num_images = 0
+
+    def _fork(self) -> "ImageFAISSStore":
+        fork = super()._fork()
+        fork._image_ids = self._image_ids.copy()
+        return fork
+
+    def _mark_images(self, ids: Sequence[int]) -> None:
+        needed = self._num_images + len(ids)
+        if needed > len(self._image_ids):
+            grown = np.empty(max(needed, 2 * len(self._image_ids)), dtype=np.int64)
+            grown[: self._num_images] = self._image_ids[: self._num_images]
+            self._image_ids = grown
+        self._image_ids[self._num_images : needed] = ids
+        self._num_images = needed
+
+    def _unmark_images(self, ids: Sequence[int]) -> None:
+        images = self._image_ids[: self._num_images]
+        kept = images[~np.isin(images, np.asarray(ids, dtype=np.int64))]
+        self._image_ids[: len(kept)] = kept
+        self._num_images = len(kept)
+
+    def _live_positions(self, images: bool) -> "np.ndarray":
+        is_image = np.isin(self._id_view(), self._image_ids[: self._num_images])
+        alive = np.ones(len(is_image), dtype=bool)
+        if self._deleted:
+            alive[list(self._deleted)] = False
+        return np.flatnonzero(alive & (is_image if images else ~is_image))
+
+    @property
+    def texts(self) -> List[str]:
+        """The stored text documents, in insertion order."""
+        return [self._docs[pos] for pos in self._live_positions(images=False).tolist()]
+
+    @property
+    def image_paths(self) -> List[str]:
+        """Absolute paths of the stored images, in insertion order."""
+        return [self._docs[pos] for pos in self._live_positions(images=True).tolist()]
+
+    @property
+    def index_to_document(self) -> Dict[int, str]:
+        """Mapping from document id to the stored text or image path.
+
+        Built on every access; use `get_texts` to look up individual ids.
+        """
+        return {i: self._docs[pos] for i, pos in self._positions.items()}
     
     def search(
         self,
         query: str,
         limit: int = 10,
-        score_threshold: float = 0.2
+        score_threshold: float = 0.2,
+        filter: Optional[dict] = None,
     ) -> List[str]:
         """Search for similar documents."""
-        if not self.texts and not self.image_paths:
-            return []
-            
-        if self.embeddings:
-            query_embedding = self.embeddings.embed_texts([query])[0]
-        else:
-            raise ValueError("Embeddings must be provided for search")
-            
-        query_vector = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
-        
-        total_docs = len(self.texts) + len(self.image_paths)
-        distances, indices = self.index.search(query_vector, min(limit * 2, total_docs))
-        
-        results = []
-        results_append = results.append
-        
-        for i, distance in zip(indices[0], distances[0]):
-            if i == -1: 
-                continue
-                
-            if distance == 0.0:
-                score = 1.0
-            else:
-                score = 1.0 / (1.0 + distance)
-            
-            if score >= score_threshold:
-                document = self.index_to_document.get(i)
-                if document:
-                    results_append(document)
-                elif i < len(self.texts):
-                    results_append(self.texts[i])
-                if len(results) >= limit:
-                    break
-                    
-        return results
-    
-    def save(self, value: Union[str, Path]) -> None:
+        return super().search(query, limit, score_threshold, filter)
+
+    def search_mmr(
+        self,
+        query: str,
+        limit: int = 10,
+        score_threshold: float = 0.2,
+        filter: Optional[dict] = None,
+        fetch_k: int = 40,
+        lambda_mult: float = 0.5,
+    ) -> List[str]:
+        """Diversified search over texts and images; see `FAISSStore.search_mmr_with_scores`."""
+        return super().search_mmr(query, limit, score_threshold, filter, fetch_k, lambda_mult)
+
+    def _add_images(self, ids: List[int], images: list, paths: List[str], metadatas) -> None:
+        vectors = np.array(self.embeddings.embed_images(images), dtype=np.float32)
+        self._add_vectors(vectors, paths, ids, metadatas)
+        self._mark_images(ids)
+        self._log_changes((OP_IMAGE, i, None, None, None) for i in ids)
+
+    def delete(
+        self,
+        ids: Optional[Iterable[int]] = None,
+        docs: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Delete texts or images by id or by content and return how many were removed.
+
+        An image is deleted through `docs` by its path, as stored or as a
+        file whose content matches a stored image.
+        """
+        import os
+
+        targets = [int(i) for i in ids or []]
+        docs = list(docs or [])
+        if docs:
+            ids_at = self._id_view()
+            images = {
+                self._docs[pos]: int(ids_at[pos])
+                for pos in self._live_positions(images=True).tolist()
+            }
+            for doc in docs:
+                path = os.path.abspath(doc)
+                if path in images:
+                    targets.append(images[path])
+                    continue
+                targets.append(doc_id(doc))
+                if os.path.isfile(path) and Path(path).suffix.lower() in _IMAGE_EXTENSIONS:
+                    with open(path, "rb") as f:
+                        targets.append(doc_id(f.read()))
+        removed = super().delete(ids=targets)
+        if removed:
+            self._unmark_images(targets)
+        return removed
+
+    def apply_changes(self, changes: Iterable[Tuple[int, tuple]]) -> int:
+        """Same as `FAISSStore.apply_changes`, also marking the logged images."""
+        changes = list(changes)
+        count = super().apply_changes(changes)
+        marks = [
+            i for _, (op, collection, i, *_) in changes
+            if op == OP_IMAGE and collection is None and i in self._positions
+        ]
+        if marks:
+            self._unmark_images(marks)
+            self._mark_images(marks)
+        return count
+
+    def save_images(
+        self,
+        paths: Iterable[Union[str, Path]],
+        metadatas: Optional[List[Optional[dict]]] = None,
+        batch_size: int = 32,
+        prefetch: int = 4,
+    ) -> "ImageFAISSStore":
+        """Embed and save images in batches through `embed_images`.
+
+        Files are read, hashed and decoded on a pool of `prefetch` threads,
+        at most `prefetch` batches ahead of the batch being embedded. Images
+        whose content is already stored are skipped before decoding, and
+        unreadable images are skipped with a warning.
+        """
+        import warnings
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        if not self.embeddings or not hasattr(self.embeddings, "embed_images"):
+            raise ValueError("Embeddings with image support must be provided for saving images")
+        paths = [str(Path(path).absolute()) for path in paths]
+        if metadatas is not None and len(metadatas) != len(paths):
+            raise ValueError("paths and metadatas must have the same length")
+
+        batch: List[tuple] = []
+        seen: Set[int] = set()
+
+        def flush() -> None:
+            if batch:
+                ids, images, batch_paths, batch_metadatas = zip(*batch)
+                self._add_images(
+                    list(ids), list(images), list(batch_paths),
+                    list(batch_metadatas) if metadatas else None,
+                )
+                batch.clear()
+
+        with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="alith-images") as pool:
+            queued = iter(enumerate(paths))
+            pending: deque = deque()
+
+            def submit(count: int) -> None:
+                for pos, path in queued:
+                    pending.append((pos, path, pool.submit(_read_image, path, self._positions)))
+                    count -= 1
+                    if count == 0:
+                        return
+
+            submit(batch_size * prefetch)
+            while pending:
+                pos, path, future = pending.popleft()
+                submit(1)
+                try:
+                    image_id, image = future.result()
+                except Exception as e:
+                    warnings.warn(f"Failed to read image {path}: {e}. Skipping.")
+                    continue
+                if image is None or image_id in self._positions or image_id in seen:
+                    continue
+                seen.add(image_id)
+                batch.append((image_id, image, path, metadatas[pos] if metadatas else None))
+                if len(batch) == batch_size:
+                    flush()
+            flush()
+        return self
+
+    def save(self, value: Union[str, Path], metadata: Optional[dict] = None) -> None:
         """Save image or text to storage.
         
         If value is an image path and embeddings support image embeddings,
         the image will be embedded and stored. Otherwise, value is treated as text.
+        Images already in the store are skipped.
         
         Args:
             value: Image path or text string to save.
+            metadata: Optional metadata stored with the document.
         """
-        is_image = False
-        image_path = None
-        
-        if isinstance(value, (str, Path)):
-            path = Path(value)
-            image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
-            if path.exists() and path.suffix.lower() in image_extensions:
-                is_image = True
-                image_path = str(path)
-        
+        path = Path(value)
+        is_image = path.suffix.lower() in _IMAGE_EXTENSIONS and path.exists()
         if is_image and self.embeddings and hasattr(self.embeddings, 'embed_images'):
             try:
-                image_embeddings = self.embeddings.embed_images([image_path])
-                if image_embeddings:
-                    vectors = np.array(image_embeddings, dtype=np.float32)
-                    abs_image_path = str(Path(image_path).absolute())
-                    index_before = self.index.ntotal
-                    self.index.add(vectors)
-                    current_index = index_before
-                    self.image_paths.append(abs_image_path)
-                    self.index_to_document[current_index] = abs_image_path
-                    return
-            except (NotImplementedError, AttributeError, Exception) as e:
+                image_id, image = _read_image(str(path), self._positions)
+                if image is not None:
+                    self._add_images(
+                        [image_id],
+                        [image],
+                        [str(path.absolute())],
+                        [metadata] if metadata else None,
+                    )
+                return
+            except Exception as e:
                 import warnings
-                msg = f"Failed to embed image {image_path}: {e}. Treating as text."
+                msg = f"Failed to embed image {path}: {e}. Treating as text."
                 warnings.warn(msg)
-                pass
-        
-        self.save_docs([str(value)])
-    
-    def save_docs(self, docs: List[str]) -> "ImageFAISSStore":
-        """Save multiple documents to the store.
-        
-        Args:
-            docs: List of text documents to save.
-        
-        Returns:
-            Self for method chaining.
-        
-        Raises:
-            ValueError: If embeddings are not provided.
-        """
-        if not docs:
-            return self
-            
-        if self.embeddings:
-            embeddings = self.embeddings.embed_texts(docs)
-        else:
-            raise ValueError("Embeddings must be provided for saving documents")
-            
-        vectors = np.array(embeddings).astype('float32')
-        
-        start_index = self.index.ntotal
-        self.index.add(vectors)
-        
-        for i, doc in enumerate(docs):
-            self.index_to_document[start_index + i] = doc
-        
-        self.texts.extend(docs)
-        
-        return self
-    
-    def reset(self) -> None:
-        """Reset the store by clearing all stored data."""
-        super().reset()
-        self.image_paths = []
-        self.index_to_document = {}
+
+        self.save_docs([str(value)], [metadata] if metadata else None)
+
+    def save_to_disk(self, path: str) -> None:
+        """Save the store to disk, along with which documents are images."""
+        super().save_to_disk(path)
+        np.save(f"{path}.images.npy", self._image_ids[: self._num_images])
+
+    def load_from_disk(self, path: str) -> None:
+        import os
+
+        super().load_from_disk(path)
+        self._image_ids = np.empty(16, dtype=np.int64)
+        self._num_images = 0
+        if os.path.exists(f"{path}.images.npy"):
+            self._mark_images(np.load(f"{path}.images.npy"))
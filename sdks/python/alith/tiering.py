@@ -0,0 +1,242 @@
+import ctypes
+import mmap
+import os
+import shutil
+import threading
+import uuid
+from typing import Optional
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    # FAISSStore reports the missing dependency.
+    faiss = None
+
+_PAGE_SIZE = mmap.PAGESIZE
+
+
+def _load_madvise():
+    if not hasattr(mmap, "MADV_DONTNEED"):
+        return None
+    try:
+        madvise = ctypes.CDLL(None, use_errno=True).madvise
+    except (OSError, AttributeError):
+        return None
+    madvise.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+    madvise.restype = ctypes.c_int
+    return madvise
+
+
+_madvise = _load_madvise()
+
+
+def on_disk_lists(ivf) -> Optional["faiss.OnDiskInvertedLists"]:
+    """The `OnDiskInvertedLists` of an IVF index, or None when its lists are in memory."""
+    lists = faiss.downcast_InvertedLists(ivf.invlists)
+    return lists if isinstance(lists, faiss.OnDiskInvertedLists) else None
+
+
+def _copy_lists(source, target, nlist: int) -> None:
+    for list_no in range(nlist):
+        size = source.list_size(list_no)
+        if size:
+            target.add_entries(list_no, size, source.get_ids(list_no), source.get_codes(list_no))
+
+
+def _replace_lists(ivf, lists) -> None:
+    ivf.replace_invlists(lists, True)
+    lists.this.disown()
+
+
+def lists_to_memory(ivf) -> None:
+    """Move on-disk inverted lists into memory, e.g. after loading a tiered snapshot."""
+    lists = faiss.ArrayInvertedLists(ivf.nlist, ivf.code_size)
+    _copy_lists(ivf.invlists, lists, ivf.nlist)
+    _replace_lists(ivf, lists)
+
+
+def empty_copy(index):
+    """Empty copy of `index` keeping its trained state; works for on-disk IVF lists.
+
+    `clone_index` cannot copy on-disk lists, so they are swapped for empty
+    in-memory ones while cloning.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None or on_disk_lists(ivf) is None:
+        copy = faiss.clone_index(index)
+        copy.reset()
+        return copy
+    lists, owned = ivf.invlists, ivf.own_invlists
+    ivf.own_invlists = False
+    _replace_lists(ivf, faiss.ArrayInvertedLists(ivf.nlist, ivf.code_size))
+    try:
+        copy = faiss.clone_index(index)
+    finally:
+        ivf.replace_invlists(lists, owned)
+    copy.reset()
+    return copy
+
+
+class ListTiers:
+    """Keeps the frequently probed inverted lists of an IVF index in memory.
+
+    The lists live in a memory-mapped `OnDiskInvertedLists` file under
+    `directory`; only the coarse centroids are always in memory. Every search
+    counts the lists it probes. Every `rebalance_interval` queries the counts
+    decay by `decay` and the most probed lists that together fit in
+    `memory_budget` bytes become the hot tier: they are prefetched and stay
+    mapped. Pages of cold lists are handed back to the page cache right after
+    a search or write touches them, so resident memory stays near the budget
+    whatever the size of the corpus. Without ``madvise`` (non-POSIX systems)
+    lists are still served from disk, but residency is left to the OS.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        memory_budget: Optional[int] = None,
+        rebalance_interval: int = 1000,
+        decay: float = 0.5,
+    ):
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.rebalance_interval = rebalance_interval
+        self.decay = decay
+        self.path: Optional[str] = None
+        self._ivf = None
+        self._lists = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self._ivf is not None
+
+    def attach(self, ivf) -> None:
+        """Move the lists of `ivf` into a new file under `directory` and track them."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.ivfdata")
+        lists = on_disk_lists(ivf)
+        if lists is not None:
+            # Lists loaded from a snapshot: work on a copy so the snapshot stays intact.
+            shutil.copyfile(lists.filename, path)
+            lists.filename = path
+            lists.update_totsize(lists.totsize)
+        else:
+            lists = faiss.OnDiskInvertedLists(ivf.nlist, ivf.code_size, path)
+            _copy_lists(ivf.invlists, lists, ivf.nlist)
+            _replace_lists(ivf, lists)
+        self.detach()
+        self.path = path
+        self._ivf = ivf
+        self._lists = on_disk_lists(ivf)
+        self._counts = np.zeros(ivf.nlist, dtype=np.float64)
+        self._hot = np.zeros(ivf.nlist, dtype=bool)
+        self._queries = 0
+        self.enforce_budget()
+
+    def detach(self) -> None:
+        """Stop tracking the current index and delete its file once unused."""
+        if self.path is not None and os.path.exists(self.path):
+            # The index may still be mapped by readers; unlinking keeps the data until unmapped.
+            os.remove(self.path)
+        self.path = None
+        self._ivf = None
+        self._lists = None
+
+    # ---------------------------------------------------------------------
+    # Residency
+    # ---------------------------------------------------------------------
+
+    def _slot(self, list_no: int):
+        """Byte range of a list's codes and ids inside the file."""
+        slot = self._lists.lists.at(int(list_no))
+        return slot.offset, slot.offset + slot.capacity * (self._lists.code_size + 8)
+
+    def _advise(self, start: int, end: int, advice: int) -> None:
+        if _madvise is None or self._lists.totsize == 0:
+            return
+        if advice == mmap.MADV_DONTNEED:
+            # Only release whole pages inside the range, never a neighbour's.
+            start = -(-start // _PAGE_SIZE) * _PAGE_SIZE
+            end = end // _PAGE_SIZE * _PAGE_SIZE
+        else:
+            start = start // _PAGE_SIZE * _PAGE_SIZE
+            end = -(-end // _PAGE_SIZE) * _PAGE_SIZE
+        end = min(end, self._lists.totsize)
+        if end > start:
+            base = faiss.rev_swig_ptr(self._lists.ptr, 1).ctypes.data
+            _madvise(base + start, end - start, advice)
+
+    def release(self, lists: "np.ndarray") -> None:
+        """Drop the pages of the cold lists among `lists` from this process."""
+        with self._lock:
+            for list_no in lists[~self._hot[lists]].tolist():
+                self._advise(*self._slot(list_no), mmap.MADV_DONTNEED)
+
+    def enforce_budget(self) -> None:
+        """Prefetch the hot lists and release every other page of the file."""
+        with self._lock:
+            if self._lists.totsize == 0:
+                return
+            ranges = sorted(self._slot(list_no) for list_no in np.flatnonzero(self._hot).tolist())
+            cursor = 0
+            for start, end in ranges:
+                self._advise(cursor, start, mmap.MADV_DONTNEED)
+                self._advise(start, end, mmap.MADV_WILLNEED)
+                cursor = max(cursor, end)
+            self._advise(cursor, self._lists.totsize, mmap.MADV_DONTNEED)
+
+    def record(self, query_vectors: "np.ndarray", nprobe: int) -> "np.ndarray":
+        """Count the lists the queries will probe; returns them for `release`."""
+        _, probes = self._ivf.quantizer.search(query_vectors, nprobe)
+        probes = probes[probes >= 0]
+        with self._lock:
+            self._counts += np.bincount(probes, minlength=len(self._counts))
+            self._queries += len(query_vectors)
+            due = self._queries >= self.rebalance_interval
+            if due:
+                self._queries = 0
+        if due:
+            self.rebalance()
+        return np.unique(probes)
+
+    def rebalance(self) -> None:
+        """Make the most probed lists that fit in the budget the hot tier."""
+        with self._lock:
+            hot = np.zeros_like(self._hot)
+            used = 0
+            entry_size = self._lists.code_size + 8
+            for list_no in np.argsort(-self._counts, kind="stable").tolist():
+                if self._counts[list_no] <= 0:
+                    break
+                size = self._lists.list_size(list_no) * entry_size
+                if self.memory_budget is not None and used + size > self.memory_budget:
+                    # A smaller, less probed list may still fit.
+                    continue
+                hot[list_no] = True
+                used += size
+            self._hot = hot
+            self._counts *= self.decay
+        self.enforce_budget()
+
+    def stats(self) -> dict:
+        entry_size = self._lists.code_size + 8
+        hot = np.flatnonzero(self._hot).tolist()
+        return {
+            "hot_lists": len(hot),
+            "hot_bytes": sum(self._lists.list_size(list_no) for list_no in hot) * entry_size,
+            "memory_budget": self.memory_budget,
+            "file_bytes": self._lists.totsize,
+        }
+
+    def write_index(self, index, index_path: str, data_path: str) -> None:
+        """Write `index` with a copy of the list file at `data_path` next to it."""
+        shutil.copyfile(self.path, f"{data_path}.tmp")
+        os.replace(f"{data_path}.tmp", data_path)
+        self._lists.filename = data_path
+        try:
+            faiss.write_index(index, index_path)
+        finally:
+            self._lists.filename = self.path
@@ -0,0 +1,56 @@
+"""ChromaDB ingestion and multi-query throughput at different batch sizes.
+
+Batch size 1 reproduces the old behaviour: one upsert per document and one
+`collection.query` per query string.
+
+    python3 benchmarks/stores/chroma.py --size 20000 --batch-sizes 1,64,512,4096
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+from alith import ChromaDBStore
+
+from common import HashingEmbeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--batch-sizes", default="1,64,512,4096")
+    args = parser.parse_args()
+
+    embeddings = HashingEmbeddings(args.dimension)
+    docs = [f"document {i} about topic {i % 97} and subject {i % 13}" for i in range(args.size)]
+    queries = [f"topic {i % 97} subject {i % 13}" for i in range(args.queries)]
+    for batch_size in [int(n) for n in args.batch_sizes.split(",")]:
+        with tempfile.TemporaryDirectory() as path:
+            store = ChromaDBStore(path=path, embeddings=embeddings)
+            start = time.perf_counter()
+            for n in range(0, len(docs), batch_size):
+                store.save_docs(docs[n : n + batch_size], batch_size=batch_size)
+            ingest = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for n in range(0, len(queries), batch_size):
+                store.search_batch(queries[n : n + batch_size], limit=10, score_threshold=0.0)
+            search = time.perf_counter() - start
+            print(
+                json.dumps(
+                    {
+                        "batch_size": batch_size,
+                        "docs_per_s": round(len(docs) / ingest, 1),
+                        "queries_per_s": round(len(queries) / search, 1),
+                    }
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Chunking throughput: `alith.chunk_texts` versus looping over `alith.chunk_text`.
+
+Needs the compiled `_alith` extension. The knowledge dump is repeated
+`--copies` times to get a larger corpus.
+
+    python3 benchmarks/stores/chunking.py --copies 20
+    python3 benchmarks/stores/chunking.py --max-tokens 400 --overlap 0.1
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import time
+
+from alith import chunk_text, chunk_texts
+
+from common import load_knowledge
+
+
+def report(method: str, texts, chunks: int, elapsed: float) -> dict:
+    return {
+        "method": method,
+        "documents": len(texts),
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "documents_per_s": round(len(texts) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--knowledge", default="metis")
+    parser.add_argument("--copies", type=int, default=10)
+    parser.add_argument("--max-tokens", type=int, default=200)
+    parser.add_argument("--overlap", type=float, default=0.0)
+    args = parser.parse_args()
+
+    texts = load_knowledge(args.knowledge) * args.copies
+
+    start = time.perf_counter()
+    looped = [chunk_text(text, args.max_tokens, args.overlap) for text in texts]
+    elapsed = time.perf_counter() - start
+    print(json.dumps(report("chunk_text", texts, sum(map(len, looped)), elapsed)))
+
+    start = time.perf_counter()
+    batched = chunk_texts(texts, args.max_tokens, args.overlap)
+    elapsed = time.perf_counter() - start
+    print(json.dumps(report("chunk_texts", texts, sum(map(len, batched)), elapsed)))
+
+    assert batched == looped, "chunk_texts and chunk_text disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Shared helpers for the store benchmarks: offline embeddings and corpora."""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from alith import Embeddings
+
+KNOWLEDGE_DIR = Path(__file__).resolve().parents[4] / "knowledge"
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic offline embeddings from hashed word and character trigram features.
+
+    Similar texts get similar vectors, which is enough to exercise the stores
+    without downloading a model. Vectors are L2-normalized.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        text = text.lower()
+        words = re.findall(r"\w+", text)
+        return words + [text[i : i + 3] for i in range(max(0, len(text) - 2))]
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimension
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def load_embeddings(name: str, dimension: int = 384):
+    """``hashing`` (default, offline) or ``fastembed``; returns (embeddings, dimension)."""
+    if name == "fastembed":
+        from alith import FastEmbeddings
+
+        embeddings = FastEmbeddings()
+        return embeddings, len(embeddings.embed_texts(["probe"])[0])
+    return HashingEmbeddings(dimension), dimension
+
+
+def load_knowledge(name: str = "metis") -> List[str]:
+    """Documents from a `knowledge/<name>` dump (blog posts and forum threads)."""
+    texts = []
+    for path in sorted((KNOWLEDGE_DIR / name).glob("*.json")):
+        data = json.loads(path.read_text())
+        items = data.get("blogs", []) if isinstance(data, dict) else data
+        for item in items:
+            content = item.get("content") or ""
+            if content.strip():
+                texts.append(f"{item.get('title', '')}\n{content}")
+    return texts
+
+
+def chunk_documents(texts: List[str], max_words: int = 120) -> List[str]:
+    """Chunk with `alith.chunk_texts`, falling back to paragraph packing without the extension."""
+    try:
+        from alith import chunk_texts
+
+        return [chunk for chunks in chunk_texts(texts, 200) for chunk in chunks]
+    except ImportError:
+        pass
+    chunks = []
+    for text in texts:
+        current: List[str] = []
+        for paragraph in (p.strip() for p in text.split("\n") if p.strip()):
+            current.append(paragraph)
+            if sum(len(p.split()) for p in current) >= max_words:
+                chunks.append("\n".join(current))
+                current = []
+        if current:
+            chunks.append("\n".join(current))
+    return chunks
+
+
+def percentiles_ms(latencies: List[float]) -> dict:
+    values = np.array(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+    }
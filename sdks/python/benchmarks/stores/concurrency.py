@@ -0,0 +1,88 @@
+"""Read throughput of `ConcurrentFAISSStore` with and without a concurrent writer.
+
+Reader threads search precomputed query vectors against snapshots while an
+optional writer keeps saving batches of documents, which go through the
+delta index and periodic merges.
+
+    python3 benchmarks/stores/concurrency.py --size 100000 --readers 1,2,4,8
+    python3 benchmarks/stores/concurrency.py --no-writer
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from alith import ConcurrentFAISSStore, FAISSStore
+
+from common import HashingEmbeddings, percentiles_ms
+from index_selection import synthetic_corpus
+
+
+def run(store, queries, readers: int, seconds: float, writer: bool, batch: int):
+    stop = threading.Event()
+    latencies = [[] for _ in range(readers)]
+    written = [0]
+
+    def read(slot):
+        n = 0
+        while not stop.is_set():
+            query = queries[n % len(queries)].reshape(1, -1)
+            start = time.perf_counter()
+            store.search_vectors(query, limit=10, score_threshold=None)
+            latencies[slot].append(time.perf_counter() - start)
+            n += 1
+
+    def write():
+        n = 0
+        while not stop.is_set():
+            store.save_docs([f"written document {n + i}" for i in range(batch)])
+            n += batch
+        written[0] = n
+
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+    if writer:
+        threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    all_latencies = [latency for slot in latencies for latency in slot]
+    return {
+        "readers": readers,
+        "writer": writer,
+        "qps": round(len(all_latencies) / seconds, 1),
+        "written_docs_per_s": round(written[0] / seconds, 1),
+        **percentiles_ms(all_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--readers", default="1,2,4")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--merge-threshold", type=int, default=10_000)
+    parser.add_argument("--no-writer", action="store_true")
+    args = parser.parse_args()
+
+    vectors = synthetic_corpus(args.size, args.dimension)
+    queries = synthetic_corpus(1000, args.dimension, seed=1)
+    for readers in [int(n) for n in args.readers.split(",")]:
+        for writer in ([False] if args.no_writer else [False, True]):
+            base = FAISSStore(
+                dimension=args.dimension, embeddings=HashingEmbeddings(args.dimension)
+            )
+            base._add_vectors(vectors, [f"document {i}" for i in range(len(vectors))])
+            store = ConcurrentFAISSStore(base, merge_threshold=args.merge_threshold)
+            print(json.dumps(run(store, queries, readers, args.seconds, writer, args.batch)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Hybrid BM25 + vector retrieval versus pure vector search on `knowledge/metis`.
+
+Queries ask about identifiers that occur verbatim in the corpus (addresses,
+numbers, ticker-like names); a query is a hit when a chunk containing the
+identifier is retrieved.
+
+    python3 benchmarks/stores/hybrid_search.py
+    python3 benchmarks/stores/hybrid_search.py --embeddings fastembed
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+
+from alith import FAISSStore
+from alith.hybrid import HybridStore
+
+from common import chunk_documents, load_embeddings, load_knowledge, percentiles_ms
+
+_IDENTIFIER = re.compile(r"\b(0x[0-9a-fA-F]{6,}|[A-Z][A-Z0-9_]{2,}|\w*\d\w*)\b")
+
+
+def identifier_queries(chunks, count, seed=0):
+    occurrences = {}
+    for pos, chunk in enumerate(chunks):
+        for identifier in set(_IDENTIFIER.findall(chunk)):
+            occurrences.setdefault(identifier, set()).add(pos)
+    # Rare identifiers are the ones dense retrieval struggles with.
+    rare = sorted(i for i, found in occurrences.items() if len(found) <= 2 and len(i) >= 3)
+    random.Random(seed).shuffle(rare)
+    return [(f"What does {i} refer to?", occurrences[i]) for i in rare[:count]]
+
+
+def evaluate(name, store, chunks, queries, k):
+    positions = {chunk: pos for pos, chunk in enumerate(chunks)}
+    hits, reciprocal_ranks, latencies = 0, 0.0, []
+    for query, relevant in queries:
+        start = time.perf_counter()
+        results = store.search(query, limit=k, score_threshold=0.0)
+        latencies.append(time.perf_counter() - start)
+        ranks = [rank for rank, doc in enumerate(results) if positions.get(doc) in relevant]
+        if ranks:
+            hits += 1
+            reciprocal_ranks += 1 / (ranks[0] + 1)
+    return {
+        "retriever": name,
+        "queries": len(queries),
+        f"hit@{k}": round(hits / len(queries), 4),
+        "mrr": round(reciprocal_ranks / len(queries), 4),
+        **percentiles_ms(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--embeddings", default="hashing", choices=["hashing", "fastembed"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    embeddings, dimension = load_embeddings(args.embeddings)
+    chunks = list(dict.fromkeys(chunk_documents(load_knowledge("metis"))))
+    queries = identifier_queries(chunks, args.queries)
+
+    vector = FAISSStore(dimension=dimension, embeddings=embeddings, index_type="IP")
+    vector.save_docs(chunks)
+    hybrid = HybridStore(FAISSStore(dimension=dimension, embeddings=embeddings, index_type="IP"))
+    hybrid.save_docs(chunks)
+
+    for name, store in (("vector", vector), ("hybrid_rrf", hybrid)):
+        print(json.dumps(evaluate(name, store, chunks, queries, args.k)), flush=True)
+    hybrid.fusion = "weighted"
+    print(json.dumps(evaluate("hybrid_weighted", hybrid, chunks, queries, args.k)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
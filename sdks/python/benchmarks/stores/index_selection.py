@@ -0,0 +1,94 @@
+"""Latency/recall benchmark for the FAISSStore index kinds.
+
+Builds synthetic clustered corpora and compares the flat, HNSW, IVF-PQ and
+``auto`` index types against exact search.
+
+    python3 benchmarks/stores/index_selection.py --sizes 10000,100000,1000000
+    python3 benchmarks/stores/index_selection.py --sizes 10000000 --kinds hnsw,ivfpq
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from alith import FAISSStore
+from alith.store import estimate_index_memory
+
+
+def synthetic_corpus(num_vectors: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Gaussian clusters, which behave more like text embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    num_clusters = max(16, num_vectors // 1000)
+    centers = rng.standard_normal((num_clusters, dimension), dtype=np.float32)
+    vectors = np.empty((num_vectors, dimension), dtype=np.float32)
+    step = 1_000_000
+    for start in range(0, num_vectors, step):
+        end = min(start + step, num_vectors)
+        assignment = rng.integers(0, num_clusters, end - start)
+        vectors[start:end] = centers[assignment] + 0.3 * rng.standard_normal(
+            (end - start, dimension), dtype=np.float32
+        )
+    return vectors
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(np.intersect1d(f[f >= 0], t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def run(kind: str, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int):
+    dimension = vectors.shape[1]
+    store = FAISSStore(dimension=dimension, index_type=kind)
+    start = time.perf_counter()
+    store._add_vectors(vectors, [""] * len(vectors))
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, labels = store.index.search(query.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - start)
+        found[i] = labels[0]
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "index_type": kind,
+        "index_kind": store.index_kind,
+        "num_vectors": len(vectors),
+        "dimension": dimension,
+        "build_seconds": round(build_seconds, 3),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        f"recall@{k}": round(recall_at_k(found, truth), 4),
+        "estimated_memory_mb": round(
+            estimate_index_memory(store.index_kind, len(vectors), dimension) / 2**20, 1
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--kinds", default="flat,hnsw,ivfpq,auto")
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        vectors = synthetic_corpus(size, args.dimension)
+        queries = synthetic_corpus(args.queries, args.dimension, seed=1)
+        _, truth = faiss.knn(queries, vectors, args.k)
+        for kind in args.kinds.split(","):
+            if kind == "ivfpq" and size < 256:
+                continue
+            print(json.dumps(run(kind, vectors, queries, truth, args.k)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
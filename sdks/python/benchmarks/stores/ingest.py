@@ -0,0 +1,96 @@
+"""Ingestion throughput: `alith.ingest` pipeline versus the synchronous loop.
+
+The baseline mirrors the examples: load every document, chunk it, then call
+`save_docs` once per document. The pipeline overlaps loading, chunking,
+embedding and store writes. The `knowledge/<name>` dump is written out
+`--copies` times, with each copy made unique, to get a larger corpus.
+
+    python3 benchmarks/stores/ingest.py --copies 20
+    python3 benchmarks/stores/ingest.py --embeddings fastembed --chunk-workers 8
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from alith import FAISSStore
+from alith.ingest import IngestPipeline, JSONKnowledgeLoader
+
+from common import chunk_documents, load_embeddings, load_knowledge
+
+
+def chunker(text):
+    return chunk_documents([text])
+
+
+def write_corpus(directory: Path, name: str, copies: int) -> int:
+    texts = load_knowledge(name)
+    for copy in range(copies):
+        items = [{"title": f"copy {copy}", "content": text} for text in texts]
+        (directory / f"copy-{copy}.json").write_text(json.dumps(items))
+    return copies * len(texts)
+
+
+def baseline(directory: Path, embeddings, dimension: int) -> dict:
+    store = FAISSStore(dimension=dimension, embeddings=embeddings)
+    loader = JSONKnowledgeLoader(directory)
+    start = time.perf_counter()
+    documents = chunks = 0
+    for source in loader.sources():
+        for document in loader.load(source):
+            pieces = chunker(document.text)
+            store.save_docs(pieces)
+            documents += 1
+            chunks += len(pieces)
+    elapsed = time.perf_counter() - start
+    return {
+        "method": "sync",
+        "documents": documents,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "documents_per_s": round(documents / elapsed, 1),
+    }
+
+
+def pipeline(directory: Path, embeddings, dimension: int, args) -> dict:
+    store = FAISSStore(dimension=dimension, embeddings=embeddings)
+    stats = IngestPipeline(
+        store,
+        chunker=chunker,
+        chunk_workers=args.chunk_workers,
+        embed_batch_size=args.embed_batch_size,
+        write_batch_size=args.write_batch_size,
+    ).run(JSONKnowledgeLoader(directory))
+    return {
+        "method": "pipeline",
+        "documents": stats.documents,
+        "chunks": stats.chunks,
+        "seconds": round(stats.elapsed, 3),
+        "documents_per_s": round(stats.documents_per_second, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--knowledge", default="metis")
+    parser.add_argument("--copies", type=int, default=10)
+    parser.add_argument("--embeddings", default="hashing", choices=["hashing", "fastembed"])
+    parser.add_argument("--chunk-workers", type=int, default=4)
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    parser.add_argument("--write-batch-size", type=int, default=512)
+    args = parser.parse_args()
+
+    embeddings, dimension = load_embeddings(args.embeddings)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        write_corpus(directory, args.knowledge, args.copies)
+        print(json.dumps(baseline(directory, embeddings, dimension)))
+        print(json.dumps(pipeline(directory, embeddings, dimension, args)))
+
+
+if __name__ == "__main__":
+    main()
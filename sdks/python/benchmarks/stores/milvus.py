@@ -0,0 +1,66 @@
+"""MilvusStore bulk ingestion and batch search throughput on Milvus Lite.
+
+Ingestion is timed per `--batch-sizes` entry, searching query by query is
+compared with `search_batch`.
+
+    python3 benchmarks/stores/milvus.py --size 20000 --batch-sizes 64,512,2048
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from alith import MilvusStore
+
+from common import HashingEmbeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--batch-sizes", default="64,512,2048")
+    args = parser.parse_args()
+
+    embeddings = HashingEmbeddings(args.dimension)
+    docs = [f"document {i} about topic {i % 97} and subject {i % 13}" for i in range(args.size)]
+    queries = [f"topic {i % 97} subject {i % 13}" for i in range(args.queries)]
+    for batch_size in [int(n) for n in args.batch_sizes.split(",")]:
+        with tempfile.TemporaryDirectory() as path:
+            store = MilvusStore(
+                uri=os.path.join(path, "bench.db"),
+                dimension=args.dimension,
+                embeddings=embeddings,
+                batch_size=batch_size,
+            )
+            start = time.perf_counter()
+            store.save_docs(docs)
+            ingest = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for query in queries:
+                store.search(query, limit=10, score_threshold=0.0)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.search_batch(queries, limit=10, score_threshold=0.0)
+            batched = time.perf_counter() - start
+            print(
+                json.dumps(
+                    {
+                        "batch_size": batch_size,
+                        "docs_per_s": round(len(docs) / ingest, 1),
+                        "search_queries_per_s": round(len(queries) / single, 1),
+                        "search_batch_queries_per_s": round(len(queries) / batched, 1),
+                    }
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
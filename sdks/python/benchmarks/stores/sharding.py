@@ -0,0 +1,90 @@
+"""Query throughput and tail latency of `ShardedFAISSStore` versus shard count.
+
+Loads one synthetic corpus into 1..N flat shards and measures single-query
+latency plus the QPS of concurrent clients. Shard searches run on a thread
+pool with the GIL released, so latency should drop and QPS rise with the
+number of shards until the cores or memory bandwidth are saturated.
+
+    python3 benchmarks/stores/sharding.py --size 1000000 --shards 1,2,4,8,16,32,64
+    python3 benchmarks/stores/sharding.py --index-type hnsw --clients 8
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+from alith import ShardedFAISSStore
+
+from common import percentiles_ms
+from index_selection import synthetic_corpus
+
+
+def run(store, queries, clients: int, seconds: float, k: int):
+    stop = threading.Event()
+    latencies = [[] for _ in range(clients)]
+
+    def client(slot):
+        n = slot
+        while not stop.is_set():
+            query = queries[n % len(queries)].reshape(1, -1)
+            start = time.perf_counter()
+            store.search_vectors(query, limit=k, score_threshold=None)
+            latencies[slot].append(time.perf_counter() - start)
+            n += clients
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    all_latencies = [latency for slot in latencies for latency in slot]
+    return {"qps": round(len(all_latencies) / seconds, 1), **percentiles_ms(all_latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--shards", default="1,2,4,8")
+    parser.add_argument("--clients", type=int, default=1)
+    parser.add_argument("--index-type", default="L2")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = synthetic_corpus(args.size, args.dimension)
+    queries = synthetic_corpus(1000, args.dimension, seed=1)
+    ids = list(range(len(vectors)))
+    for num_shards in [int(n) for n in args.shards.split(",")]:
+        store = ShardedFAISSStore(
+            num_shards=num_shards, dimension=args.dimension, index_type=args.index_type
+        )
+        start = time.perf_counter()
+        for index, shard in enumerate(store.shards):
+            rows = ids[index::num_shards]
+            shard._add_vectors(vectors[rows], [""] * len(rows), rows)
+        build_seconds = time.perf_counter() - start
+        result = run(store, queries, args.clients, args.seconds, args.k)
+        print(
+            json.dumps(
+                {
+                    "shards": num_shards,
+                    "clients": args.clients,
+                    "cpus": os.cpu_count(),
+                    "num_vectors": args.size,
+                    "index_type": args.index_type,
+                    "build_seconds": round(build_seconds, 3),
+                    **result,
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Compare the vector stores on one workload: ingest, latency, recall, memory, disk.
+
+Every store ingests the same corpus with the offline `HashingEmbeddings`, then
+answers the same queries. Recall@k is measured against exact search over the
+embedding vectors. Each (store, corpus, size) combination runs in a fresh
+subprocess so resident memory is measured in isolation.
+
+    python3 benchmarks/stores/suite.py --sizes 1000,10000,100000
+    python3 benchmarks/stores/suite.py --corpus knowledge --stores faiss,chroma
+    python3 benchmarks/stores/suite.py --output baseline.jsonl
+    python3 benchmarks/stores/suite.py --baseline baseline.jsonl --tolerance 0.2
+
+The `synthetic` corpus draws documents from a Zipf-distributed vocabulary;
+`knowledge` chunks the `knowledge/<name>` dump, repeated with unique prefixes
+up to the requested size. Stores whose backend is not installed are reported
+as skipped. With `--baseline`, metrics that got worse by more than
+`--tolerance` are listed on stderr and the exit status is 1.
+
+Each result is printed as one JSON object per line.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from common import HashingEmbeddings, chunk_documents, load_knowledge, percentiles_ms
+
+STORES = ("faiss", "image_faiss", "chroma", "milvus")
+
+# Metric name -> whether higher is better, for regression checks.
+METRICS = {
+    "ingest_docs_per_s": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "recall": True,
+    "store_rss_mb": False,
+    "disk_mb": False,
+}
+
+
+def synthetic_corpus(size: int, num_queries: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """Documents of 20-60 Zipf-distributed words; queries are words of random documents."""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"w{n:05d}" for n in range(20_000)])
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    lengths = rng.integers(20, 61, size)
+    words = rng.choice(vocabulary, lengths.sum(), p=weights)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    docs = [f"doc {i} " + " ".join(words[bounds[i] : bounds[i + 1]]) for i in range(size)]
+    queries = [
+        " ".join(rng.choice(docs[i].split()[2:], 8))
+        for i in rng.integers(0, size, num_queries)
+    ]
+    return docs, queries
+
+
+def knowledge_corpus(size: int, num_queries: int, name: str, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """Chunks of `knowledge/<name>`, repeated with a unique prefix up to `size` documents."""
+    chunks = list(dict.fromkeys(chunk_documents(load_knowledge(name))))
+    if not chunks:
+        raise SystemExit(f"knowledge/{name} has no documents")
+    docs = [f"copy {n // len(chunks)}: {chunks[n % len(chunks)]}" for n in range(size)]
+    rng = np.random.default_rng(seed)
+    queries = [" ".join(docs[i].split()[2:14]) for i in rng.integers(0, size, num_queries)]
+    return docs, queries
+
+
+def open_store(name: str, path: str, dimension: int, embeddings):
+    if name == "faiss":
+        from alith import FAISSStore
+
+        return FAISSStore(dimension=dimension, embeddings=embeddings)
+    if name == "image_faiss":
+        from alith import ImageFAISSStore
+
+        return ImageFAISSStore(dimension=dimension, embeddings=embeddings)
+    if name == "chroma":
+        from alith import ChromaDBStore
+
+        return ChromaDBStore(path=path, embeddings=embeddings)
+    if name == "milvus":
+        from alith import MilvusStore
+
+        return MilvusStore(
+            uri=os.path.join(path, "bench.db"), dimension=dimension, embeddings=embeddings
+        )
+    raise ValueError(f"unknown store {name!r}, expected one of {', '.join(STORES)}")
+
+
+def available(name: str) -> bool:
+    import alith
+
+    flag = {"chroma": "CHROMADB_AVAILABLE", "milvus": "MILVUS_AVAILABLE"}.get(name, "FAISS_AVAILABLE")
+    return getattr(alith, flag)
+
+
+def rss_bytes(pid: str = "self") -> int:
+    """Resident memory of a process and its children (Linux), else the peak of this one."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            total = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                total += sum(rss_bytes(child) for child in f.read().split())
+        return total
+    except OSError:
+        if pid != "self":
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def disk_bytes(name: str, store, path: str) -> int:
+    if name in ("faiss", "image_faiss"):
+        store.save_to_disk(os.path.join(path, "store"))
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+class ExactSearch:
+    """Exact scores over the embedding vectors, to measure recall against.
+
+    A hit counts when its exact score reaches the k-th best one, so documents
+    tied with the true top k (such as repeated knowledge chunks) are not
+    counted as misses.
+    """
+
+    def __init__(self, embeddings, docs: List[str]):
+        self.embeddings = embeddings
+        self.positions = {doc: pos for pos, doc in enumerate(docs)}
+        self.vectors = np.asarray(embeddings.embed_texts(docs), dtype=np.float32)
+
+    def recall(self, queries: List[str], found: List[List[str]], k: int) -> float:
+        hits = 0
+        for start in range(0, len(queries), 256):
+            vectors = np.asarray(self.embeddings.embed_texts(queries[start : start + 256]), dtype=np.float32)
+            scores = vectors @ self.vectors.T
+            kth = -np.partition(-scores, min(k, scores.shape[1]) - 1, axis=1)[:, min(k, scores.shape[1]) - 1]
+            for row, docs in enumerate(found[start : start + 256]):
+                positions = [self.positions[doc] for doc in docs[:k] if doc in self.positions]
+                hits += int(np.sum(scores[row, positions] >= kth[row] - 1e-6))
+        return hits / (len(queries) * k)
+
+
+def run(job: dict) -> dict:
+    """Benchmark one store on one corpus; runs inside its own process."""
+    result = {key: job[key] for key in ("store", "corpus", "size", "dimension", "k")}
+    if not available(job["store"]):
+        return {**result, "skipped": "backend not installed"}
+    embeddings = HashingEmbeddings(job["dimension"])
+    if job["corpus"] == "knowledge":
+        docs, queries = knowledge_corpus(job["size"], job["queries"], job["knowledge"])
+    else:
+        docs, queries = synthetic_corpus(job["size"], job["queries"])
+    exact = ExactSearch(embeddings, docs)
+
+    with tempfile.TemporaryDirectory() as path:
+        rss_before = rss_bytes()
+        store = open_store(job["store"], path, job["dimension"], embeddings)
+        start = time.perf_counter()
+        store.save_docs(docs)
+        ingest = time.perf_counter() - start
+
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            found.append(store.search(query, limit=job["k"], score_threshold=float("-inf")))
+            latencies.append(time.perf_counter() - start)
+        rss_after = rss_bytes()
+        disk = disk_bytes(job["store"], store, path)
+
+    return {
+        **result,
+        "ingest_seconds": round(ingest, 3),
+        "ingest_docs_per_s": round(len(docs) / ingest, 1),
+        **percentiles_ms(latencies),
+        "recall": round(exact.recall(queries, found, job["k"]), 4),
+        "rss_mb": round(rss_after / 2**20, 1),
+        "store_rss_mb": round(max(rss_after - rss_before, 0) / 2**20, 1),
+        "disk_mb": round(disk / 2**20, 2),
+    }
+
+
+def run_isolated(job: dict) -> dict:
+    process = subprocess.run(
+        [sys.executable, __file__, "--job", json.dumps(job)],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        return {**job, "error": error[0]}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def regressions(results: List[dict], baseline_path: str, tolerance: float) -> List[str]:
+    def key(record: dict) -> tuple:
+        return tuple(record.get(name) for name in ("store", "corpus", "size", "dimension", "k"))
+
+    with open(baseline_path) as f:
+        baseline: Dict[tuple, dict] = {key(r): r for r in map(json.loads, filter(str.strip, f))}
+    found = []
+    for record in results:
+        previous = baseline.get(key(record))
+        if previous is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = previous.get(metric), record.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                found.append(f"{'/'.join(map(str, key(record)))} {metric}: {old} -> {new}")
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", default=",".join(STORES))
+    parser.add_argument("--corpus", default="synthetic", choices=("synthetic", "knowledge"))
+    parser.add_argument("--knowledge", default="metis", help="knowledge/<name> dump to use")
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", help="also write the results to this JSON lines file")
+    parser.add_argument("--baseline", help="JSON lines results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--in-process", action="store_true", help="skip subprocess isolation")
+    parser.add_argument("--job", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.job:
+        print(json.dumps(run(json.loads(args.job))))
+        return 0
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        for store in args.stores.split(","):
+            job = {
+                "store": store,
+                "corpus": args.corpus,
+                "knowledge": args.knowledge,
+                "size": size,
+                "queries": args.queries,
+                "dimension": args.dimension,
+                "k": args.k,
+            }
+            result = run(job) if args.in_process else run_isolated(job)
+            result.pop("knowledge", None)
+            result.pop("queries", None)
+            results.append(result)
+            print(json.dumps(result), flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.writelines(json.dumps(result) + "\n" for result in results)
+    if args.baseline:
+        found = regressions(results, args.baseline, args.tolerance)
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
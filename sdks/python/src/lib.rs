@@ -1,6 +1,7 @@
 use alith::{Agent, Chat, ClientConfig, LLM, TaskError, Tool};
 use pyo3::exceptions::PyException;
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use std::collections::HashMap;
 
 mod tool;
@@ -112,6 +113,15 @@ impl Message {
     }
 }
 
+/// Maps the Python default of `0.0` to no overlap.
+fn overlap(overlap_percent: f32) -> Option<f32> {
+    if overlap_percent > 0.0 {
+        Some(overlap_percent)
+    } else {
+        None
+    }
+}
+
 /// Runs the text chunker on the incoming text and returns the chunks as a vector of strings.
 ///
 /// * `text` - The natural language text to chunk.
@@ -119,21 +129,68 @@ impl Message {
 /// * `overlap_percent` - The percentage of overlap between chunks. Default is None.
 #[pyfunction]
 fn chunk_text(
+    py: Python<'_>,
     text: &str,
     max_chunk_token_size: u32,
     overlap_percent: f32,
 ) -> PyResult<Vec<String>> {
-    Ok(alith::chunk_text(
-        text,
-        max_chunk_token_size,
-        if overlap_percent == 0.0 {
-            Some(overlap_percent)
-        } else {
-            None
-        },
-    )
-    .map_err(|e| PyErr::new::<PyException, _>(e.to_string()))?
-    .unwrap_or_default())
+    Ok(py
+        .detach(|| alith::chunk_text(text, max_chunk_token_size, overlap(overlap_percent)))
+        .map_err(|e| PyErr::new::<PyException, _>(e.to_string()))?
+        .unwrap_or_default())
+}
+
+/// Runs the text chunker on many texts in parallel and returns the chunks of each text.
+///
+/// The GIL is released while chunking, so other Python threads keep running.
+/// Raises an exception naming the first text that could not be chunked.
+///
+/// * `texts` - The natural language texts to chunk.
+/// * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+/// * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+#[pyfunction]
+fn chunk_texts(
+    py: Python<'_>,
+    texts: Vec<String>,
+    max_chunk_token_size: u32,
+    overlap_percent: f32,
+) -> PyResult<Vec<Vec<String>>> {
+    py.detach(|| alith::chunk_texts(&texts, max_chunk_token_size, overlap(overlap_percent)))
+        .map_err(|e| PyErr::new::<PyException, _>(e.to_string()))
+}
+
+/// Runs the text chunker on many texts in parallel and returns the chunks of each text as byte offsets.
+///
+/// For each text, returns its cleaned UTF-8 text and the `(start, end)` byte offsets of its chunks
+/// packed as little-endian `u64` pairs, so no string is created per chunk.
+///
+/// * `texts` - The natural language texts to chunk.
+/// * `max_chunk_token_size` - The maxium token sized to be chunked to. Inclusive.
+/// * `overlap_percent` - The percentage of overlap between chunks. Default is None.
+#[pyfunction]
+fn chunk_spans<'py>(
+    py: Python<'py>,
+    texts: Vec<String>,
+    max_chunk_token_size: u32,
+    overlap_percent: f32,
+) -> PyResult<Vec<(Bound<'py, PyBytes>, Bound<'py, PyBytes>)>> {
+    let results = py
+        .detach(|| alith::chunk_spans(&texts, max_chunk_token_size, overlap(overlap_percent)))
+        .map_err(|e| PyErr::new::<PyException, _>(e.to_string()))?;
+    Ok(results
+        .into_iter()
+        .map(|(text, spans)| {
+            let offsets = spans
+                .iter()
+                .flat_map(|span| [span.start as u64, span.end as u64])
+                .flat_map(u64::to_le_bytes)
+                .collect::<Vec<u8>>();
+            (
+                PyBytes::new(py, text.as_bytes()),
+                PyBytes::new(py, &offsets),
+            )
+        })
+        .collect())
 }
 
 /// A Python module implemented in Rust.
@@ -143,5 +200,7 @@ fn _alith(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<DelegateTool>()?;
     m.add_class::<Message>()?;
     m.add_function(wrap_pyfunction!(chunk_text, m)?)?;
+    m.add_function(wrap_pyfunction!(chunk_texts, m)?)?;
+    m.add_function(wrap_pyfunction!(chunk_spans, m)?)?;
     Ok(())
 }
@@ -1,8 +1,9 @@
 import os
 
+import pytest
 import rsa
 
-from alith.data import decrypt, encrypt
+from alith.data import decrypt, decrypt_file, encrypt
 
 
 def test_pgp_encryption():
@@ -19,3 +20,17 @@ def test_pgp_encryption():
     decrypted_data = decrypt(encrypted_data, decrypted_password)
     assert decrypted_data == privacy_data
     print("Crypto test successfully!")
+
+
+def test_pgp_decryption_with_wrong_password_fails(tmp_path):
+    encrypted_data = encrypt(b"Hello, Privacy Data with PGP!", "right password")
+    with pytest.raises(ValueError, match="Decryption failed"):
+        decrypt(encrypted_data, "wrong password")
+
+    path = tmp_path / "data.gpg"
+    path.write_bytes(encrypted_data)
+    output = tmp_path / "data.txt"
+    with pytest.raises(ValueError, match="Decryption failed"):
+        decrypt_file(str(path), "wrong password", str(output))
+    decrypt_file(str(path), "right password", str(output))
+    assert output.read_bytes() == b"Hello, Privacy Data with PGP!"
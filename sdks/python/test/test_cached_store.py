@@ -0,0 +1,115 @@
+"""Tests for the query and result cache in front of a store."""
+
+import pytest
+
+try:
+    import faiss  # noqa: F401
+    import numpy as np  # noqa: F401
+except ImportError:
+    pytest.skip(
+        "faiss not available. Install with: python3 -m pip install faiss-cpu",
+        allow_module_level=True,
+    )
+
+from alith import CachedStore, FAISSStore, ShardedFAISSStore
+from alith.store import Store
+
+from test_faiss_store import DIMENSION, HashEmbeddings, make_docs
+
+
+@pytest.fixture
+def embeddings():
+    return HashEmbeddings()
+
+
+def test_repeated_queries_hit_the_caches(embeddings):
+    docs = make_docs(10)
+    store = CachedStore(FAISSStore(dimension=DIMENSION, embeddings=embeddings))
+    store.save_docs(docs)
+    calls = embeddings.calls
+
+    assert store.search(docs[2], limit=1) == [docs[2]]
+    assert store.search(f"  {docs[2].upper()} ", limit=1) == [docs[2]]
+    assert embeddings.calls == calls + 1
+    stats = store.cache_stats()
+    assert stats["results"]["hits"] == 1
+    assert stats["results"]["hit_rate"] == 0.5
+
+    # Different parameters are cached separately but reuse the query embedding.
+    assert store.search(docs[2], limit=2)[0] == docs[2]
+    assert embeddings.calls == calls + 1
+
+    results = store.search_batch([docs[2], docs[3], docs[3]], limit=1)
+    assert results == [[docs[2]], [docs[3]], [docs[3]]]
+    assert embeddings.calls == calls + 2
+    assert embeddings.embedded == [docs[3]]
+
+
+def test_writes_invalidate_results(embeddings):
+    docs = make_docs(10)
+    inner = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    store = CachedStore(inner)
+    store.save_docs(docs[:5])
+    assert store.search(docs[7], limit=1, score_threshold=0.9) == []
+
+    store.save(docs[7])
+    assert store.search(docs[7], limit=1, score_threshold=0.9) == [docs[7]]
+
+    # Writes that bypass the wrapper are seen through the store's generation.
+    inner.delete(docs=[docs[7]])
+    assert store.search(docs[7], limit=1, score_threshold=0.9) == []
+    inner.save_docs([docs[7]], [{"kind": "x"}])
+    assert store.search(docs[7], limit=1, filter={"kind": "x"}) == [docs[7]]
+    inner.upsert_docs([docs[7]], metadatas=[{"kind": "y"}])
+    assert store.search(docs[7], limit=1, filter={"kind": "x"}) == []
+
+    store.reset()
+    assert store.search(docs[0], limit=1) == []
+    assert store.cache_stats()["results"]["hits"] == 0
+
+
+def test_search_in_sees_writes_to_collections(embeddings):
+    docs = make_docs(6)
+    inner = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    store = CachedStore(inner)
+    store.save_docs(docs[:3])
+    assert store.search_in(docs[1], limit=1) == [docs[1]]
+
+    inner.create_collection("notes")
+    assert store.search_in(docs[4], limit=1, collection_name="notes") == []
+    inner.collection("notes").save_docs([docs[4]])
+    assert store.search_in(docs[4], limit=1, collection_name="notes") == [docs[4]]
+
+
+def test_sharded_store_and_plain_stores(embeddings):
+    docs = make_docs(12)
+    sharded = CachedStore(
+        ShardedFAISSStore(num_shards=3, dimension=DIMENSION, embeddings=embeddings)
+    )
+    sharded.save_docs(docs)
+    assert sharded.search(docs[4], limit=1) == [docs[4]]
+    sharded.store.delete(docs=[docs[4]])
+    assert docs[4] not in sharded.search(docs[4], limit=3, score_threshold=0.0)
+
+    class ListStore(Store):
+        def __init__(self):
+            self.docs = []
+            self.searches = 0
+
+        def search(self, query, limit=3, score_threshold=0.4):
+            self.searches += 1
+            return [doc for doc in self.docs if query in doc][:limit]
+
+        def save(self, value):
+            self.docs.append(value)
+
+        def reset(self):
+            self.docs = []
+
+    store = CachedStore(ListStore())
+    store.save("alpha beta")
+    assert store.search("alpha") == store.search("alpha") == ["alpha beta"]
+    assert store.searches == 1
+    store.save("alpha gamma")
+    assert store.search("alpha") == ["alpha beta", "alpha gamma"]
+    assert store.docs == ["alpha beta", "alpha gamma"]
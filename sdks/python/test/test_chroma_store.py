@@ -0,0 +1,61 @@
+"""Tests for the ChromaDB store."""
+
+import pytest
+
+try:
+    import chromadb  # noqa: F401
+except ImportError:
+    pytest.skip(
+        "chromadb not available. Install with: python3 -m pip install chromadb",
+        allow_module_level=True,
+    )
+
+from alith import ChromaDBStore
+
+from test_faiss_store import HashEmbeddings, make_docs
+
+
+@pytest.fixture
+def embeddings():
+    return HashEmbeddings()
+
+
+@pytest.fixture
+def store(tmp_path, embeddings):
+    return ChromaDBStore(path=str(tmp_path / "chroma"), embeddings=embeddings)
+
+
+def test_save_docs_batches_embeddings_and_upserts(store, embeddings):
+    docs = make_docs(25)
+    store._batch_limit = 10
+    calls = embeddings.calls
+    store.save_docs(docs + docs[:5], metadatas=[{"n": n % 25} for n in range(30)])
+    # 25 distinct documents in batches of at most 10.
+    assert embeddings.calls - calls == 3
+    assert store.collection.count() == 25
+    stored = store.collection.get(ids=[store.collection.get()["ids"][0]], include=["metadatas"])
+    assert stored["metadatas"][0]["n"] < 25
+
+    store.save(docs[0])
+    assert store.collection.count() == 25
+
+
+def test_search_batch_matches_search(store, embeddings):
+    docs = make_docs(12)
+    store.save_docs(docs)
+    store._batch_limit = 4
+    calls = embeddings.calls
+    results = store.search_batch(docs[:10], limit=1, score_threshold=0.0)
+    assert results == [[doc] for doc in docs[:10]]
+    assert embeddings.calls - calls == 3
+    assert store.search(docs[3], limit=1, score_threshold=0.0) == [docs[3]]
+    assert store.search_batch([]) == []
+
+
+def test_score_threshold_keeps_the_closest_documents(store):
+    docs = make_docs(12)
+    store.save_docs(docs)
+    # An exact match is at distance 0, the best possible similarity.
+    assert store.search(docs[3], limit=3, score_threshold=0.99) == [docs[3]]
+    assert len(store.search(docs[3], limit=3, score_threshold=0.0)) == 3
+    assert store.search_batch(docs[:2], limit=3, score_threshold=1.01) == [[], []]
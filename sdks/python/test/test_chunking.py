@@ -0,0 +1,112 @@
+"""Tests for the text chunkers."""
+
+import io
+
+import pytest
+
+import numpy as np
+
+from alith import ChunkView, chunk_stream, chunk_text, chunk_text_spans, chunk_texts
+from alith.chunking import _read_pieces, _segments
+
+try:
+    from alith import _alith  # noqa: F401
+
+    EXTENSION_AVAILABLE = True
+except ImportError:
+    EXTENSION_AVAILABLE = False
+
+requires_extension = pytest.mark.skipif(
+    not EXTENSION_AVAILABLE, reason="alith extension not built. Build it with: maturin develop"
+)
+
+TEXT = "\n\n".join(
+    f"Paragraph {i} talks about vector stores, retrieval and cafés." for i in range(60)
+)
+
+
+@requires_extension
+def test_chunk_texts_matches_chunk_text():
+    texts = ["A short document.", "", TEXT]
+    assert chunk_texts(texts, 50) == [chunk_text(text, 50) for text in texts]
+    assert chunk_texts(texts, 50, 0.2) == [chunk_text(text, 50, 0.2) for text in texts]
+
+
+@requires_extension
+def test_overlap_percent_overlaps_chunks():
+    # 0.0 means no overlap and any positive value turns it on.
+    plain = chunk_text_spans(TEXT, 50)
+    assert all(start >= end for start, end in zip(plain.starts[1:], plain.ends[:-1]))
+    overlapping = chunk_text_spans(TEXT, 50, 0.2)
+    assert all(start < end for start, end in zip(overlapping.starts[1:], overlapping.ends[:-1]))
+    assert len(chunk_text(TEXT, 50, 0.2)) > len(chunk_text(TEXT, 50))
+
+
+@requires_extension
+def test_chunk_texts_empty():
+    assert chunk_texts([]) == []
+
+
+def test_chunk_view_decodes_lazily():
+    source = "Café au lait.\n\nNaïve résumé.".encode("utf-8")
+    first = len("Café au lait.".encode("utf-8"))
+    view = ChunkView._from_packed(
+        source, np.array([0, first, first + 2, len(source), 6, first + 8], dtype="<u8").tobytes()
+    )
+    assert len(view) == 3
+    assert list(view) == ["Café au lait.", "Naïve résumé.", "au lait.\n\nNaïve"]
+    assert view[-1] == view[2]
+    assert view[1:] == ["Naïve résumé.", "au lait.\n\nNaïve"]
+    starts, ends = view.char_offsets()
+    assert [view.text[start:end] for start, end in zip(starts, ends)] == list(view)
+
+
+@requires_extension
+def test_chunk_text_spans_cover_chunk_text():
+    view = chunk_text_spans(TEXT, 50, 0.2)
+    # Spans keep the separators that chunk_text joins with spaces.
+    assert [" ".join(chunk.split()) for chunk in view] == [
+        " ".join(chunk.split()) for chunk in chunk_text(TEXT, 50, 0.2)
+    ]
+
+
+def test_read_pieces_decodes_split_characters(tmp_path):
+    data = TEXT.encode("utf-8")
+    path = tmp_path / "doc.txt"
+    path.write_bytes(data)
+    pieces = [data[i : i + 7] for i in range(0, len(data), 7)]
+    for source in (path, str(path), io.BytesIO(data), io.StringIO(TEXT), data, pieces, [TEXT]):
+        assert "".join(_read_pieces(source, "utf-8")) == TEXT
+
+
+def test_segments_do_not_depend_on_pieces():
+    expected = list(_segments([TEXT], 300))
+    assert "".join(expected) == TEXT
+    assert all(len(segment) <= 300 for segment in expected)
+    assert all(segment.endswith("\n\n") for segment in expected[:-1])
+    for size in (1, 13, 299, 300, 301, 5000):
+        pieces = [TEXT[i : i + size] for i in range(0, len(TEXT), size)]
+        assert list(_segments(pieces, 300)) == expected
+    assert list(_segments(["x" * 25], 10)) == ["x" * 10, "x" * 10, "x" * 5]
+    assert list(_segments([], 10)) == []
+
+
+@requires_extension
+def test_chunk_stream_matches_chunk_text(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    assert list(chunk_stream(path, 50, 0.2)) == chunk_text(TEXT, 50, 0.2)
+    pieces = [TEXT[i : i + 11] for i in range(0, len(TEXT), 11)]
+    assert list(chunk_stream(iter(pieces), 50, segment_size=300)) == list(
+        chunk_stream([TEXT], 50, segment_size=300)
+    )
+
+
+@requires_extension
+@pytest.mark.parametrize("segment_size", [200, 300, 1000])
+def test_chunk_stream_matches_chunk_text_across_segments(segment_size):
+    # Segments are far smaller than the text, so every chunk boundary near a
+    # segment end comes from a carried-over tail.
+    assert len(TEXT) > 3 * segment_size
+    assert list(chunk_stream([TEXT], 50, segment_size=segment_size)) == chunk_text(TEXT, 50)
+    assert list(chunk_stream([TEXT], 50, 0.2, segment_size=segment_size)) == chunk_text(TEXT, 50, 0.2)
@@ -0,0 +1,135 @@
+"""Tests for the snapshot-isolated concurrent FAISS store."""
+
+import threading
+
+import pytest
+
+try:
+    import faiss  # noqa: F401
+    import numpy as np  # noqa: F401
+except ImportError:
+    pytest.skip(
+        "faiss not available. Install with: python3 -m pip install faiss-cpu",
+        allow_module_level=True,
+    )
+
+from alith import ConcurrentFAISSStore, FAISSStore
+from alith.store import doc_id
+
+from test_faiss_store import DIMENSION, HashEmbeddings, make_docs
+
+
+@pytest.fixture
+def store():
+    return ConcurrentFAISSStore(
+        FAISSStore(dimension=DIMENSION, embeddings=HashEmbeddings()), merge_threshold=8
+    )
+
+
+def test_delta_and_merge_are_searchable(store):
+    docs = make_docs(20)
+    store.save_docs(docs[:5])
+    assert store.get_stats()["delta_documents"] == 5
+    assert store.search(docs[3], limit=1) == [docs[3]]
+
+    store.save_docs(docs[5:])
+    assert store.get_stats()["delta_documents"] == 0
+    assert store.get_stats()["total_documents"] == 20
+    assert store.search_batch(docs[:3], limit=1) == [[doc] for doc in docs[:3]]
+
+    store.delete(docs=[docs[0], docs[19]])
+    store.upsert_docs(["replacement"], ids=[doc_id(docs[5])])
+    assert store.search(docs[0], limit=1, score_threshold=0.99) == []
+    assert store.get_texts([doc_id(docs[5])]) == ["replacement"]
+    assert docs[5] not in store.texts and "replacement" in store.texts
+    store.merge()
+    assert store.get_stats()["total_documents"] == 18
+    assert store.search("replacement", limit=1) == ["replacement"]
+    assert store.search(docs[7], limit=1) == [docs[7]]
+
+
+def test_concurrent_readers_and_writer(store):
+    docs = make_docs(400)
+    store.save_docs(docs[:50])
+    written = threading.Event()
+    errors = []
+    searches = [0]
+
+    def read():
+        try:
+            while not written.is_set():
+                # Documents up to 50 are never deleted, so they must always be found.
+                for doc in docs[:50:7]:
+                    assert store.search(doc, limit=2)[0] == doc
+                    searches[0] += 1
+                for results in store.search_batch(docs[50::37], limit=3, score_threshold=0.0):
+                    assert None not in results
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for start in range(50, 400, 10):
+        store.save_docs(docs[start:start + 10])
+        store.delete(docs=docs[start:start + 3])
+    written.set()
+    for reader in readers:
+        reader.join()
+
+    assert not errors, errors[0]
+    assert searches[0] > 0
+    expected = [doc for pos, doc in enumerate(docs) if pos < 50 or (pos - 50) % 10 >= 3]
+    assert sorted(store.texts) == sorted(expected)
+
+
+def test_writes_append_segments_without_rebuilding_the_delta():
+    store = ConcurrentFAISSStore(
+        FAISSStore(dimension=DIMENSION, embeddings=HashEmbeddings()), merge_threshold=1000
+    )
+    docs = make_docs(63)
+    store.save_docs(docs[:32])
+    first = store._snapshot.segments[0][0]
+    for doc in docs[32:]:
+        store.save_docs([doc])
+        # The 32-document segment is never copied by the small writes after it.
+        assert store._snapshot.segments[0][0] is first
+    assert store.get_stats()["delta_documents"] == 63
+    assert store.get_stats()["delta_segments"] <= 6
+
+    before = store._snapshot
+    store.delete(docs=[docs[0]])
+    assert before.segments[0][1] is None
+    assert store.search(docs[0], limit=1, score_threshold=0.99) == []
+    assert store.search(docs[40], limit=1) == [docs[40]]
+
+
+def test_search_excludes_many_removed_documents(store):
+    docs = make_docs(200)
+    store.merge_threshold = 10_000
+    store.save_docs(docs)
+    store.merge()
+    store.delete(docs=docs[:150])
+    results = store.search(docs[0], limit=5, score_threshold=0.0)
+    assert len(results) == 5
+    assert not set(results) & set(docs[:150])
+
+
+def test_reset_leaves_the_old_snapshot_untouched(tmp_path):
+    main = FAISSStore(
+        dimension=DIMENSION, embeddings=HashEmbeddings(), collection_dir=str(tmp_path)
+    )
+    main.save_docs(["kept"], collection_name="notes")
+    store = ConcurrentFAISSStore(main)
+    store.save_docs(make_docs(3))
+    before = store._snapshot
+    store.reset()
+    assert store.texts == [] and store._snapshot.main.list_collections() == []
+    assert before.main.list_collections() == ["notes"]
+    assert before.main.collection("notes").texts == ["kept"]
+
+
+def test_tiered_stores_are_rejected(tmp_path):
+    main = FAISSStore(dimension=DIMENSION, embeddings=HashEmbeddings(), tier_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="tiered"):
+        ConcurrentFAISSStore(main)
@@ -0,0 +1,630 @@
+"""Tests for the FAISS vector store."""
+
+import asyncio
+import hashlib
+import struct
+import time
+import zlib
+
+import pytest
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:
+    pytest.skip(
+        "faiss not available. Install with: python3 -m pip install faiss-cpu",
+        allow_module_level=True,
+    )
+
+from alith import Embeddings, FAISSStore, ImageFAISSStore, StoreReplica
+from alith import store as store_module
+from alith.store import doc_id, estimate_index_memory, maximal_marginal_relevance, select_index_type
+
+DIMENSION = 32
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic embeddings derived from a hash of each text."""
+
+    def __init__(self, dimension: int = DIMENSION):
+        self.dimension = dimension
+        self.calls = 0
+
+    def embed_texts(self, texts):
+        self.calls += 1
+        self.embedded = list(texts)
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+            vectors.append(np.random.default_rng(seed).random(self.dimension, dtype=np.float32))
+        return vectors
+
+
+class HashImageEmbeddings(HashEmbeddings):
+    def __init__(self, dimension: int = DIMENSION):
+        super().__init__(dimension)
+        self.image_batches = []
+
+    def embed_images(self, images):
+        self.image_batches.append(len(images))
+        # Decoded images hash their pixels, paths their name.
+        keys = [image.tobytes().hex() if hasattr(image, "tobytes") else str(image) for image in images]
+        return self.embed_texts(keys)
+
+
+def write_png(path, rgb):
+    """Write a valid 1x1 PNG of colour `rgb`."""
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    pixels = zlib.compress(b"\x00" + bytes(rgb))
+    path.write_bytes(
+        b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", pixels) + chunk(b"IEND", b"")
+    )
+
+
+@pytest.fixture
+def embeddings():
+    return HashEmbeddings()
+
+
+def make_docs(n):
+    return [f"document number {i}" for i in range(n)]
+
+
+def test_select_index_type():
+    assert select_index_type(1_000, 768) == "flat"
+    assert select_index_type(1_000_000, 768) == "hnsw"
+    budget = estimate_index_memory("hnsw", 1_000_000, 768) - 1
+    assert select_index_type(1_000_000, 768, memory_budget=budget) == "ivfpq"
+
+
+def test_flat_search_returns_exact_match(embeddings):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(50)
+    store.save_docs(docs)
+    assert store.search(docs[7], limit=1) == [docs[7]]
+
+
+def test_hnsw_search_returns_exact_match(embeddings):
+    store = FAISSStore(
+        dimension=DIMENSION, embeddings=embeddings, index_type="hnsw", hnsw_m=16
+    )
+    docs = make_docs(200)
+    store.save_docs(docs)
+    assert store.index_kind == "hnsw"
+    assert store.search(docs[42], limit=1) == [docs[42]]
+
+
+def test_auto_migrates_as_store_grows(embeddings, monkeypatch):
+    monkeypatch.setattr(store_module, "FLAT_MAX_VECTORS", 100)
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type="auto")
+    docs = make_docs(150)
+    store.save_docs(docs[:50])
+    assert store.index_kind == "flat"
+    store.save_docs(docs[50:])
+    assert store.index_kind == "hnsw"
+    assert store.index.ntotal == 150
+    assert store.search(docs[3], limit=1) == [docs[3]]
+    store.reset()
+    assert store.index_kind == "flat"
+
+
+def test_ivfpq_requires_training_batch(embeddings):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type="ivfpq")
+    with pytest.raises(ValueError):
+        store.save_docs(make_docs(10))
+
+
+def test_create_ivf_index_reuses_stored_vectors(embeddings):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(100)
+    store.save_docs(docs)
+    calls = embeddings.calls
+    store.create_ivf_index(nlist=4)
+    assert embeddings.calls == calls
+    assert store.search_approximate(docs[5], limit=1, nprobe=4) == [docs[5]]
+
+
+@pytest.mark.parametrize("index_type", ["L2", "hnsw"])
+def test_save_docs_skips_stored_documents(embeddings, index_type):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type=index_type)
+    docs = make_docs(10)
+    store.save_docs(docs)
+    store.save_docs(docs[5:] + ["fresh", "fresh"])
+    assert embeddings.embedded == ["fresh"]
+    assert store.index.ntotal == 11
+    assert store.texts == docs + ["fresh"]
+
+
+def test_upsert_replaces_documents_by_id(embeddings):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    store.upsert_docs(["v1 of a", "v1 of b"], ids=[1, 2])
+    store.upsert_docs(["v2 of a", "v1 of b"], ids=[1, 2])
+    assert embeddings.embedded == ["v2 of a"]
+    assert sorted(store.texts) == ["v1 of b", "v2 of a"]
+    assert store.search("v2 of a", limit=1) == ["v2 of a"]
+    assert store.search("v1 of a", limit=3, score_threshold=0.99) == []
+
+
+@pytest.mark.parametrize("index_type", ["L2", "hnsw"])
+def test_delete_excludes_documents_and_compacts(embeddings, index_type):
+    store = FAISSStore(
+        dimension=DIMENSION,
+        embeddings=embeddings,
+        index_type=index_type,
+        compaction_threshold=0.5,
+    )
+    docs = make_docs(20)
+    store.save_docs(docs)
+    assert store.delete(docs=docs[:5]) == 5
+    assert store.delete(ids=[doc_id(docs[0])]) == 0
+    assert store.index.ntotal == 20
+    assert store.search(docs[2], limit=1, score_threshold=0.99) == []
+    assert store.search(docs[12], limit=1) == [docs[12]]
+
+    store.delete(docs=docs[5:11])
+    assert store.index.ntotal == 9
+    assert store.get_stats()["deleted_documents"] == 0
+    assert store.texts == docs[11:]
+    assert store.search(docs[15], limit=1) == [docs[15]]
+    store.save(docs[0])
+    assert store.search(docs[0], limit=1) == [docs[0]]
+
+
+def test_save_and_load_keeps_ids_and_tombstones(embeddings, tmp_path):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(10)
+    store.save_docs(docs)
+    store.delete(docs=[docs[3]])
+    store.save_to_disk(str(tmp_path / "store"))
+
+    loaded = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    loaded.load_from_disk(str(tmp_path / "store"))
+    assert loaded.texts == docs[:3] + docs[4:]
+    assert loaded.search(docs[3], limit=1, score_threshold=0.99) == []
+    loaded.save_docs(docs)
+    assert embeddings.embedded == [docs[3]]
+
+
+@pytest.mark.parametrize("index_type", ["L2", "hnsw"])
+def test_incremental_saves_append_to_write_ahead_log(embeddings, tmp_path, index_type):
+    path = str(tmp_path / "store")
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type=index_type)
+    docs = make_docs(20)
+    store.save_docs(docs[:16], [{"n": n} for n in range(16)])
+    store.save_to_disk(path)
+    snapshot = (tmp_path / "store.index").stat().st_mtime_ns
+
+    store.save_docs(docs[16:])
+    store.delete(docs=[docs[2]])
+    store.upsert_docs([docs[5]], metadatas=[{"n": 50}])
+    store.save_to_disk(path)
+    assert (tmp_path / "store.index").stat().st_mtime_ns == snapshot
+    assert (tmp_path / "store.wal").stat().st_size > 0
+
+    loaded = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type=index_type)
+    loaded.load_from_disk(path)
+    assert loaded.texts == store.texts
+    assert loaded.search(docs[18], limit=1) == [docs[18]]
+    assert loaded.search(docs[2], limit=1, score_threshold=0.99) == []
+    assert loaded.get_metadata([doc_id(docs[5])]) == [{"n": 50}]
+
+    # The loaded store keeps appending to the same log, and can grow past it.
+    loaded.save_docs(["one more document"])
+    loaded.save_to_disk(path)
+    reloaded = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type=index_type)
+    reloaded.load_from_disk(path)
+    assert reloaded.texts == loaded.texts
+    loaded.save_docs(make_docs(40))
+    loaded.save_to_disk(path)
+    assert not (tmp_path / "store.wal").exists()
+
+
+def test_torn_write_ahead_log_record_is_dropped(embeddings, tmp_path):
+    path = str(tmp_path / "store")
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(12)
+    store.save_docs(docs[:10])
+    store.save_to_disk(path)
+    store.save_docs(docs[10:])
+    store.save_to_disk(path)
+    wal = tmp_path / "store.wal"
+    wal.write_bytes(wal.read_bytes()[:-3])
+
+    loaded = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    loaded.load_from_disk(path)
+    assert loaded.texts == docs[:11]
+
+
+def test_image_store_skips_stored_images(tmp_path):
+    embeddings = HashImageEmbeddings()
+    store = ImageFAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    image = tmp_path / "cat.png"
+    write_png(image, (200, 120, 40))
+    store.save(str(image))
+    store.save(str(image))
+    store.save("a caption")
+    assert store.image_paths == [str(image.absolute())]
+    assert store.texts == ["a caption"]
+    assert store.index.ntotal == 2
+
+
+def test_save_images_batches_and_skips_duplicates(tmp_path):
+    embeddings = HashImageEmbeddings()
+    store = ImageFAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    paths = []
+    for n in range(5):
+        paths.append(tmp_path / f"image-{n}.png")
+        write_png(paths[-1], (n, 2 * n, 3 * n))
+    copy = tmp_path / "copy-of-0.png"
+    copy.write_bytes(paths[0].read_bytes())
+    store.save(paths[4])
+
+    with pytest.warns(UserWarning, match="missing.png"):
+        store.save_images(
+            paths[:4] + [copy, tmp_path / "missing.png", paths[4]], batch_size=2, prefetch=1
+        )
+    assert embeddings.image_batches == [1, 2, 2]
+    assert store.image_paths == [str(paths[4])] + [str(path) for path in paths[:4]]
+    assert store.texts == []
+
+    store.save_docs(["a caption"])
+    store.save_to_disk(str(tmp_path / "images"))
+    loaded = ImageFAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    loaded.load_from_disk(str(tmp_path / "images"))
+    assert loaded.image_paths == store.image_paths
+    assert loaded.texts == ["a caption"]
+
+
+def test_image_delete_by_path_then_search(tmp_path):
+    embeddings = HashImageEmbeddings()
+    store = ImageFAISSStore(
+        dimension=DIMENSION, embeddings=embeddings, change_log_dir=str(tmp_path / "log")
+    )
+    cat, dog = tmp_path / "cat.png", tmp_path / "dog.png"
+    write_png(cat, (200, 120, 40))
+    write_png(dog, (10, 20, 30))
+    store.save_images([cat, dog])
+    store.save("a caption")
+
+    replica = ImageFAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    StoreReplica(replica, str(tmp_path / "log")).pull()
+    assert replica.image_paths == store.image_paths and replica.texts == ["a caption"]
+
+    assert store.delete(docs=[str(cat)]) == 1
+    assert store.image_paths == [str(dog)] and store._num_images == 1
+    results = store.search("a caption", limit=10, score_threshold=0.0)
+    assert str(cat) not in results and sorted(results) == sorted([str(dog), "a caption"])
+    # A moved copy is found by its content.
+    moved = tmp_path / "moved.png"
+    moved.write_bytes(dog.read_bytes())
+    assert store.delete(docs=[str(moved)]) == 1
+    assert store.image_paths == [] and store.texts == ["a caption"]
+
+    StoreReplica(replica, str(tmp_path / "log")).pull()
+    assert replica.image_paths == [] and replica.texts == ["a caption"]
+    replica.reset()
+    assert replica._num_images == 0
+
+
+@pytest.mark.parametrize("index_type", ["L2", "hnsw"])
+def test_filtered_search(embeddings, index_type, monkeypatch):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type=index_type)
+    docs = make_docs(60)
+    metadatas = [
+        {"source": "docs" if i % 3 == 0 else "chat", "year": 2020 + i % 6, "tenant": f"t{i % 2}"}
+        for i in range(60)
+    ]
+    store.save_docs(docs, metadatas)
+    assert store.get_metadata([doc_id(docs[3])]) == [{"source": "docs", "year": 2023, "tenant": "t1"}]
+
+    # A chat document is its own nearest neighbour but must be filtered out.
+    results = store.search(docs[1], limit=5, score_threshold=0.0, filter={"source": "docs"})
+    assert results and all(docs.index(doc) % 3 == 0 for doc in results)
+
+    where = {"$and": [{"year": {"$gte": 2024}}, {"tenant": {"$in": ["t0"]}}]}
+    results = store.search(docs[4], limit=3, filter=where)
+    assert results[0] == docs[4]
+    assert all((docs.index(d) % 6) >= 4 and docs.index(d) % 2 == 0 for d in results)
+
+    assert store.search(docs[0], filter={"source": "email"}) == []
+
+    # Force the selector path instead of the exact scan over few matches.
+    monkeypatch.setattr(store_module, "FILTER_EXACT_MAX_VECTORS", 0)
+    results = store.search(docs[1], limit=5, score_threshold=0.0, filter={"source": {"$ne": "docs"}})
+    assert results[0] == docs[1]
+    assert all(docs.index(doc) % 3 != 0 for doc in results)
+
+
+def test_filter_respects_deletes_and_metadata_updates(embeddings):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, compaction_threshold=1.0)
+    docs = make_docs(10)
+    store.save_docs(docs, [{"tenant": "a"}] * 10)
+    store.delete(docs=[docs[2]])
+    assert docs[2] not in store.search(docs[2], limit=10, score_threshold=0.0, filter={"tenant": "a"})
+
+    store.upsert_docs([docs[5]], metadatas=[{"tenant": "b"}])
+    assert store.search(docs[5], limit=10, score_threshold=0.0, filter={"tenant": "b"}) == [docs[5]]
+
+    store.compact()
+    assert store.get_metadata([doc_id(docs[5])]) == [{"tenant": "b"}]
+    assert store.search(docs[6], limit=1, filter={"tenant": "a"}) == [docs[6]]
+
+
+def test_filter_on_list_and_dict_metadata(embeddings, tmp_path):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(6)
+    tags = [["a", "b"], ["b"], ["a", "b"], None, {"k": [1]}, "a"]
+    store.save_docs(docs, [{"tags": t} if t is not None else None for t in tags])
+    assert store.get_metadata([doc_id(docs[0]), doc_id(docs[4])]) == [{"tags": ["a", "b"]}, {"tags": {"k": [1]}}]
+
+    def matches(where):
+        return sorted(store.search(docs[0], limit=10, score_threshold=0.0, filter=where))
+
+    assert matches({"tags": ["a", "b"]}) == [docs[0], docs[2]]
+    assert matches({"tags": {"$eq": {"k": [1]}}}) == [docs[4]]
+    assert matches({"tags": {"$in": [["b"], "a"]}}) == [docs[1], docs[5]]
+    assert matches({"tags": {"$nin": [["a", "b"]]}}) == [docs[1], docs[3], docs[4], docs[5]]
+    assert matches({"tags": ["c"]}) == []
+
+    store.upsert_docs([docs[3]], metadatas=[{"tags": ["b"]}])
+    store.save_to_disk(str(tmp_path / "store"))
+    loaded = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    loaded.load_from_disk(str(tmp_path / "store"))
+    assert sorted(loaded.search(docs[0], limit=10, score_threshold=0.0, filter={"tags": ["b"]})) == [
+        docs[1], docs[3]
+    ]
+
+
+def test_search_vectors_returns_padded_matrices(embeddings):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(20)
+    store.save_docs(docs)
+    queries = np.array(embeddings.embed_texts(docs[:3]), dtype=np.float32)
+
+    ids, scores = store.search_vectors(queries, limit=5, score_threshold=0.0)
+    assert ids.shape == scores.shape == (3, 5)
+    assert ids[:, 0].tolist() == [doc_id(doc) for doc in docs[:3]]
+    assert np.allclose(scores[:, 0], 1.0)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+    # Every hit above the threshold is returned, the rest are padding.
+    ids, scores = store.search_vectors(queries, limit=5, score_threshold=0.99)
+    assert ids[:, 0].tolist() == [doc_id(doc) for doc in docs[:3]]
+    assert np.all(ids[:, 1:] == -1) and np.all(np.isneginf(scores[:, 1:]))
+    assert store.get_texts(ids[:, 0]) == docs[:3]
+    assert store.get_texts([-1]) == [None]
+
+
+def test_score_threshold_filters_knn_and_radius_uses_range_search(embeddings, monkeypatch):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(20)
+    store.save_docs(docs)
+    queries = np.array(embeddings.embed_texts(docs[:2]), dtype=np.float32)
+
+    calls = []
+    range_search = store._base.range_search
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return range_search(*args, **kwargs)
+
+    monkeypatch.setattr(store._base, "range_search", counted)
+    ids, scores = store.search_vectors(queries, limit=3, score_threshold=0.4)
+    assert calls == [] and np.all(scores[ids >= 0] >= 0.4)
+
+    ids, scores = store.search_vectors(queries, limit=3, radius=1e-3)
+    assert calls == [1]
+    assert ids[:, 0].tolist() == [doc_id(doc) for doc in docs[:2]]
+    assert np.all(ids[:, 1:] == -1)
+
+
+def test_ivf_direct_map_is_built_before_searching(embeddings, tmp_path):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    docs = make_docs(100)
+    store.save_docs(docs, [{"even": i % 2 == 0} for i in range(100)])
+    store.create_ivf_index(nlist=4)
+    store.save_to_disk(str(tmp_path / "store"))
+
+    loaded = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    loaded.load_from_disk(str(tmp_path / "store"))
+    assert loaded._base.direct_map.type != faiss.DirectMap.NoMap
+    store.save_docs(["added later"])
+    assert store._base.direct_map.type != faiss.DirectMap.NoMap
+    assert loaded.search(docs[4], limit=1, filter={"even": True}) == [docs[4]]
+    assert store.search("added later", limit=1) == ["added later"]
+
+
+@pytest.mark.parametrize("index_type", ["L2", "IP", "hnsw"])
+def test_search_batch_matches_single_search(embeddings, index_type):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type=index_type)
+    docs = make_docs(50)
+    store.save_docs(docs)
+    batch = store.search_batch(docs[:4], limit=4, score_threshold=0.0)
+    assert batch == [store.search(doc, limit=4, score_threshold=0.0) for doc in docs[:4]]
+    assert [results[0] for results in batch] == docs[:4]
+
+
+def test_ip_scores_are_cosine_similarities(embeddings):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, index_type="IP")
+    docs = make_docs(10)
+    store.save_docs(docs)
+    (doc, score), *_ = store.search_with_scores(docs[3], limit=3, score_threshold=0.0)
+    assert doc == docs[3]
+    assert score == pytest.approx(1.0, abs=1e-5)
+    assert store.search_with_scores(docs[3], limit=3, score_threshold=1.5) == []
+
+
+def test_named_collections_spill_and_reload(embeddings, tmp_path):
+    store = FAISSStore(
+        dimension=DIMENSION,
+        embeddings=embeddings,
+        collection_dir=str(tmp_path),
+        max_resident_collections=2,
+    )
+    docs = make_docs(12)
+    for n in range(4):
+        name = f"query_{n}"
+        assert not store.has_collection(name)
+        store.create_collection(collection_name=name)
+        store.save_docs(docs[3 * n:3 * n + 3], collection_name=name)
+    assert store.texts == []
+    assert len(store._resident) == 2
+    assert (tmp_path / "query_0.manifest.json").exists()
+
+    for n in range(4):
+        results = store.search_in(docs[3 * n], limit=3, score_threshold=0.0, collection_name=f"query_{n}")
+        assert sorted(results) == sorted(docs[3 * n:3 * n + 3])
+    assert store.search_in(docs[0], collection_name="query_missing") == []
+
+    # Spilled collections survive a restart and are found again.
+    store.collection("query_3").save_docs(["late addition"])
+    store._evict_collections()
+    store.collection("query_0")
+    store.collection("query_1")
+    restarted = FAISSStore(dimension=DIMENSION, embeddings=embeddings, collection_dir=str(tmp_path))
+    assert restarted.list_collections() == [f"query_{n}" for n in range(4)]
+    assert "late addition" in restarted.collection("query_3").texts
+
+    store.drop_collection("query_0")
+    assert not store.has_collection("query_0")
+    assert not (tmp_path / "query_0.manifest.json").exists()
+    with pytest.raises(ValueError):
+        store.collection("../escape")
+
+
+def test_async_methods_keep_the_event_loop_free():
+    class SlowEmbeddings(HashEmbeddings):
+        def embed_texts(self, texts):
+            time.sleep(0.05)
+            return super().embed_texts(texts)
+
+    store = FAISSStore(dimension=DIMENSION, embeddings=SlowEmbeddings())
+    docs = make_docs(20)
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker = asyncio.ensure_future(tick())
+        await asyncio.gather(*(store.asave_docs(docs[n:n + 5]) for n in range(0, 20, 5)))
+        results = await asyncio.gather(*(store.asearch(doc, limit=1) for doc in docs[:4]))
+        await store.acreate_collection("query_a")
+        await store.asave_docs(docs[:2], collection_name="query_a")
+        found = await store.asearch_in(docs[1], limit=1, collection_name="query_a")
+        has = await store.ahas_collection("query_a")
+        ticker.cancel()
+        return ticks, results, found, has
+
+    ticks, results, found, has = asyncio.run(main())
+    assert ticks > 10
+    assert results == [[doc] for doc in docs[:4]]
+    assert found == [docs[1]] and has
+    assert len(store.texts) == 20
+
+
+def test_maximal_marginal_relevance_trades_relevance_for_diversity():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([[1.0, 0.1, 0.0], [1.0, 0.12, 0.0], [0.7, 0.0, 0.7]])
+    assert maximal_marginal_relevance(query, candidates, 3, lambda_mult=1.0).tolist() == [0, 1, 2]
+    assert maximal_marginal_relevance(query, candidates, 2, lambda_mult=0.5).tolist() == [0, 2]
+    assert len(maximal_marginal_relevance(query, candidates[:0], 3)) == 0
+
+
+@pytest.mark.parametrize("store_class", [FAISSStore, ImageFAISSStore])
+def test_search_mmr_skips_near_duplicates(store_class):
+    class TableEmbeddings(Embeddings):
+        vectors = {
+            "query": [1.0, 0.0, 0.0],
+            "original": [1.0, 0.1, 0.0],
+            "near copy": [1.0, 0.12, 0.0],
+            "other angle": [0.7, 0.0, 0.7],
+        }
+
+        def embed_texts(self, texts):
+            return [self.vectors[text] for text in texts]
+
+    store = store_class(dimension=3, embeddings=TableEmbeddings(), index_type="IP")
+    store.save_docs(["original", "near copy", "other angle"])
+    assert store.search("query", limit=2, score_threshold=0.0) == ["original", "near copy"]
+    assert store.search_mmr("query", limit=2, score_threshold=0.0) == ["original", "other angle"]
+    hits = store.search_mmr_with_scores("query", limit=2, score_threshold=0.0)
+    assert [doc for doc, _ in hits] == ["original", "other angle"]
+    assert hits[0][1] > hits[1][1] > 0.0
+
+
+def test_tiered_ivf_lists_live_on_disk_and_hot_lists_follow_queries(embeddings, tmp_path):
+    store = FAISSStore(
+        dimension=DIMENSION,
+        embeddings=embeddings,
+        tier_dir=str(tmp_path / "tiers"),
+        tier_memory_budget=64 * 1024,
+    )
+    docs = make_docs(3000)
+    store.save_docs(docs)
+    store.create_ivf_index(nlist=16)
+    assert isinstance(faiss.downcast_InvertedLists(store._base.invlists), faiss.OnDiskInvertedLists)
+    assert len(list((tmp_path / "tiers").glob("*.ivfdata"))) == 1
+    assert store.search(docs[5], limit=1) == [docs[5]]
+
+    store.tiers.rebalance_interval = 10
+    for _ in range(10):
+        store.search(docs[5], limit=1)
+    _, probed = store._base.quantizer.search(store._embed_queries([docs[5]]), 1)
+    assert store.tiers._hot[probed[0][0]]
+    stats = store.get_stats()["tiers"]
+    assert stats["hot_lists"] >= 1 and 0 < stats["hot_bytes"] <= 64 * 1024
+
+    store.delete(docs=docs[:10])
+    store.compact()
+    assert store.search(docs[20], limit=1) == [docs[20]]
+    assert len(list((tmp_path / "tiers").glob("*.ivfdata"))) == 1
+
+
+def test_rebalance_skips_lists_over_the_budget(embeddings, tmp_path):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, tier_dir=str(tmp_path))
+    store.save_docs(make_docs(1000))
+    store.create_ivf_index(nlist=8)
+    tiers, lists = store.tiers, store.tiers._lists
+    sizes = np.array([lists.list_size(n) for n in range(8)])
+    large, small = int(np.argmax(sizes)), int(np.argmin(np.where(sizes > 0, sizes, sizes.max() + 1)))
+    assert sizes[large] > sizes[small]
+
+    # The most probed list does not fit, a less probed smaller one does.
+    tiers.memory_budget = int(sizes[small]) * (lists.code_size + 8)
+    tiers._counts[:] = 0
+    tiers._counts[large], tiers._counts[small] = 10, 5
+    tiers.rebalance()
+    assert np.flatnonzero(tiers._hot).tolist() == [small]
+
+
+def test_tiered_snapshots_load_tiered_or_in_memory(embeddings, tmp_path):
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings, tier_dir=str(tmp_path / "a"))
+    docs = make_docs(2000)
+    store.save_docs(docs)
+    store.create_ivf_index(nlist=8)
+    path = str(tmp_path / "snapshot" / "store")
+    store.save_to_disk(path)
+    store.save_docs(["a document added after the snapshot"])
+    store.save_to_disk(path)
+
+    tiered = FAISSStore(dimension=DIMENSION, embeddings=embeddings, tier_dir=str(tmp_path / "b"))
+    tiered.load_from_disk(path)
+    assert tiered.search(docs[7], limit=1) == [docs[7]]
+    assert tiered.search("a document added after the snapshot", limit=1)
+    tiered.save_docs(["written to the working copy only"])
+
+    in_memory = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    in_memory.load_from_disk(path)
+    assert isinstance(faiss.downcast_InvertedLists(in_memory._base.invlists), faiss.ArrayInvertedLists)
+    assert len(in_memory.texts) == 2001
+    assert in_memory.search(docs[9], limit=1) == [docs[9]]
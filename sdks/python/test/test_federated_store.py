@@ -0,0 +1,158 @@
+"""Tests for concurrent retrieval across several stores."""
+
+import threading
+import time
+
+import pytest
+
+from alith import Agent, FederatedStore
+from alith.store import Store
+
+
+class ScoredStore(Store):
+    """Returns fixed (document, score) hits after an optional delay."""
+
+    def __init__(self, hits, delay=0.0, error=None):
+        self.hits = hits
+        self.delay = delay
+        self.error = error
+
+    def search_with_scores(self, query, limit=3, score_threshold=0.4):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [hit for hit in self.hits if hit[1] >= score_threshold][:limit]
+
+    def search(self, query, limit=3, score_threshold=0.4):
+        return [doc for doc, _ in self.search_with_scores(query, limit, score_threshold)]
+
+    def save(self, value):
+        pass
+
+    def reset(self):
+        self.hits = []
+
+
+class PlainStore(Store):
+    """A store without scores, ranked by position."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def search(self, query, limit=3, score_threshold=0.4):
+        return self.docs[:limit]
+
+    def save(self, value):
+        pass
+
+    def reset(self):
+        self.docs = []
+
+
+def test_merges_normalized_scores_and_deduplicates():
+    docs = ScoredStore([("faiss doc", 0.9), ("shared", 0.6), ("weak doc", 0.5)])
+    tickets = ScoredStore([("shared", 120.0), ("ticket", 20.0)])
+    store = FederatedStore([docs, tickets])
+    hits = store.search_with_scores("query", limit=2, score_threshold=0.0)
+    assert [doc for doc, _ in hits] == ["shared", "faiss doc"]
+    assert hits[0][1] == pytest.approx(1.0 + 0.25)
+
+    rrf = FederatedStore([docs, PlainStore(["ticket", "shared"])], fusion="rrf")
+    assert rrf.search("query", limit=1, score_threshold=0.0) == ["shared"]
+
+
+def test_searches_run_concurrently_and_slow_stores_are_dropped():
+    fast = ScoredStore([("fast", 0.9)], delay=0.1)
+    also_fast = ScoredStore([("also fast", 0.8)], delay=0.1)
+    slow = ScoredStore([("slow", 1.0)], delay=1.0)
+    store = FederatedStore([fast, also_fast, slow], timeout=0.3)
+
+    start = time.monotonic()
+    with pytest.warns(UserWarning, match="Store 2 .* missed its 0.3s deadline"):
+        assert sorted(store.search("query", limit=3)) == ["also fast", "fast"]
+    assert time.monotonic() - start < 0.5
+    assert store.missed == [0, 0, 1]
+
+    store = FederatedStore([fast, slow], timeout=[0.3, None])
+    assert sorted(store.search("query", limit=2)) == ["fast", "slow"]
+
+
+def test_hanging_store_holds_one_worker_and_is_skipped_until_it_returns():
+    release = threading.Event()
+
+    class HangingStore(ScoredStore):
+        calls = 0
+
+        def search_with_scores(self, query, limit=3, score_threshold=0.4):
+            HangingStore.calls += 1
+            release.wait(5)
+            return [("late", 1.0)]
+
+    with FederatedStore([ScoredStore([("fast", 0.9)]), HangingStore([])], timeout=0.05) as store:
+        with pytest.warns(UserWarning, match="missed its"):
+            for _ in range(10):
+                assert store.search("query") == ["fast"]
+        assert store.missed == [0, 10]
+        assert HangingStore.calls == 1
+        release.set()
+        time.sleep(0.1)
+        assert sorted(store.search("query", limit=2)) == ["fast", "late"]
+
+
+def test_writes_go_to_the_primary_store():
+    first, second = PlainStore([]), PlainStore([])
+    first.save = first.docs.append
+    second.save = second.docs.append
+    store = FederatedStore([first, second], primary=1)
+    store.save("doc")
+    assert (first.docs, second.docs) == ([], ["doc"])
+    with pytest.raises(ValueError):
+        FederatedStore([first], primary=1)
+
+
+def test_failing_store_is_dropped_with_a_warning():
+    store = FederatedStore([ScoredStore([("ok", 0.9)]), ScoredStore([], error=RuntimeError("down"))])
+    with pytest.warns(UserWarning, match="down"):
+        assert store.search("query") == ["ok"]
+    assert store.missed == [0, 1]
+
+
+def test_stores_that_are_not_thread_safe_are_serialized():
+    class CountingStore(ScoredStore):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def search_with_scores(self, query, limit=3, score_threshold=0.4):
+            with self.lock:
+                CountingStore.active += 1
+                CountingStore.peak = max(CountingStore.peak, CountingStore.active)
+            time.sleep(0.02)
+            with self.lock:
+                CountingStore.active -= 1
+            return super().search_with_scores(query, limit, score_threshold)
+
+    shared = CountingStore([("doc", 0.9)])
+    store = FederatedStore([shared, ScoredStore([("other", 0.9)])])
+    threads = [threading.Thread(target=store.search, args=("query",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert CountingStore.peak == 1
+
+
+def test_agent_federates_a_list_of_stores():
+    stores = [ScoredStore([("a", 0.9)]), ScoredStore([("b", 0.8)])]
+    agent = Agent(store=stores, store_timeout=2.0)
+    assert isinstance(agent.store, FederatedStore)
+    assert agent.store.timeouts == [2.0, 2.0]
+    assert sorted(agent._retrieve("query")) == ["a", "b"]
+
+
+def test_agent_rejects_unknown_or_unsupported_retrieval():
+    with pytest.raises(ValueError, match="similarity"):
+        Agent(retrieval="hybrid")
+    with pytest.raises(ValueError, match="FederatedStore"):
+        Agent(store=[ScoredStore([]), ScoredStore([])], retrieval="mmr")
+    assert Agent(store=[ScoredStore([])]).store.timeouts == [None]
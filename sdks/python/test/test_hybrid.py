@@ -0,0 +1,98 @@
+"""Tests for hybrid BM25 + vector retrieval."""
+
+import pytest
+
+try:
+    import faiss  # noqa: F401
+except ImportError:
+    pytest.skip(
+        "faiss not available. Install with: python3 -m pip install faiss-cpu",
+        allow_module_level=True,
+    )
+
+from alith import FAISSStore
+from alith.hybrid import BM25Index, HybridStore
+from alith.store import Store, doc_id
+
+from test_faiss_store import DIMENSION, HashEmbeddings
+
+DOCS = [
+    "The Metis bridge moves tokens between Ethereum and Andromeda.",
+    "Sequencer decentralization lets anyone run a Metis sequencer node.",
+    "Contract 0x4200000000000000000000000000000000000010 is the L2 bridge.",
+    "Error ERR_NONCE_TOO_LOW means the transaction nonce was already used.",
+    "Builder mining rewards recognise projects with on-chain activity.",
+]
+
+
+def test_bm25_ranks_exact_identifier_first():
+    index = BM25Index()
+    index.add(DOCS)
+    hits = index.search("what does ERR_NONCE_TOO_LOW mean", limit=3)
+    assert hits[0][0] == doc_id(DOCS[3])
+    assert index.search("0x4200000000000000000000000000000000000010")[0][0] == doc_id(DOCS[2])
+
+
+def test_bm25_incremental_add_and_delete():
+    index = BM25Index()
+    index.add(DOCS[:2])
+    index.add(DOCS)
+    assert len(index) == len(DOCS)
+    assert index.delete([doc_id(DOCS[1])]) == 1
+    assert all(i != doc_id(DOCS[1]) for i, _ in index.search("sequencer node"))
+    index.delete([doc_id(doc) for doc in DOCS[2:4]])
+    assert len(index) == 2
+    assert index.search("bridge tokens")[0][0] == doc_id(DOCS[0])
+
+
+@pytest.mark.parametrize("fusion", ["rrf", "weighted"])
+def test_hybrid_store_finds_identifiers(fusion):
+    vector_store = FAISSStore(dimension=DIMENSION, embeddings=HashEmbeddings())
+    store = HybridStore(vector_store, fusion=fusion)
+    store.save_docs(DOCS)
+    store.save_docs(DOCS[:1])
+    assert vector_store.index.ntotal == len(DOCS)
+    assert store.search("ERR_NONCE_TOO_LOW", limit=1, score_threshold=0.0) == [DOCS[3]]
+
+    store.delete([DOCS[3]])
+    assert DOCS[3] not in store.search("ERR_NONCE_TOO_LOW", limit=5, score_threshold=0.0)
+    store.reset()
+    assert store.search("bridge") == []
+
+
+def test_hybrid_store_indexes_documents_already_in_the_store():
+    vector_store = FAISSStore(dimension=DIMENSION, embeddings=HashEmbeddings())
+    vector_store.save_docs(DOCS)
+    store = HybridStore(vector_store)
+    assert len(store.bm25) == len(DOCS)
+    assert store.search("ERR_NONCE_TOO_LOW", limit=1, score_threshold=0.0) == [DOCS[3]]
+
+
+def test_hybrid_store_delete_needs_a_deleting_vector_store():
+    class AppendOnlyStore(Store):
+        def __init__(self):
+            self.docs = []
+
+        def search(self, query, limit=3, score_threshold=0.4):
+            return self.docs[:limit]
+
+        def save(self, value):
+            self.docs.append(value)
+
+        def save_docs(self, docs):
+            self.docs.extend(docs)
+
+        def reset(self):
+            self.docs.clear()
+
+    vector_store = AppendOnlyStore()
+    vector_store.save_docs(DOCS)
+    store = HybridStore(vector_store)
+    assert len(store.bm25) == 0
+    store.rebuild_bm25(vector_store.docs)
+    assert store.bm25.search("ERR_NONCE_TOO_LOW")[0][0] == doc_id(DOCS[3])
+    with pytest.raises(TypeError):
+        store.rebuild_bm25()
+    with pytest.raises(NotImplementedError):
+        store.delete([DOCS[3]])
+    assert len(store.bm25) == len(DOCS)
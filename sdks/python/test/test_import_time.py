@@ -0,0 +1,53 @@
+"""Tests that importing alith stays cheap."""
+
+import json
+import subprocess
+import sys
+
+import alith
+
+# Seconds `from alith import Agent` may take in a fresh interpreter. It takes
+# about 0.3s (requests and pydantic); loading a store backend, an embedding
+# model or the LazAI chain client eagerly would add seconds.
+IMPORT_BUDGET = 1.0
+
+HEAVY_MODULES = ("chromadb", "pymilvus", "faiss", "web3", "eth_account", "torch", "fastembed", "onnxruntime")
+
+
+def fresh_import(statement: str) -> dict:
+    """Run `statement` in a new interpreter; returns its best time of 3 and the heavy modules it loaded."""
+    code = f"""
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+    runs = [
+        json.loads(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+        for _ in range(3)
+    ]
+    return {"seconds": min(run["seconds"] for run in runs), "loaded": runs[0]["loaded"]}
+
+
+def test_agent_import_skips_backends_and_fits_the_budget():
+    result = fresh_import("from alith import Agent")
+    assert result["loaded"] == []
+    assert result["seconds"] < IMPORT_BUDGET, f"from alith import Agent took {result['seconds']:.2f}s"
+
+
+def test_flags_do_not_import_backends():
+    result = fresh_import(
+        "import alith; [getattr(alith, name) for name in alith.__all__ if name.endswith('_AVAILABLE')]"
+    )
+    assert result["loaded"] == []
+
+
+def test_exports_resolve_lazily():
+    assert set(alith.__all__) <= set(dir(alith))
+    for name in alith.__all__:
+        assert getattr(alith, name) is not None
+    from alith import store
+
+    assert alith.FAISS_AVAILABLE == store.FAISS_AVAILABLE
+    assert alith.CHROMADB_AVAILABLE == store.CHROMADB_AVAILABLE
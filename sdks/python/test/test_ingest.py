@@ -0,0 +1,136 @@
+"""Tests for the streaming ingestion pipeline."""
+
+import json
+
+import pytest
+
+try:
+    import faiss  # noqa: F401
+    import numpy as np  # noqa: F401
+except ImportError:
+    pytest.skip(
+        "faiss not available. Install with: python3 -m pip install faiss-cpu",
+        allow_module_level=True,
+    )
+
+from alith import FAISSStore
+from alith.ingest import FileLoader, IngestPipeline, JSONKnowledgeLoader, ingest
+
+from test_faiss_store import DIMENSION, HashEmbeddings
+
+
+def sentences(text):
+    return [piece.strip() for piece in text.split(".") if piece.strip()]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for n in range(6):
+        (docs / f"file-{n}.txt").write_text(
+            ". ".join(f"File {n} sentence {m}" for m in range(5)) + ". Shared footer."
+        )
+    (docs / "ignored.bin").write_text("not text")
+    dump = tmp_path / "knowledge.json"
+    dump.write_text(
+        json.dumps(
+            {"blogs": [{"title": f"Post {n}", "content": f"Body of post {n}.", "url": f"u{n}"} for n in range(4)]}
+        )
+    )
+    return docs, dump
+
+
+def test_pipeline_stores_chunks_with_metadata(corpus):
+    docs, dump = corpus
+    embeddings = HashEmbeddings()
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    reports = []
+    stats = ingest(
+        [FileLoader(docs), JSONKnowledgeLoader(dump)],
+        store,
+        chunker=sentences,
+        chunk_workers=2,
+        embed_batch_size=4,
+        write_batch_size=8,
+        queue_size=4,
+        progress=reports.append,
+    )
+
+    assert stats.documents == 10 and stats.sources == 7
+    # Six footers collapse to one stored chunk.
+    assert stats.chunks == 6 * 6 + 4 and stats.skipped == 5
+    assert len(store.texts) == stats.written == stats.embedded == 35
+    assert embeddings.calls >= 35 / 4 and len(embeddings.embedded) <= 4
+    assert reports[-1].written == 35
+    hit = store.search_with_scores("File 3 sentence 2", limit=1)[0][0]
+    assert hit == "File 3 sentence 2"
+    results = store.search("anything", limit=1, score_threshold=0.0, filter={"url": "u1"})
+    assert results == ["Post 1\nBody of post 1"]
+
+
+def test_pipeline_resumes_from_checkpoint(corpus, tmp_path):
+    docs, _ = corpus
+    checkpoint = str(tmp_path / "checkpoint.json")
+    store_path = str(tmp_path / "store" / "faiss")
+    embeddings = HashEmbeddings()
+    store = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    pipeline = IngestPipeline(
+        store, chunker=sentences, checkpoint_path=checkpoint, store_path=store_path
+    )
+    assert pipeline.run(FileLoader(docs)).sources == 6
+    assert len(json.loads(open(checkpoint).read())["completed"]) == 6
+
+    (docs / "file-6.txt").write_text("A new file. Shared footer.")
+    restored = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    restored.load_from_disk(store_path)
+    stats = IngestPipeline(
+        restored, chunker=sentences, checkpoint_path=checkpoint, store_path=store_path
+    ).run(FileLoader(docs))
+    assert stats.documents == 1 and stats.written == 1 and stats.skipped == 1
+    assert "A new file" in restored.texts
+
+
+def test_pipeline_surfaces_stage_errors(corpus):
+    docs, _ = corpus
+
+    def broken(text):
+        raise RuntimeError("chunker failed")
+
+    store = FAISSStore(dimension=DIMENSION, embeddings=HashEmbeddings())
+    with pytest.raises(RuntimeError, match="chunker failed"):
+        ingest(FileLoader(docs), store, chunker=broken)
+
+
+def test_checkpoint_waits_for_deduplicated_chunks_to_be_written(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("Only in a. Shared footer.")
+    (docs / "b.txt").write_text("Shared footer.")
+    # Arrives after b's duplicate footer was seen, while a's footer is unwritten.
+    (docs / "c.txt").write_text("Only in c.")
+    store = FAISSStore(dimension=DIMENSION, embeddings=HashEmbeddings())
+    pipeline = IngestPipeline(
+        store,
+        chunker=sentences,
+        chunk_workers=1,
+        embed_batch_size=1,
+        write_batch_size=100,
+        checkpoint_path=str(tmp_path / "checkpoint.json"),
+        checkpoint_interval=0.0,
+    )
+    checkpoints = []
+    write_checkpoint = pipeline._write_checkpoint
+
+    def record(completed):
+        checkpoints.append((set(completed), set(store.texts)))
+        write_checkpoint(completed)
+
+    pipeline._write_checkpoint = record
+    pipeline.run(FileLoader(docs))
+
+    assert len(checkpoints[-1][0]) == 3
+    for completed, texts in checkpoints:
+        for source in completed:
+            path = source.rsplit("@", 1)[0]
+            assert set(sentences(open(path).read())) <= texts
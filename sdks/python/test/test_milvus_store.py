@@ -0,0 +1,91 @@
+"""Tests for the Milvus store, run against Milvus Lite."""
+
+import asyncio
+
+import pytest
+
+try:
+    import milvus_lite  # noqa: F401
+    import pymilvus  # noqa: F401
+except ImportError:
+    pytest.skip(
+        "Milvus Lite not available. Install with: python3 -m pip install pymilvus milvus-lite",
+        allow_module_level=True,
+    )
+
+from alith import MilvusStore
+from alith.store import MILVUS_MAX_TEXT_BYTES
+
+from test_faiss_store import HashEmbeddings, make_docs
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MilvusStore(
+        uri=str(tmp_path / "milvus.db"),
+        dimension=DIMENSION,
+        embeddings=HashEmbeddings(DIMENSION),
+        batch_size=4,
+    )
+
+
+def count(store, collection_name):
+    rows = store.client.query(collection_name, filter="id >= 0", output_fields=["count(*)"])
+    return rows[0]["count(*)"]
+
+
+def test_save_docs_uses_content_ids_in_batches(store):
+    docs = make_docs(10)
+    store.save_docs(docs, metadatas=[{"n": n} for n in range(10)])
+    store.save_docs(docs[:3] + docs[:3])
+    assert count(store, store.collection_name) == 10
+    calls = store.embeddings.calls
+    store.save_docs(make_docs(19)[10:])
+    assert store.embeddings.calls - calls == 3
+    assert count(store, store.collection_name) == 19
+
+
+def test_search_batch_and_threshold(store):
+    docs = make_docs(10)
+    store.save_docs(docs)
+    results = store.search_batch(docs[:6], limit=1, score_threshold=0.99)
+    assert results == [[doc] for doc in docs[:6]]
+    hits = store.search_with_scores(docs[2], limit=3, score_threshold=0.0)
+    assert hits[0] == (docs[2], pytest.approx(1.0))
+    assert all(score <= 1.0 for _, score in hits)
+
+    store.create_collection("query_other")
+    store.save_docs(docs[5:], collection_name="query_other")
+    results = store.search_in(docs[1], limit=3, score_threshold=0.0, collection_name="query_other")
+    assert len(results) == 3 and set(results) <= set(docs[5:])
+    store.reset()
+    assert store.search(docs[2]) == []
+
+
+def test_queries_are_embedded_once_and_oversized_docs_rejected(store):
+    docs = make_docs(10)
+    store.save_docs(docs)
+    calls = store.embeddings.calls
+    assert store.search_batch(docs, limit=1, score_threshold=0.99) == [[doc] for doc in docs]
+    assert store.embeddings.calls - calls == 1
+
+    # The limit is in UTF-8 bytes, not characters.
+    oversized = "é" * (MILVUS_MAX_TEXT_BYTES // 2 + 1)
+    with pytest.raises(ValueError, match="chunk it"):
+        store.save_docs(["fine", oversized])
+    assert count(store, store.collection_name) == 10
+
+
+def test_async_searches_run_concurrently(store):
+    docs = make_docs(8)
+    store.save_docs(docs)
+
+    async def search_all():
+        return await asyncio.gather(
+            *(store.asearch(doc, limit=1, score_threshold=0.99) for doc in docs)
+        )
+
+    assert asyncio.run(search_all()) == [[doc] for doc in docs]
+    assert "_calls_lock" not in store.__dict__
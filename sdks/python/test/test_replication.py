@@ -0,0 +1,141 @@
+"""Tests for change-log replication of FAISS stores."""
+
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+try:
+    import faiss  # noqa: F401
+    import numpy as np
+except ImportError:
+    pytest.skip(
+        "faiss not available. Install with: python3 -m pip install faiss-cpu",
+        allow_module_level=True,
+    )
+
+from alith import ChangeLogServer, Embeddings, FAISSStore, StoreReplica
+from alith.persistence import OP_ADD, OP_DELETE, ChangeLog
+
+DIMENSION = 16
+
+
+class HashEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_texts(self, texts):
+        self.calls += 1
+        return [
+            np.random.default_rng(
+                int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+            ).random(DIMENSION, dtype=np.float32)
+            for text in texts
+        ]
+
+
+def state(store):
+    collections = {
+        name: sorted(store.collection(name).texts) for name in store.list_collections()
+    }
+    return sorted(store.texts), collections
+
+
+def test_replica_applies_changes_without_embedding(tmp_path):
+    primary = FAISSStore(DIMENSION, HashEmbeddings(), change_log_dir=str(tmp_path / "log"))
+    primary.save_docs(["alpha", "beta", "gamma"], [{"n": 1}, {"n": 2}, {"n": 3}])
+    primary.upsert_docs(["beta v2"], ids=[primary._id_view()[1]])
+    primary.upsert_docs(["alpha"], metadatas=[{"n": 10}])
+    primary.delete(docs=["gamma"])
+    primary.save_docs(["in a collection"], collection_name="notes")
+    primary.create_collection("empty")
+
+    embeddings = HashEmbeddings()
+    replica = FAISSStore(DIMENSION, embeddings)
+    follower = StoreReplica(replica, str(tmp_path / "log"))
+    assert follower.pull() == primary.change_log.sequence
+    assert embeddings.calls == 0
+    assert state(replica) == state(primary)
+    assert replica.get_metadata([primary._id_view()[0]]) == [{"n": 10}]
+    assert replica.search("beta v2", limit=1, score_threshold=0.0) == ["beta v2"]
+    assert replica.log_sequence == primary.change_log.sequence
+
+    primary.drop_collection("notes")
+    primary.reset()
+    primary.save_docs(["fresh"])
+    follower.pull()
+    assert state(replica) == (["fresh"], {})
+    assert follower.pull() == 0
+
+
+def test_new_replica_starts_from_snapshot_plus_deltas(tmp_path):
+    primary = FAISSStore(DIMENSION, HashEmbeddings(), change_log_dir=str(tmp_path / "log"))
+    primary.save_docs([f"doc {n}" for n in range(20)])
+    primary.save_to_disk(str(tmp_path / "snapshot" / "store"))
+    primary.delete(docs=["doc 3"])
+    primary.save_docs(["doc 20"])
+
+    replica = FAISSStore(DIMENSION)
+    replica.load_from_disk(str(tmp_path / "snapshot" / "store"))
+    assert replica.log_sequence == 20
+    assert StoreReplica(replica, str(tmp_path / "log")).pull() == 2
+    assert state(replica) == state(primary)
+
+
+def test_pull_takes_the_store_call_lock(tmp_path):
+    primary = FAISSStore(DIMENSION, HashEmbeddings(), change_log_dir=str(tmp_path / "log"))
+    primary.save_docs(["alpha"])
+    replica = FAISSStore(DIMENSION)
+    follower = StoreReplica(replica, str(tmp_path / "log"))
+    with replica._call_lock():
+        puller = threading.Thread(target=follower.pull)
+        puller.start()
+        time.sleep(0.1)
+        assert replica.texts == []
+    puller.join()
+    assert replica.texts == ["alpha"]
+
+
+def test_replica_tails_over_http(tmp_path):
+    primary = FAISSStore(DIMENSION, HashEmbeddings(), change_log_dir=str(tmp_path / "log"))
+    primary.save_docs(["one", "two"])
+    replica = FAISSStore(DIMENSION)
+    with ChangeLogServer(primary.change_log, max_bytes=64) as server:
+        follower = StoreReplica(replica, server.url, poll_interval=0.05).start()
+        try:
+            primary.save_docs(["three"], collection_name="more")
+            deadline = time.monotonic() + 5
+            while replica.log_sequence < primary.change_log.sequence and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            follower.stop()
+    assert state(replica) == state(primary)
+
+    primary.change_log.segment_records = 1
+    primary.save_docs(["four", "five"])
+    primary.change_log.prune(primary.change_log.sequence)
+    with ChangeLogServer(primary.change_log) as server:
+        with pytest.raises(ValueError, match="pruned"):
+            StoreReplica(FAISSStore(DIMENSION), server.url).pull()
+
+
+def test_change_log_segments_prune_and_torn_tail(tmp_path):
+    log = ChangeLog(str(tmp_path), 4, segment_records=3)
+    vector = np.ones(4, dtype=np.float32)
+    log.append([(OP_ADD, None, i, vector, f"doc {i}", None) for i in range(7)])
+    log.append([(OP_DELETE, "notes", 5, None, None, None)])
+    assert log.segments() == [1, 4, 7]
+    assert [seq for seq, _ in log.read(2)] == [3, 4, 5, 6, 7, 8]
+    assert list(log.read(7)) == [(8, (OP_DELETE, "notes", 5, None, None, None))]
+
+    with open(os.path.join(str(tmp_path), f"{7:016d}.changes"), "ab") as f:
+        f.write(b"\x01partial")
+    assert [seq for seq, _ in log.read(0)][-1] == 8
+    assert ChangeLog(str(tmp_path), 4, segment_records=3).sequence == 8
+
+    assert log.prune(5) == 1
+    assert log.segments() == [4, 7]
+    with pytest.raises(ValueError, match="pruned"):
+        list(log.read(0))
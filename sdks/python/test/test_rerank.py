@@ -0,0 +1,133 @@
+"""Tests for the cross-encoder reranking stage."""
+
+import json
+
+import numpy as np
+import pytest
+
+from alith import ONNXRUNTIME_AVAILABLE, CrossEncoder, Reranker
+from alith import rerank as rerank_module
+from alith.store import Store
+
+
+class ListStore(Store):
+    """Returns the stored documents in insertion order, ignoring the query."""
+
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.batches = 0
+
+    def search(self, query, limit=3, score_threshold=0.4):
+        return self.docs[:limit]
+
+    def search_batch(self, queries, limit=3, score_threshold=0.4):
+        self.batches += 1
+        return [self.docs[:limit] for _ in queries]
+
+    def save(self, value):
+        self.docs.append(value)
+
+    def reset(self):
+        self.docs = []
+
+
+class OverlapModel:
+    """Scores a pair by the number of query words found in the document."""
+
+    def __init__(self):
+        self.calls = []
+
+    def score_pairs(self, pairs):
+        self.calls.append(list(pairs))
+        return np.array(
+            [len(set(query.split()) & set(doc.split())) for query, doc in pairs],
+            dtype=np.float32,
+        )
+
+
+def test_reranks_candidates_and_caches_pair_scores():
+    docs = ["red apple", "green pear", "red apple pie", "blue sky"]
+    model = OverlapModel()
+    store = Reranker(ListStore(docs), model, fetch_k=5)
+
+    assert store.search_with_scores("red apple pie", limit=2) == [
+        ("red apple pie", 3.0),
+        ("red apple", 2.0),
+    ]
+    assert len(model.calls) == 1 and len(model.calls[0]) == 4
+
+    assert store.search("Red  apple pie", limit=1) == ["red apple pie"]
+    assert len(model.calls) == 1
+    assert store.cache_stats()["hits"] == 4
+
+    store.save("red apple pie crust")
+    assert store.search("red apple pie", limit=5)[0] == "red apple pie"
+    assert model.calls[-1] == [("red apple pie", "red apple pie crust")]
+
+
+def test_search_batch_scores_all_queries_in_one_call():
+    inner = ListStore(["red apple", "green pear", "blue sky"])
+    model = OverlapModel()
+    store = Reranker(inner, model)
+    assert store.search_batch(["green pear", "blue sky"], limit=1) == [["green pear"], ["blue sky"]]
+    assert inner.batches == 1
+    assert len(model.calls) == 1 and len(model.calls[0]) == 6
+
+
+@pytest.mark.skipif(not ONNXRUNTIME_AVAILABLE, reason="onnxruntime not available")
+def test_search_in_defaults_to_the_default_collection():
+    class CollectionStore(ListStore):
+        def search_in(self, query, limit=3, score_threshold=0.4, collection_name=None):
+            self.collection_name = collection_name
+            return self.docs[:limit] if collection_name is None else []
+
+    inner = CollectionStore(["red apple", "blue sky"])
+    store = Reranker(inner, OverlapModel())
+    assert store.search_in("blue sky", limit=1) == ["blue sky"]
+    assert inner.collection_name is None
+
+
+def test_cross_encoder_truncates_and_batches_by_length(tmp_path, monkeypatch):
+    vocab = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "[SEP]": 3, "a": 4, "b": 5, "c": 6}
+    tokenizer = {
+        "version": "1.0",
+        "truncation": None,
+        "padding": None,
+        "added_tokens": [],
+        "normalizer": None,
+        "pre_tokenizer": {"type": "Whitespace"},
+        "post_processor": {
+            "type": "BertProcessing",
+            "sep": ["[SEP]", 3],
+            "cls": ["[CLS]", 2],
+        },
+        "decoder": None,
+        "model": {"type": "WordLevel", "vocab": vocab, "unk_token": "[UNK]"},
+    }
+    (tmp_path / "tokenizer.json").write_text(json.dumps(tokenizer))
+
+    class FakeSession:
+        """Scores a pair by its number of non-padding tokens."""
+
+        batches = []
+
+        def __init__(self, path, options, providers):
+            pass
+
+        def get_inputs(self):
+            class Input:
+                def __init__(self, name):
+                    self.name = name
+
+            return [Input("input_ids"), Input("attention_mask")]
+
+        def run(self, outputs, feed):
+            self.batches.append(feed["input_ids"].shape)
+            return [feed["attention_mask"].sum(axis=1, keepdims=True).astype(np.float32)]
+
+    monkeypatch.setattr(rerank_module.ort, "InferenceSession", FakeSession)
+    model = CrossEncoder(tmp_path / "model.onnx", max_length=6, batch_size=2)
+    scores = model.score("a", ["b c b c b c", "", "b"])
+    # [CLS] a [SEP] ... [SEP]: the long document is cut to fit six tokens.
+    assert scores.tolist() == [6.0, 4.0, 5.0]
+    assert FakeSession.batches == [(2, 5), (1, 6)]
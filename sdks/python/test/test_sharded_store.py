@@ -0,0 +1,79 @@
+"""Tests for the sharded FAISS store."""
+
+import pytest
+
+try:
+    import faiss  # noqa: F401
+    import numpy as np
+except ImportError:
+    pytest.skip(
+        "faiss not available. Install with: python3 -m pip install faiss-cpu",
+        allow_module_level=True,
+    )
+
+from alith import FAISSStore, ShardedFAISSStore
+from alith.store import doc_id
+
+from test_faiss_store import DIMENSION, HashEmbeddings, make_docs
+
+
+@pytest.mark.parametrize("partition", ["hash", "round_robin"])
+def test_sharded_search_matches_single_store(partition):
+    embeddings = HashEmbeddings()
+    docs = make_docs(60)
+    single = FAISSStore(dimension=DIMENSION, embeddings=embeddings)
+    single.save_docs(docs)
+    sharded = ShardedFAISSStore(
+        num_shards=3, dimension=DIMENSION, embeddings=embeddings, partition=partition
+    )
+    sharded.save_docs(docs, [{"n": n} for n in range(60)])
+
+    assert all(size > 0 for size in sharded.get_stats()["shard_documents"])
+    queries = docs[:5]
+    assert sharded.search_batch(queries, limit=5, score_threshold=0.0) == single.search_batch(
+        queries, limit=5, score_threshold=0.0
+    )
+    assert sharded.search(docs[7], limit=1, filter={"n": {"$gte": 7}}) == [docs[7]]
+    assert sharded.get_metadata([doc_id(docs[9])]) == [{"n": 9}]
+
+    sharded.save_docs(docs)
+    assert sharded.get_stats()["total_documents"] == 60
+    assert sharded.delete(docs=docs[:10]) == 10
+    assert sharded.search(docs[0], limit=1, score_threshold=0.99) == []
+
+
+@pytest.mark.parametrize("partition", ["hash", "round_robin"])
+def test_add_shard_rebalances_without_reembedding(partition):
+    embeddings = HashEmbeddings()
+    docs = make_docs(40)
+    sharded = ShardedFAISSStore(
+        num_shards=2, dimension=DIMENSION, embeddings=embeddings, partition=partition
+    )
+    sharded.save_docs(docs)
+    calls = embeddings.calls
+    sharded.add_shard()
+
+    assert embeddings.calls == calls
+    sizes = sharded.get_stats()["shard_documents"]
+    assert sum(sizes) == 40 and min(sizes) > 0
+    if partition == "hash":
+        for index, shard in enumerate(sharded.shards):
+            assert all(i % 3 == index for i in shard._positions)
+    else:
+        assert max(sizes) - min(sizes) <= 1
+    assert sharded.search_batch(docs[::9], limit=1) == [[doc] for doc in docs[::9]]
+
+
+def test_sharded_save_and_load(tmp_path):
+    embeddings = HashEmbeddings()
+    docs = make_docs(30)
+    sharded = ShardedFAISSStore(num_shards=3, dimension=DIMENSION, embeddings=embeddings)
+    sharded.save_docs(docs)
+    sharded.save_to_disk(str(tmp_path / "sharded"))
+
+    loaded = ShardedFAISSStore(num_shards=1, dimension=DIMENSION, embeddings=embeddings)
+    loaded.load_from_disk(str(tmp_path / "sharded"))
+    assert loaded.num_shards == 3
+    assert sorted(loaded.texts) == sorted(docs)
+    ids, scores = loaded.search_vectors(np.array(embeddings.embed_texts(docs[:2])), limit=2)
+    assert ids[:, 0].tolist() == [doc_id(doc) for doc in docs[:2]]